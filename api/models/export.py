@@ -25,6 +25,8 @@ class ExportDTO(SnakeModel):
     from_date: Optional[date] = Field(None, example="2020-12-01")
     to_date: Optional[date] = Field(None, example="2020-12-02")
     data_types: List[ExportDataType] = Field(example=["all_data"])
+    # Store the files without compression (faster for large exports)
+    store_only: Optional[bool] = Field(False, example=False)
 
     @root_validator
     def validate_dates(cls, values):
@@ -1,17 +1,16 @@
 import os
 import re
-import tempfile
 import logging
 
 from datetime import date, datetime
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from starlette import status
-from typing import List, Tuple
-from zipfile import ZipFile, ZIP_DEFLATED
+from typing import Iterator, List, Tuple
+from zipfile import ZipFile, ZipInfo, ZIP64_LIMIT, ZIP_DEFLATED, ZIP_STORED
 
 from api.models.export import ExportDTO, ExportDataType
-from api.utils import extract_config, clean_up_file
+from api.utils import extract_config
 from libs.metrics import FaceMaskUsageMetric, OccupancyMetric, SocialDistancingMetric
 
 logger = logging.getLogger(__name__)
@@ -25,15 +24,70 @@ SOCIAL_DISTANCING = ExportDataType.social_distancing
 FACEMASK_USAGE = ExportDataType.facemask_usage
 OCCUPANCY = ExportDataType.occupancy
 
+# Size of the blocks read from the exported files (and of the chunks of the response)
+EXPORT_CHUNK_SIZE = 1024 * 1024
 
-def export_folder_into_zip(source_path, destination_path, zip_file, from_date, to_date):
+
+class ZipStreamBuffer:
+    """
+    Write-only (and non-seekable) file where a ZipFile writes the export. The written bytes are collected with
+    `pop` to send them in the response while the zip is generated.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def generate_zip_stream(files: List[Tuple[str, str]], compression: int) -> Iterator[bytes]:
+    """
+    Generator. Yields the chunks of a zip file with the (file_path, arcname) <files>. The files are read and
+    compressed in blocks, so the export is never stored (in memory or in disk) completely.
+    """
+    buffer = ZipStreamBuffer()
+    with ZipFile(buffer, "w", compression=compression) as export_zip:
+        for file_path, arcname in files:
+            if not os.path.isfile(file_path):
+                continue
+            zip_info = ZipInfo.from_file(file_path, arcname)
+            zip_info.compress_type = compression
+            force_zip64 = zip_info.file_size >= ZIP64_LIMIT
+            with open(file_path, "rb") as source, export_zip.open(zip_info, "w", force_zip64=force_zip64) as entry:
+                for block in iter(lambda: source.read(EXPORT_CHUNK_SIZE), b""):
+                    entry.write(block)
+                    data = buffer.pop()
+                    if data:
+                        yield data
+            yield buffer.pop()
+    # The central directory is written when the zip is closed
+    yield buffer.pop()
+
+
+def get_folder_files_to_export(source_path, destination_path, from_date, to_date) -> List[Tuple[str, str]]:
     """
-    Export into the <zip_file> all the csv files included in the <source_path>.
-    If the parameters <from_date> and <to_date> are sent, only the files between these days
-    are exported.
+    Returns the (file_path, arcname) of all the csv files included in the <source_path>, placed in the
+    <destination_path> of the zip. If the parameters <from_date> and <to_date> are sent, only the files between
+    these days are exported.
     """
+    files = []
     if not os.path.exists(source_path):
-        return None
+        return files
     for filename in os.listdir(source_path):
         if filename.endswith(".csv"):
             if from_date and to_date:
@@ -44,7 +98,8 @@ def export_folder_into_zip(source_path, destination_path, zip_file, from_date, t
                 file_date = datetime.strptime(date_matches[0], '%Y-%m-%d').date()
                 if not from_date <= file_date <= to_date:
                     continue
-            zip_file.write(os.path.join(source_path, filename), arcname=os.path.join(destination_path, filename))
+            files.append((os.path.join(source_path, filename), os.path.join(destination_path, filename)))
+    return files
 
 
 def get_areas_to_export(export_info: ExportDTO) -> List[Tuple[str, str]]:
@@ -100,70 +155,70 @@ def get_cameras_to_export(export_info: ExportDTO, areas: List[Tuple[str, str]])
     return []
 
 
-def export_camera_data_into_file(export_info: ExportDTO, camera_id: str, camera_name: str, zip_file: str) -> None:
+def get_camera_files_to_export(export_info: ExportDTO, camera_id: str, camera_name: str) -> List[Tuple[str, str]]:
     """
-    Includes into the <zip_file> all the information requested in the <export_info> for the camera <camera_id>.
+    Returns the (file_path, arcname) of all the information requested in the <export_info> for the camera
+    <camera_id>.
     """
+    files = []
     if ALL_DATA in export_info.data_types or RAW_DATA in export_info.data_types:
         object_logs_path = os.path.join(os.getenv("SourceLogDirectory"), camera_id, "objects_log")
-        export_folder_into_zip(
+        files.extend(get_folder_files_to_export(
             object_logs_path,
             os.path.join("cameras", f"{camera_id}-{camera_name}", "raw_data"),
-            zip_file,
             export_info.from_date,
             export_info.to_date
-        )
+        ))
     if ALL_DATA in export_info.data_types or SOCIAL_DISTANCING in export_info.data_types:
         social_ditancing_reports_folder = f"reports/{SocialDistancingMetric.reports_folder}"
         social_ditancing_reports_path = os.path.join(
             os.getenv("SourceLogDirectory"), camera_id, social_ditancing_reports_folder)
-        export_folder_into_zip(
+        files.extend(get_folder_files_to_export(
             social_ditancing_reports_path,
             os.path.join("cameras", f"{camera_id}-{camera_name}", social_ditancing_reports_folder),
-            zip_file,
             export_info.from_date,
             export_info.to_date
-        )
+        ))
     if ALL_DATA in export_info.data_types or FACEMASK_USAGE in export_info.data_types:
         face_mask_reports_folder = f"reports/{FaceMaskUsageMetric.reports_folder}"
         face_mask_reports_path = os.path.join(
             os.getenv("SourceLogDirectory"), camera_id, face_mask_reports_folder)
-        export_folder_into_zip(
+        files.extend(get_folder_files_to_export(
             face_mask_reports_path,
             os.path.join("cameras", f"{camera_id}-{camera_name}", face_mask_reports_folder),
-            zip_file,
             export_info.from_date,
             export_info.to_date
-        )
+        ))
+    return files
 
 
-def export_area_data_into_file(export_info: ExportDTO, area_id: str, area_name: str, zip_file: str) -> None:
+def get_area_files_to_export(export_info: ExportDTO, area_id: str, area_name: str) -> List[Tuple[str, str]]:
     """
-    Includes into the <zip_file> all the information requested in the <export_info> for the area <area_id>.
+    Returns the (file_path, arcname) of all the information requested in the <export_info> for the area <area_id>.
     """
+    files = []
     if ALL_DATA in export_info.data_types or RAW_DATA in export_info.data_types:
         occupancy_logs_path = os.path.join(os.getenv("AreaLogDirectory"), area_id, "occupancy_log")
-        export_folder_into_zip(
+        files.extend(get_folder_files_to_export(
             occupancy_logs_path,
             os.path.join("areas", f"{area_id}-{area_name}", "raw_data"),
-            zip_file,
             export_info.from_date,
             export_info.to_date
-        )
+        ))
     if ALL_DATA in export_info.data_types or OCCUPANCY in export_info.data_types:
         occupancy_report_folder = f"reports/{OccupancyMetric.reports_folder}"
         occupancy_report_path = os.path.join(os.getenv("AreaLogDirectory"), area_id, occupancy_report_folder)
-        export_folder_into_zip(
+        files.extend(get_folder_files_to_export(
             occupancy_report_path,
             os.path.join("areas", f"{area_id}-{area_name}", occupancy_report_folder),
-            zip_file,
             export_info.from_date,
             export_info.to_date
-        )
+        ))
+    return files
 
 
 @export_router.put("")
-async def export(export_info: ExportDTO, background_tasks: BackgroundTasks):
+async def export(export_info: ExportDTO):
     """
     Returns a zip file containing the CSV files for the requested data.
 
@@ -172,16 +227,22 @@ async def export(export_info: ExportDTO, background_tasks: BackgroundTasks):
     - *Dates*: (only include data for the specified date range).
     - *Data Type*: (the type of information that you want to export. The available values are raw_data, occupancy,
         social-distancing, facemask-usage and all_data)
+
+    The zip is generated while it's sent (with chunked transfer encoding). Use *store_only* to send the files
+    without compression.
     """
     areas = get_areas_to_export(export_info)
     cameras = get_cameras_to_export(export_info, areas)
-    temp_dir = tempfile.mkdtemp()
+    files = []
+    for (cam_id, name) in cameras:
+        files.extend(get_camera_files_to_export(export_info, cam_id, name))
+    for (area_id, name) in areas:
+        files.extend(get_area_files_to_export(export_info, area_id, name))
+    compression = ZIP_STORED if export_info.store_only else ZIP_DEFLATED
     export_filename = f"export-{date.today()}.zip"
-    zip_path = os.path.join(temp_dir, export_filename)
-    with ZipFile(zip_path, 'w', compression=ZIP_DEFLATED) as export_zip:
-        for (cam_id, name) in cameras:
-            export_camera_data_into_file(export_info, cam_id, name, export_zip)
-        for (area_id, name) in areas:
-            export_area_data_into_file(export_info, area_id, name, export_zip)
-    background_tasks.add_task(clean_up_file, temp_dir)
-    return FileResponse(zip_path, filename=export_filename)
+    # The generator is iterated in a worker thread, so the compression doesn't block the event loop
+    return StreamingResponse(
+        generate_zip_stream(files, compression),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{export_filename}"'}
+    )
@@ -7,10 +7,14 @@ from typing import Iterator
 from api.utils import bad_request_serializer, extract_config
 from constants import AREAS, CAMERAS, FACEMASK_USAGE, OCCUPANCY, SOCIAL_DISTANCING
 from libs.metrics import FaceMaskUsageMetric, OccupancyMetric, SocialDistancingMetric
+from libs.metrics.reports_cache import ReportsCache
 
 
 CAMERAS_METRICS = [SOCIAL_DISTANCING, FACEMASK_USAGE]
 
+# The reports are regenerated only when their files change
+reports_cache = ReportsCache()
+
 
 def get_cameras(cameras: str) -> Iterator[str]:
     if cameras:
@@ -89,13 +93,21 @@ def get_metric_class(metric: str):
 def get_live_metric(entity: str, entities_ids: str, metric: str):
     entities = get_entities(entity, entities_ids, metric)
     metric_class = get_metric_class(metric)
-    return metric_class.get_live_report(entities)
+    return reports_cache.get(
+        ("live", metric, tuple(entities)),
+        metric_class.get_report_files(entities, "live.csv"),
+        lambda: metric_class.get_live_report(entities)
+    )
 
 
 def get_hourly_metric(entity: str, entities_ids: str, metric: str, date: date):
     entities = get_entities(entity, entities_ids, metric)
     metric_class = get_metric_class(metric)
-    return metric_class.get_hourly_report(entities, date)
+    return reports_cache.get(
+        ("hourly", metric, tuple(entities), date),
+        metric_class.get_report_files(entities, f"report_{date}.csv"),
+        lambda: metric_class.get_hourly_report(entities, date)
+    )
 
 
 def get_daily_metric(entity: str, entities_ids: str, metric: str, from_date: date,
@@ -103,17 +115,30 @@ def get_daily_metric(entity: str, entities_ids: str, metric: str, from_date: dat
     validate_dates(from_date, to_date)
     entities = get_entities(entity, entities_ids, metric)
     metric_class = get_metric_class(metric)
-    return metric_class.get_daily_report(entities, from_date, to_date)
+    return reports_cache.get(
+        ("daily", metric, tuple(entities), from_date, to_date),
+        metric_class.get_report_files(entities, "report.csv"),
+        lambda: metric_class.get_daily_report(entities, from_date, to_date)
+    )
 
 
 def get_weekly_metric(entity: str, entities_ids: str, metric: str, from_date: date,
                       to_date: date, weeks: int):
     entities = get_entities(entity, entities_ids, metric)
     metric_class = get_metric_class(metric)
+    report_files = metric_class.get_report_files(entities, "report.csv")
     if weeks > 0:
         # Report from weeks*7 days ago (grouped by week, ending on yesterday)
-        return metric_class.get_weekly_report(entities, number_of_weeks=weeks)
+        return reports_cache.get(
+            ("weekly", metric, tuple(entities), weeks, date.today()),
+            report_files,
+            lambda: metric_class.get_weekly_report(entities, number_of_weeks=weeks)
+        )
     else:
         # Report from the defined date_range, weeks ending on Sunday.
         validate_dates(from_date, to_date)
-        return metric_class.get_weekly_report(entities, from_date=from_date, to_date=to_date)
+        return reports_cache.get(
+            ("weekly", metric, tuple(entities), from_date, to_date),
+            report_files,
+            lambda: metric_class.get_weekly_report(entities, from_date=from_date, to_date=to_date)
+        )
@@ -0,0 +1,98 @@
+import io
+import os
+import pytest
+
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+
+import api.routers.export as export_module
+# The line below is absolutely necessary. Fixtures are passed as arguments to test functions.
+# This is why the IDE cannot recognize them.
+from api.tests.utils.fixtures_tests import export_client, metrics_config
+
+
+def write_file(file_path, size, seed):
+    """Writes a file of CSV-like lines (compressible but different in each file)"""
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    lines = (f"{seed},{index},{(index * 7919 + seed) % 1000}\n" for index in range(size // 10))
+    with open(file_path, "w") as exported_file:
+        exported_file.write("".join(lines)[:size])
+    return file_path
+
+
+def write_export_files(config):
+    """Writes the raw data and the reports of the camera "default" and the area "area0" of the test config"""
+    sources_directory = config.get_section_dict("SourceLogger_2")["LogDirectory"]
+    areas_directory = config.get_section_dict("AreaLogger_0")["LogDirectory"]
+    camera_directory = os.path.join(sources_directory, "default")
+    area_directory = os.path.join(areas_directory, "area0")
+    camera_prefix = os.path.join("cameras", "default-Garden-Camera")
+    area_prefix = os.path.join("areas", "area0-Kitchen")
+    files = {}
+    for index, (directory, prefix, folder, file_name, size) in enumerate([
+        (camera_directory, camera_prefix, "objects_log", "2020-10-01.csv", 250_000),
+        (camera_directory, camera_prefix, "objects_log", "2020-10-02.csv", 10),
+        (camera_directory, camera_prefix, "reports/social-distancing", "report_2020-10-01.csv", 3_000),
+        (camera_directory, camera_prefix, "reports/social-distancing", "report.csv", 500),
+        (camera_directory, camera_prefix, "reports/face-mask-usage", "report_2020-10-02.csv", 0),
+        (area_directory, area_prefix, "occupancy_log", "2020-10-01.csv", 120_000),
+        (area_directory, area_prefix, "reports/occupancy", "report_2020-10-01.csv", 2_000),
+    ]):
+        arcname_folder = "raw_data" if folder.endswith("_log") else folder
+        files[os.path.join(prefix, arcname_folder, file_name)] = write_file(
+            os.path.join(directory, folder, file_name), size, index)
+    # Files that are not exported
+    write_file(os.path.join(camera_directory, "objects_log", "2020-10-01.bin"), 100, 100)
+    write_file(os.path.join(camera_directory, "reports", "social-distancing", "live.json"), 100, 101)
+    return files
+
+
+def download_export(client, export_info):
+    response = client.put("/export", json=export_info)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert response.headers["content-disposition"].startswith('attachment; filename="export-')
+    return ZipFile(io.BytesIO(response.content))
+
+
+def assert_export_members(export_zip, files):
+    assert export_zip.testzip() is None
+    assert sorted(export_zip.namelist()) == sorted(files)
+    for arcname, file_path in files.items():
+        with open(file_path, "rb") as exported_file:
+            assert export_zip.read(arcname) == exported_file.read()
+
+
+# pytest -v api/tests/app/test_export.py::TestsExport
+class TestsExport:
+    """Streaming ZIP exports of the logs and reports"""
+
+    @pytest.mark.parametrize("store_only,compression", [(False, ZIP_DEFLATED), (True, ZIP_STORED)])
+    def test_export_all_data(self, export_client, metrics_config, monkeypatch, store_only, compression):
+        # Small blocks, so the files are streamed in several chunks
+        monkeypatch.setattr(export_module, "EXPORT_CHUNK_SIZE", 16 * 1024)
+        files = write_export_files(metrics_config)
+
+        export_zip = download_export(export_client, {
+            "all_cameras": True, "all_areas": True, "data_types": ["all_data"], "store_only": store_only
+        })
+
+        assert_export_members(export_zip, files)
+        assert {info.compress_type for info in export_zip.infolist()} == {compression}
+
+    def test_export_date_range_and_data_types(self, export_client, metrics_config):
+        files = write_export_files(metrics_config)
+
+        export_zip = download_export(export_client, {
+            "cameras": ["default"], "from_date": "2020-10-02", "to_date": "2020-10-02",
+            "data_types": ["raw_data", "facemask-usage"]
+        })
+
+        assert_export_members(export_zip, {
+            arcname: file_path for arcname, file_path in files.items()
+            if arcname.startswith("cameras") and "2020-10-02" in arcname
+        })
+
+    def test_export_without_files(self, export_client):
+        export_zip = download_export(export_client, {"areas": ["area0"], "data_types": ["occupancy"]})
+
+        assert_export_members(export_zip, {})
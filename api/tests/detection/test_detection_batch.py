@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from libs.detection_batch import DetectionBatch
+
+RESOLUTION = (640, 480)
+
+
+def create_batch():
+    bboxes = [[0.1, 0.1, 0.2, 0.4], [0.5, 0.2, 0.6, 0.6], [0.7, 0.3, 0.75, 0.5]]
+    return DetectionBatch.from_bboxes(
+        bboxes, RESOLUTION, score=[0.9, 0.8, 0.7], class_id=[1, 1, 1],
+        track_id=np.array([4, -1, 6]), track_info=np.array([{"lost": 0}, None, {"lost": 2}], dtype=object),
+        face=np.array([[0.1, 0.1, 0.2, 0.2], [np.nan] * 4, [0.3, 0.7, 0.35, 0.75]]),
+        face_label=np.array([0, -1, 1])
+    )
+
+
+# pytest -v api/tests/detection/test_detection_batch.py::TestsDetectionBatch
+class TestsDetectionBatch:
+    """Struct-of-arrays representation of the detected objects"""
+
+    def test_from_bboxes_computes_the_coordinates(self):
+        batch = create_batch()
+
+        assert len(batch) == 3
+        np.testing.assert_allclose(batch.bbox_real[0], [64, 48, 128, 192])
+        np.testing.assert_allclose(batch.centroid[0], [0.15, 0.25, 0.1, 0.3])
+        np.testing.assert_allclose(batch.centroid_real[0], [96, 120, 64, 144])
+        assert batch.object_index.tolist() == [0, 1, 2]
+        assert batch.ids == ["1-0", "1-1", "1-2"]
+
+    def test_select_returns_the_selected_objects(self):
+        batch = create_batch()
+
+        for indexes in [np.array([False, True, True]), np.array([2, 1]), slice(1, 3)]:
+            selected = batch.select(indexes)
+            assert len(selected) == 2
+            assert selected.track_id.tolist() == batch.track_id[indexes].tolist()
+            assert selected.object_index.tolist() == batch.object_index[indexes].tolist()
+            np.testing.assert_array_equal(selected.bbox, batch.bbox[indexes])
+            np.testing.assert_array_equal(selected.face, batch.face[indexes])
+        assert len(batch[np.array([], dtype=int)]) == 0
+
+    def test_copy_doesnt_share_the_arrays_nor_the_extras(self):
+        batch = create_batch()
+        batch[0]["distance"] = 3
+
+        copy = batch.copy()
+        copy.bbox[0] = 0
+        copy[0]["score"] = 0.1
+        copy[0]["distance"] = 5
+
+        assert batch.bbox[0].tolist() == [0.1, 0.1, 0.2, 0.4]
+        assert batch[0]["score"] == 0.9
+        assert batch[0]["distance"] == 3
+        assert copy[0]["distance"] == 5
+
+    def test_view_mutation_writes_back_to_the_arrays(self):
+        batch = create_batch()
+
+        view = batch[1]
+        view["bbox"] = [0.4, 0.4, 0.5, 0.5]
+        view["tracked_id"] = 9
+        view["face_label"] = 0
+        view["id"] = "2-7"
+        view["custom"] = "value"
+        del batch[0]["tracked_id"]
+
+        assert batch.bbox[1].tolist() == [0.4, 0.4, 0.5, 0.5]
+        assert batch.track_id.tolist() == [-1, 9, 6]
+        assert batch.track_info[0] is None
+        assert batch.face_label.tolist() == [0, 0, 1]
+        assert batch.class_id[1] == 2 and batch.object_index[1] == 7
+        assert batch.extras[1] == {"custom": "value"}
+        assert "tracked_id" not in batch[0]
+        # Reading a key returns a copy of the value
+        bbox = batch[2]["bbox"]
+        bbox[0] = 0
+        assert batch.bbox[2][0] == 0.7
+
+    def test_view_index_out_of_range(self):
+        batch = create_batch()
+
+        assert batch[-1]["id"] == "1-2"
+        with pytest.raises(IndexError):
+            batch[3]
+
+    def test_object_index_is_the_index_of_the_legacy_id(self):
+        batch = create_batch().select(np.array([0, 2]))
+
+        assert batch.ids == ["1-0", "1-2"]
+        batch.object_index = np.arange(len(batch))
+        assert batch.ids == ["1-0", "1-1"]
+        assert [obj["id"] for obj in batch] == ["1-0", "1-1"]
+
+    def test_dicts_round_trip(self):
+        batch = create_batch()
+        batch[2]["distance"] = 1.5
+
+        objects = batch.to_dicts()
+
+        assert objects[0] == {
+            "id": "1-0", "bbox": batch.bbox[0].tolist(), "centroid": batch.centroid[0].tolist(),
+            "bboxReal": batch.bbox_real[0].tolist(), "centroidReal": batch.centroid_real[0].tolist(),
+            "score": 0.9, "tracked_id": 4, "track_info": {"lost": 0}, "face": [0.1, 0.1, 0.2, 0.2], "face_label": 0
+        }
+        # The untracked objects don't have tracking keys and the missing faces are None
+        assert "tracked_id" not in objects[1]
+        assert objects[1]["face"] is None
+        assert objects[2]["distance"] == 1.5
+
+        restored = DetectionBatch.from_objects(objects)
+
+        assert restored.to_dicts() == objects
+        np.testing.assert_array_equal(restored.bbox_real, batch.bbox_real)
+        assert restored.track_id.tolist() == batch.track_id.tolist()
+        assert restored.face_label.tolist() == batch.face_label.tolist()
+        assert DetectionBatch.from_objects(restored) is restored
+
+    def test_empty_batch(self):
+        batch = DetectionBatch.from_objects([])
+
+        assert len(batch) == 0
+        assert batch.to_dicts() == []
+        assert batch.bbox.shape == (0, 4)
+        assert batch.has_faces.tolist() == []
@@ -0,0 +1,124 @@
+import os
+import pytest
+
+from libs.utils.log_tail import CsvTailReader, read_last_rows
+
+HEADERS = ["Timestamp", "Detections"]
+
+
+def csv_line(index, detections_length=10):
+    # The detections have commas, the field is quoted as in the objects logs
+    return f'2020-10-01 10:00:{index:02d},"[{", ".join(["0"] * detections_length)}]"\n'
+
+
+def expected_row(index, detections_length=10):
+    return {"Timestamp": f"2020-10-01 10:00:{index:02d}", "Detections": f'[{", ".join(["0"] * detections_length)}]'}
+
+
+def write_log(file_path, lines, header=True, mode="w"):
+    with open(file_path, mode) as log_file:
+        if header:
+            log_file.write(",".join(HEADERS) + "\n")
+        log_file.write("".join(lines))
+    return str(file_path)
+
+
+# pytest -v api/tests/log_utils/test_log_tail.py::TestsCsvTailReader
+class TestsCsvTailReader:
+    """Latest rows of the CSV logs that are being appended"""
+
+    def test_missing_and_header_only_files(self, tmp_path):
+        reader = CsvTailReader()
+
+        assert reader.read_last_row(str(tmp_path / "missing.csv")) is None
+        assert reader.read_last_row(write_log(tmp_path / "header.csv", [])) is None
+        # The header is still being written
+        partial_header = tmp_path / "partial_header.csv"
+        partial_header.write_text("Timestamp,Detec")
+        assert reader.read_last_row(str(partial_header)) is None
+
+    def test_file_with_a_single_row(self, tmp_path):
+        reader = CsvTailReader()
+
+        assert reader.read_last_row(write_log(tmp_path / "log.csv", [csv_line(0)])) == expected_row(0)
+
+    def test_partial_last_line_is_ignored(self, tmp_path):
+        log_path = write_log(tmp_path / "log.csv", [csv_line(0), csv_line(1), csv_line(2)[:15]])
+        reader = CsvTailReader()
+
+        assert reader.read_last_row(log_path) == expected_row(1)
+        # The line is completed
+        write_log(log_path, [csv_line(2)[15:]], header=False, mode="a")
+        assert reader.read_last_row(log_path) == expected_row(2)
+
+    def test_partial_first_row_is_ignored(self, tmp_path):
+        reader = CsvTailReader()
+
+        assert reader.read_last_row(write_log(tmp_path / "log.csv", [csv_line(0)[:10]])) is None
+
+    def test_appended_rows(self, tmp_path):
+        log_path = write_log(tmp_path / "log.csv", [csv_line(0)])
+        reader = CsvTailReader()
+        reader.read_last_row(log_path)
+
+        write_log(log_path, [csv_line(1), csv_line(2)], header=False, mode="a")
+        assert reader.read_last_row(log_path) == expected_row(2)
+        # No new rows
+        assert reader.read_last_row(log_path) == expected_row(2)
+
+    @pytest.mark.parametrize("block_size", [1, 7, 16, 45, 8192])
+    def test_rows_spanning_the_block_boundary(self, tmp_path, block_size):
+        lines = [csv_line(index, detections_length=index * 5) for index in range(20)]
+        reader = CsvTailReader(block_size=block_size)
+
+        assert reader.read_last_row(write_log(tmp_path / "log.csv", lines)) == expected_row(19, 95)
+        assert reader.read_last_row(write_log(tmp_path / "short.csv", [csv_line(0), csv_line(1)])) == expected_row(1)
+
+    def test_rotation_to_a_new_day(self, tmp_path):
+        reader = CsvTailReader()
+        reader.read_last_row(write_log(tmp_path / "2020-10-01.csv", [csv_line(0), csv_line(1)]))
+
+        # The log of the new day has no rows yet
+        new_day_path = write_log(tmp_path / "2020-10-02.csv", [])
+        assert reader.read_last_row(new_day_path) is None
+        write_log(new_day_path, [csv_line(5)], header=False, mode="a")
+        assert reader.read_last_row(new_day_path) == expected_row(5)
+
+    def test_replaced_and_truncated_files(self, tmp_path):
+        log_path = write_log(tmp_path / "log.csv", [csv_line(index) for index in range(5)])
+        reader = CsvTailReader()
+        reader.read_last_row(log_path)
+
+        os.replace(write_log(tmp_path / "new_log.csv", [csv_line(10), csv_line(11)]), log_path)
+        assert reader.read_last_row(log_path) == expected_row(11)
+        write_log(log_path, [csv_line(20)])
+        assert reader.read_last_row(log_path) == expected_row(20)
+
+
+# pytest -v api/tests/log_utils/test_log_tail.py::TestsReadLastRows
+class TestsReadLastRows:
+    """Latest rows of the CSV logs read backwards from the end"""
+
+    def test_header_only_file(self, tmp_path):
+        assert read_last_rows(write_log(tmp_path / "log.csv", []), 5) == []
+
+    def test_file_shorter_than_the_rows(self, tmp_path):
+        log_path = write_log(tmp_path / "log.csv", [csv_line(index) for index in range(3)])
+
+        assert read_last_rows(log_path, 5) == [expected_row(index) for index in range(3)]
+        assert read_last_rows(log_path, 3) == [expected_row(index) for index in range(3)]
+        assert read_last_rows(log_path, 0) == []
+
+    def test_partial_last_line_is_ignored(self, tmp_path):
+        log_path = write_log(tmp_path / "log.csv", [csv_line(0), csv_line(1), csv_line(2)[:15]])
+
+        assert read_last_rows(log_path, 2) == [expected_row(0), expected_row(1)]
+        assert read_last_rows(write_log(tmp_path / "partial.csv", [csv_line(0)[:10]]), 2) == []
+
+    @pytest.mark.parametrize("block_size", [1, 7, 16, 45, 8192])
+    @pytest.mark.parametrize("count", [1, 2, 5, 19, 20, 30])
+    def test_rows_spanning_the_block_boundary(self, tmp_path, block_size, count):
+        lines = [csv_line(index, detections_length=index * 5) for index in range(20)]
+        rows = [expected_row(index, index * 5) for index in range(20)]
+
+        assert read_last_rows(write_log(tmp_path / "log.csv", lines), count, block_size) == rows[-count:]
@@ -0,0 +1,141 @@
+import numpy as np
+import os
+
+from datetime import date, datetime, timedelta
+
+from libs.utils.objects_log import (DETECTION_DTYPE, FRAME_DTYPE, decode_timestamps, encode_tracking_id,
+                                    get_binary_objects_log_paths, read_binary_objects_log,
+                                    read_complete_binary_objects_log, select_detections)
+from tools.convert_objects_log import convert_objects_logs
+from api.tests.utils.common_functions import write_objects_log
+
+LOG_DATE = date(2020, 10, 1)
+
+
+def generate_rows(rows_count):
+    """Rows logged every half a second (two rows in each second) with 0 to 3 objects"""
+    rows = []
+    start_time = datetime(2020, 10, 1, 10, 0, 0)
+    for index in range(rows_count):
+        detections = []
+        for object_index in range(index % 4):
+            detection = {
+                "position": [0.0, 0.0, 0.0],
+                "bbox": [0.1 * object_index, 0.2, 0.1 * object_index + 0.05, 0.5 + 0.001 * index],
+                "tracking_id": index // 10 + object_index if object_index != 2 else f"1-{object_index}",
+            }
+            if object_index == 1:
+                detection["face_label"] = index % 2
+            detections.append(detection)
+        violations_indexes = [0, 1] if len(detections) >= 2 and index % 3 == 0 else []
+        timestamp = start_time + timedelta(seconds=index // 2)
+        rows.append((timestamp.strftime("%Y-%m-%d %H:%M:%S"), detections, violations_indexes))
+    return rows
+
+
+def convert_log(tmp_path, rows):
+    objects_log_directory = str(tmp_path)
+    csv_path = os.path.join(objects_log_directory, f"{LOG_DATE}.csv")
+    write_objects_log(csv_path, rows)
+    convert_objects_logs(objects_log_directory)
+    return objects_log_directory, csv_path
+
+
+def truncate(file_path, records_count, dtype, extra_bytes=0):
+    with open(file_path, "r+b") as f:
+        f.truncate(records_count * dtype.itemsize + extra_bytes)
+
+
+# pytest -v api/tests/log_utils/test_objects_log.py::TestsBinaryObjectsLog
+class TestsBinaryObjectsLog:
+    """Binary (columnar) objects log converted from the CSV objects log"""
+
+    def test_csv_to_binary_round_trip(self, tmp_path):
+        rows = generate_rows(40)
+        _, csv_path = convert_log(tmp_path, rows)
+
+        frames, detections = read_complete_binary_objects_log(csv_path)
+
+        assert isinstance(frames, np.memmap) and isinstance(detections, np.memmap)
+        assert len(frames) == len(rows)
+        assert len(detections) == sum(len(row_detections) for _, row_detections, _ in rows)
+        for frame, (timestamp, row_detections, violations_indexes) in zip(frames, rows):
+            assert str(decode_timestamps(frame["timestamp"])).replace("T", " ") == timestamp
+            assert frame["detections_count"] == len(row_detections)
+            assert frame["violating_objects"] == len(violations_indexes)
+            frame_detections = detections[frame["first_detection"]:frame["first_detection"] + len(row_detections)]
+            for index, (detection, record) in enumerate(zip(row_detections, frame_detections)):
+                assert record["timestamp"] == frame["timestamp"]
+                assert record["track_id"] == encode_tracking_id(detection["tracking_id"])
+                np.testing.assert_array_equal(record["bbox"], detection["bbox"])
+                assert record["face_label"] == detection.get("face_label", -1)
+                assert record["violation"] == (index in violations_indexes)
+
+    def test_select_detections_of_an_interval(self, tmp_path):
+        rows = generate_rows(40)
+        _, csv_path = convert_log(tmp_path, rows)
+        frames, detections = read_complete_binary_objects_log(csv_path)
+
+        selected_frames, selected_detections = select_detections(
+            frames, detections, datetime(2020, 10, 1, 10, 0, 5), datetime(2020, 10, 1, 10, 0, 10))
+
+        selected_rows = [row for row in rows if "10:00:05" <= row[0].split(" ")[1] < "10:00:10"]
+        assert len(selected_frames) == len(selected_rows)
+        assert len(selected_detections) == sum(len(row_detections) for _, row_detections, _ in selected_rows)
+        assert selected_detections[0]["timestamp"] == selected_frames[0]["timestamp"]
+
+    def test_partial_records_are_ignored(self, tmp_path):
+        rows = generate_rows(40)
+        objects_log_directory, _ = convert_log(tmp_path, rows)
+        frames_path, detections_path = get_binary_objects_log_paths(objects_log_directory, LOG_DATE)
+        # A frame and its detections are being written
+        with open(detections_path, "ab") as f:
+            f.write(np.zeros(2, dtype=DETECTION_DTYPE).tobytes())
+        with open(frames_path, "ab") as f:
+            f.write(np.zeros(1, dtype=FRAME_DTYPE).tobytes()[:10])
+
+        frames, detections = read_binary_objects_log(objects_log_directory, LOG_DATE)
+
+        assert len(frames) == len(rows)
+        assert len(detections) == sum(len(row_detections) for _, row_detections, _ in rows)
+
+    def test_truncated_frames_are_rejected(self, tmp_path):
+        rows = generate_rows(40)
+        objects_log_directory, csv_path = convert_log(tmp_path, rows)
+        frames_path, _ = get_binary_objects_log_paths(objects_log_directory, LOG_DATE)
+        # The last frame is lost and the previous one is partially written, the last second has a frame less
+        truncate(frames_path, len(rows) - 2, FRAME_DTYPE, extra_bytes=10)
+
+        assert len(read_binary_objects_log(objects_log_directory, LOG_DATE)[0]) == len(rows) - 2
+        assert read_complete_binary_objects_log(csv_path) is None
+
+    def test_frame_lost_in_the_last_second_is_rejected(self, tmp_path):
+        rows = generate_rows(40)
+        objects_log_directory, csv_path = convert_log(tmp_path, rows)
+        frames_path, _ = get_binary_objects_log_paths(objects_log_directory, LOG_DATE)
+        # The last two rows are logged in the same second
+        truncate(frames_path, len(rows) - 1, FRAME_DTYPE)
+
+        assert read_complete_binary_objects_log(csv_path) is None
+
+    def test_truncated_detections_are_rejected(self, tmp_path):
+        rows = generate_rows(40)
+        objects_log_directory, csv_path = convert_log(tmp_path, rows)
+        _, detections_path = get_binary_objects_log_paths(objects_log_directory, LOG_DATE)
+        detections_count = sum(len(row_detections) for _, row_detections, _ in rows)
+        truncate(detections_path, detections_count - 1, DETECTION_DTYPE)
+
+        frames, detections = read_binary_objects_log(objects_log_directory, LOG_DATE)
+
+        # The frames with missing detections are ignored
+        assert frames[-1]["first_detection"] + frames[-1]["detections_count"] <= len(detections)
+        assert len(frames) < len(rows)
+        assert read_complete_binary_objects_log(csv_path) is None
+
+    def test_missing_rows_are_rejected(self, tmp_path):
+        rows = generate_rows(40)
+        _, csv_path = convert_log(tmp_path, rows)
+        # Rows logged after the conversion
+        write_objects_log(csv_path, rows + generate_rows(44)[40:])
+
+        assert read_complete_binary_objects_log(csv_path) is None
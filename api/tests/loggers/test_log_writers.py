@@ -0,0 +1,133 @@
+import csv
+import os
+import time
+
+from datetime import date, timedelta
+
+from libs.detection_batch import DetectionBatch
+from libs.loggers.log_writers import DailyBinaryObjectsLogWriter, DailyCsvWriter
+from libs.loggers.source_loggers.file_system_logger import FileSystemLogger
+from libs.utils.objects_log import read_binary_objects_log
+# The line below is absolutely necessary. Fixtures are passed as arguments to test functions.
+# This is why the IDE cannot recognize them.
+from api.tests.utils.fixtures_tests import metrics_config
+
+HEADERS = ["Timestamp", "Value"]
+TODAY = date(2020, 10, 1)
+TOMORROW = TODAY + timedelta(days=1)
+
+
+def csv_row(index, log_date=TODAY):
+    return {"Timestamp": f"{log_date} 23:59:{index:02d}", "Value": str(index)}
+
+
+def binary_row(index, log_date=TODAY):
+    objects = [{"position": [0.0, 0.0, 0.0], "bbox": [0.1, 0.2, 0.3, 0.4], "tracking_id": index}]
+    return f"{log_date} 23:59:{index:02d}", objects, [], 0, 1.0
+
+
+def read_rows(directory, log_date):
+    with open(os.path.join(directory, f"{log_date}.csv"), newline="") as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+def wait_for(condition, timeout=5):
+    start_time = time.monotonic()
+    while not condition() and time.monotonic() - start_time < timeout:
+        time.sleep(0.01)
+    return condition()
+
+
+# pytest -v api/tests/loggers/test_log_writers.py::TestsDailyLogWriters
+class TestsDailyLogWriters:
+    """Buffered writers of the daily log files"""
+
+    def test_first_row_is_written_right_away(self, tmp_path):
+        writer = DailyCsvWriter(str(tmp_path), HEADERS, max_rows=10, flush_interval=60)
+
+        writer.write(TODAY, csv_row(0))
+
+        assert read_rows(str(tmp_path), TODAY) == [csv_row(0)]
+        writer.close()
+
+    def test_rows_are_written_when_the_buffer_is_full(self, tmp_path):
+        writer = DailyCsvWriter(str(tmp_path), HEADERS, max_rows=3, flush_interval=60)
+        rows = [csv_row(index) for index in range(4)]
+
+        writer.write(TODAY, rows[0])
+        writer.write(TODAY, rows[1])
+        writer.write(TODAY, rows[2])
+        assert read_rows(str(tmp_path), TODAY) == rows[:1]
+        writer.write(TODAY, rows[3])
+
+        assert read_rows(str(tmp_path), TODAY) == rows
+        writer.close()
+
+    def test_rows_are_written_after_the_flush_interval(self, tmp_path):
+        writer = DailyCsvWriter(str(tmp_path), HEADERS, max_rows=10, flush_interval=0.2)
+        rows = [csv_row(index) for index in range(3)]
+
+        for row in rows:
+            writer.write(TODAY, row)
+        assert read_rows(str(tmp_path), TODAY) == rows[:1]
+
+        # No other row is written, the timer writes the buffered rows
+        assert wait_for(lambda: read_rows(str(tmp_path), TODAY) == rows)
+        writer.close()
+
+    def test_midnight_rotation(self, tmp_path):
+        writer = DailyCsvWriter(str(tmp_path), HEADERS, max_rows=10, flush_interval=60)
+        today_rows = [csv_row(index) for index in range(3)]
+        tomorrow_rows = [csv_row(index, TOMORROW) for index in range(3)]
+
+        for row in today_rows + tomorrow_rows:
+            writer.write(row["Timestamp"].split(" ")[0], row)
+
+        # The rows of the previous day are written before opening the file of the new day
+        assert read_rows(str(tmp_path), TODAY) == today_rows
+        assert read_rows(str(tmp_path), TOMORROW) == tomorrow_rows[:1]
+        writer.close()
+        assert read_rows(str(tmp_path), TOMORROW) == tomorrow_rows
+
+    def test_rows_are_appended_to_an_existing_file(self, tmp_path):
+        rows = [csv_row(index) for index in range(4)]
+        for rows_range in [slice(0, 2), slice(2, 4)]:
+            writer = DailyCsvWriter(str(tmp_path), HEADERS, max_rows=10, flush_interval=60)
+            for row in rows[rows_range]:
+                writer.write(TODAY, row)
+            writer.close()
+
+        assert read_rows(str(tmp_path), TODAY) == rows
+
+    def test_binary_midnight_rotation_and_close(self, tmp_path):
+        writer = DailyBinaryObjectsLogWriter(str(tmp_path), max_rows=10, flush_interval=60)
+
+        for index in range(3):
+            writer.write(TODAY, binary_row(index))
+        for index in range(2):
+            writer.write(TOMORROW, binary_row(index, TOMORROW))
+
+        assert len(read_binary_objects_log(str(tmp_path), TODAY)[0]) == 3
+        assert len(read_binary_objects_log(str(tmp_path), TOMORROW)[0]) == 1
+        writer.close()
+        frames, detections = read_binary_objects_log(str(tmp_path), TOMORROW)
+        assert len(frames) == 2
+        assert detections["track_id"].tolist() == [0, 1]
+
+    def test_file_system_logger_writes_the_buffered_rows_on_stop(self, metrics_config, tmp_path):
+        metrics_config.set_option_in_section("SourceLogger_2", "ScreenshotsDirectory", str(tmp_path / "screenshots"))
+        metrics_config.set_option_in_section("SourceLogger_2", "TimeInterval", "0")
+        metrics_config.set_option_in_section("SourceLogger_2", "BinaryObjectsLog", "True")
+        metrics_config.set_option_in_section("SourceLogger_2", "BufferFlushInterval", "60")
+        metrics_config.save(str(tmp_path / "config-x86-openvino.ini"))
+        metrics_config.reload()
+        logger = FileSystemLogger(metrics_config, "Source_0", "SourceLogger_2")
+        objects = DetectionBatch.from_bboxes([[0.1, 0.2, 0.3, 0.4]], (640, 480))
+
+        for _ in range(5):
+            logger.log_objects(logger.format_objects(objects), [], [], 0, 1, 1.0, f"{TODAY} 10:00:00", "1.0")
+        assert len(read_rows(logger.objects_log_directory, TODAY)) == 1
+        logger.stop_logging()
+
+        assert len(read_rows(logger.objects_log_directory, TODAY)) == 5
+        assert len(read_binary_objects_log(logger.objects_log_directory, TODAY)[0]) == 5
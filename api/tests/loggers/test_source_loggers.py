@@ -0,0 +1,145 @@
+import csv
+import os
+import pytest
+import time
+
+from datetime import datetime, timedelta
+from threading import Event, Thread
+
+from libs.detection_batch import DetectionBatch
+from libs.loggers.source_loggers.file_system_logger import FileSystemLogger
+from libs.loggers.source_loggers.logger import Logger
+from libs.loggers.source_loggers.logger_queue import BLOCK, DROP_NEWEST, DROP_OLDEST, LoggerQueue
+# The line below is absolutely necessary. Fixtures are passed as arguments to test functions.
+# This is why the IDE cannot recognize them.
+from api.tests.utils.fixtures_tests import metrics_config
+
+
+class BlockedHandler:
+    """Handler of the updates that waits until it's released"""
+
+    def __init__(self):
+        self.updates = []
+        self.released = Event()
+
+    def __call__(self, update):
+        self.released.wait(5)
+        self.updates.append(update)
+
+
+def file_system_logger(config, tmp_path, time_interval):
+    config.set_option_in_section("SourceLogger_2", "ScreenshotsDirectory", str(tmp_path / "screenshots"))
+    config.set_option_in_section("SourceLogger_2", "TimeInterval", str(time_interval))
+    config.set_option_in_section("SourceLogger_2", "BufferMaxRows", "1")
+    config.save(str(tmp_path / "config-x86-openvino.ini"))
+    config.reload()
+    return FileSystemLogger(config, "Source_0", "SourceLogger_2")
+
+
+# pytest -v api/tests/loggers/test_source_loggers.py::TestsLoggerQueue
+class TestsLoggerQueue:
+    """Queues of the updates processed by the worker threads of the loggers"""
+
+    def test_drop_newest_keeps_the_queued_updates(self):
+        handler = BlockedHandler()
+        queue = LoggerQueue("test", handler, 2, DROP_NEWEST)
+
+        for update in range(5):
+            queue.put(update)
+        handler.released.set()
+        queue.start()
+        queue.stop()
+
+        assert handler.updates == [0, 1]
+        assert queue.get_metrics() == {"depth": 0, "max_depth": 2, "processed": 2, "dropped": 3}
+
+    def test_drop_oldest_keeps_the_latest_updates(self):
+        handler = BlockedHandler()
+        queue = LoggerQueue("test", handler, 2, DROP_OLDEST)
+
+        for update in range(5):
+            queue.put(update)
+        handler.released.set()
+        queue.start()
+        queue.stop()
+
+        assert handler.updates == [3, 4]
+        assert queue.get_metrics()["dropped"] == 3
+
+    def test_block_waits_for_the_worker(self):
+        handler = BlockedHandler()
+        queue = LoggerQueue("test", handler, 1, BLOCK)
+        queue.start()
+        producer = Thread(target=lambda: [queue.put(update) for update in range(4)], daemon=True)
+
+        producer.start()
+        time.sleep(0.2)
+        # The worker holds an update and the queue is full
+        assert producer.is_alive()
+        assert queue.depth == 1
+        handler.released.set()
+        producer.join(5)
+        queue.stop()
+
+        assert not producer.is_alive()
+        assert handler.updates == [0, 1, 2, 3]
+        assert queue.get_metrics()["dropped"] == 0
+
+    def test_stop_processes_the_queued_updates(self):
+        handler = BlockedHandler()
+        handler.released.set()
+        queue = LoggerQueue("test", handler, 10, BLOCK)
+        queue.start()
+
+        for update in range(10):
+            queue.put(update)
+        queue.stop()
+
+        assert handler.updates == list(range(10))
+
+    def test_handler_errors_dont_stop_the_worker(self):
+        updates = []
+
+        def handler(update):
+            if update == 1:
+                raise ValueError("Failed update")
+            updates.append(update)
+
+        queue = LoggerQueue("test", handler, 10, BLOCK)
+        queue.start()
+        for update in range(3):
+            queue.put(update)
+        queue.stop()
+
+        assert updates == [0, 2]
+
+    def test_not_supported_drop_policy(self):
+        with pytest.raises(ValueError):
+            LoggerQueue("test", print, 10, "drop_all")
+
+    def test_loggers_run_in_the_processing_thread_by_default(self, metrics_config, tmp_path):
+        metrics_config.set_option_in_section("SourceLogger_2", "ScreenshotsDirectory", str(tmp_path / "screenshots"))
+        metrics_config.save(str(tmp_path / "config-x86-openvino.ini"))
+        metrics_config.reload()
+
+        assert Logger(metrics_config, "Source_0", "SourceLogger_2").queue is None
+
+
+# pytest -v api/tests/loggers/test_source_loggers.py::TestsRawDataLogger
+class TestsRawDataLogger:
+    """Logging interval of the objects"""
+
+    def test_interval_is_measured_with_the_time_of_the_frames(self, metrics_config, tmp_path):
+        logger = file_system_logger(metrics_config, tmp_path, 1)
+        objects = DetectionBatch.from_bboxes([[0.1, 0.2, 0.3, 0.4]], (640, 480))
+        start_time = datetime(2020, 10, 1, 10, 0, 0)
+
+        # The updates are processed at once (e.g. after waiting in the queue of the logger)
+        for seconds in [0, 0.5, 1.2, 1.8, 2.5, 3, 3.6]:
+            logger.update(None, objects, {}, 10, start_time + timedelta(seconds=seconds))
+        logger.stop_logging()
+
+        with open(os.path.join(logger.objects_log_directory, f"{start_time.date()}.csv"), newline="") as csv_file:
+            timestamps = [row["Timestamp"] for row in csv.DictReader(csv_file)]
+        assert timestamps == ["2020-10-01 10:00:00", "2020-10-01 10:00:01", "2020-10-01 10:00:02",
+                              "2020-10-01 10:00:03"]
@@ -0,0 +1,76 @@
+import numpy as np
+import os
+
+from datetime import date, datetime, time, timedelta
+
+from libs.metrics.social_distancing import SocialDistancingHeatmaps
+from libs.metrics.utils import compute_camera_daily_metrics, compute_camera_hourly_metrics
+from libs.utils.loggers import get_source_log_directory
+from api.tests.metrics.test_hourly_metrics import generate_objects_log_rows
+from api.tests.utils.common_functions import write_objects_log
+# The line below is absolutely necessary. Fixtures are passed as arguments to test functions.
+# This is why the IDE cannot recognize them.
+from api.tests.utils.fixtures_tests import metrics_config
+
+
+def expected_heatmaps(heatmaps, rows):
+    bboxes = np.array([detection["bbox"] for _, detections, _ in rows for detection in detections]).reshape(-1, 4)
+    violations = np.array(
+        [index in violations_indexes for _, detections, violations_indexes in rows for index in range(len(detections))]
+    )
+    return heatmaps.get_heatmap_counts(bboxes), heatmaps.get_heatmap_counts(bboxes[violations])
+
+
+def assert_heatmap(heatmaps_directory, report_type, report_date, counts, tmp_path):
+    """Checks that the stored heatmap is the one of the `counts` grid"""
+    expected_file = str(tmp_path / "expected_heatmap")
+    SocialDistancingHeatmaps.save_heatmap(counts, expected_file)
+    heatmap = np.load(os.path.join(heatmaps_directory, f"{report_type}_heatmap_{report_date}.npy"))
+    assert np.array_equal(heatmap, np.load(expected_file + ".npy"))
+
+
+# pytest -v api/tests/metrics/test_heatmaps.py::TestsHeatmaps
+class TestsHeatmaps:
+    """Heatmaps accumulated by the hourly metrics task"""
+
+    def test_hourly_runs_accumulate_the_heatmaps(self, metrics_config, tmp_path):
+        camera = metrics_config.get_video_sources()[0]
+        camera_directory = os.path.join(get_source_log_directory(metrics_config), camera["id"])
+        rows = generate_objects_log_rows(date.today(), range(4))
+        write_objects_log(os.path.join(camera_directory, "objects_log", f"{date.today()}.csv"), rows)
+
+        compute_camera_hourly_metrics(metrics_config, camera, current_hour=2)
+        compute_camera_hourly_metrics(metrics_config, camera, current_hour=4)
+
+        heatmaps_directory = os.path.join(camera_directory, "heatmaps")
+        detections, violations = expected_heatmaps(SocialDistancingHeatmaps(metrics_config), rows)
+        assert_heatmap(heatmaps_directory, "detections", date.today(), detections, tmp_path)
+        assert_heatmap(heatmaps_directory, "violations", date.today(), violations, tmp_path)
+        with np.load(os.path.join(heatmaps_directory, f"heatmap_counts_{date.today()}.npz")) as stored_counts:
+            assert np.array_equal(stored_counts["counts"], [detections, violations])
+            assert str(stored_counts["time_until"]) == f"{date.today()} 04:00:00"
+
+    def test_daily_task_adds_the_hours_missed_at_midnight(self, metrics_config, tmp_path):
+        camera = metrics_config.get_video_sources()[0]
+        camera_directory = os.path.join(get_source_log_directory(metrics_config), camera["id"])
+        yesterday = date.today() - timedelta(days=1)
+        rows = generate_objects_log_rows(yesterday, range(21, 24))
+        write_objects_log(os.path.join(camera_directory, "objects_log", f"{yesterday}.csv"), rows)
+        # The heatmaps were updated until 23:00, the midnight run didn't happen
+        heatmaps = SocialDistancingHeatmaps(metrics_config)
+        previous_hours = [row for row in rows if row[0] < f"{yesterday} 23:00:00"]
+        heatmaps_directory = os.path.join(camera_directory, "heatmaps")
+        os.makedirs(heatmaps_directory)
+        np.savez(
+            os.path.join(heatmaps_directory, f"heatmap_counts_{yesterday}.npz"),
+            counts=np.array(expected_heatmaps(heatmaps, previous_hours)),
+            time_until=datetime.combine(yesterday, time(23)).strftime("%Y-%m-%d %H:%M:%S")
+        )
+
+        compute_camera_daily_metrics(metrics_config, camera)
+
+        detections, violations = expected_heatmaps(heatmaps, rows)
+        assert_heatmap(heatmaps_directory, "detections", yesterday, detections, tmp_path)
+        assert_heatmap(heatmaps_directory, "violations", yesterday, violations, tmp_path)
+        with np.load(os.path.join(heatmaps_directory, f"heatmap_counts_{yesterday}.npz")) as stored_counts:
+            assert str(stored_counts["time_until"]) == f"{date.today()} 00:00:00"
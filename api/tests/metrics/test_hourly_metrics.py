@@ -0,0 +1,126 @@
+import csv
+import os
+
+from datetime import date, datetime, time, timedelta
+
+from libs.metrics.base import compute_sources_hourly_metrics
+from libs.metrics.face_mask_usage import FaceMaskUsageMetric
+from libs.metrics.social_distancing import SocialDistancingMetric
+from libs.utils.loggers import get_source_log_directory
+from api.tests.utils.common_functions import write_objects_log
+# The line below is absolutely necessary. Fixtures are passed as arguments to test functions.
+# This is why the IDE cannot recognize them.
+from api.tests.utils.fixtures_tests import metrics_config
+
+CAMERA = {"id": "camera"}
+
+
+def generate_objects_log_rows(log_date, hours):
+    """Rows of 3 people logged every 5 seconds during the first 10 minutes of each hour"""
+    rows = []
+    for hour in hours:
+        for second in range(0, 600, 5):
+            detections = []
+            for person in range(3):
+                detections.append({
+                    "position": [0.0, 0.0, 0.0],
+                    "bbox": [0.1 * person, 0.2, 0.1 * person + 0.1, 0.6],
+                    "tracking_id": person + 10 * hour,
+                    "face_label": (second // (20 * (person + 1))) % 2
+                })
+            # The first two people violate the social distancing during a part of each minute
+            violations_indexes = [0, 1] if second % 60 < 35 else []
+            timestamp = datetime.combine(log_date, time(hour)) + timedelta(seconds=second)
+            rows.append((timestamp.strftime("%Y-%m-%d %H:%M:%S"), detections, violations_indexes))
+    return rows
+
+
+def read_report(report_file):
+    with open(report_file, newline="") as csvfile:
+        return list(csv.DictReader(csvfile))
+
+
+def write_report(report_file, metric, rows_count):
+    os.makedirs(os.path.dirname(report_file), exist_ok=True)
+    with open(report_file, "w", newline="") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=metric.csv_headers)
+        writer.writeheader()
+        writer.writerows({header: 0 for header in metric.csv_headers} for _ in range(rows_count))
+
+
+def run_hourly_task(metric, base_directory, current_hour, entity=CAMERA):
+    """Computes the pending hourly reports of the `metric` as `compute_hourly_metrics` does"""
+    task = metric.get_hourly_report_task(base_directory, entity, current_hour)
+    csv_data = metric.generate_hourly_csv_data(
+        entity, task["entity_csv"], task["time_from"], task["time_until"], task["checkpoint"])
+    metric.write_hourly_report(task, csv_data)
+    return task
+
+
+# pytest -v api/tests/metrics/test_hourly_metrics.py::TestsHourlyCheckpoints
+class TestsHourlyCheckpoints:
+    """Incremental computation of the hourly reports"""
+
+    def test_incremental_runs_match_a_single_run(self, tmp_path):
+        for metric in [SocialDistancingMetric, FaceMaskUsageMetric]:
+            rows = generate_objects_log_rows(date.today(), range(4))
+            for base_directory in [tmp_path / "incremental", tmp_path / "single"]:
+                write_objects_log(str(base_directory / CAMERA["id"] / "objects_log" / f"{date.today()}.csv"), rows)
+
+            first_task = run_hourly_task(metric, str(tmp_path / "incremental"), 2)
+            second_task = run_hourly_task(metric, str(tmp_path / "incremental"), 4)
+            single_task = run_hourly_task(metric, str(tmp_path / "single"), 4)
+
+            # The second run starts at the first row of the hour 2
+            assert second_task["time_from"] == datetime.combine(date.today(), time(2))
+            with open(first_task["entity_csv"], "rb") as log:
+                log.seek(first_task["checkpoint"]["offset"])
+                assert log.readline().decode().startswith(f"1.0,{date.today()} 02:00:00,")
+            incremental_report = read_report(second_task["daily_csv"])
+            assert len(incremental_report) == 4
+            assert incremental_report == read_report(single_task["daily_csv"])
+
+    def test_report_without_checkpoint_is_resumed_at_the_next_hour(self, tmp_path):
+        base_directory = str(tmp_path)
+        reports_directory = os.path.join(base_directory, CAMERA["id"], "reports", SocialDistancingMetric.reports_folder)
+        write_report(os.path.join(reports_directory, f"report_{date.today()}.csv"), SocialDistancingMetric, 3)
+
+        task = SocialDistancingMetric.get_hourly_report_task(base_directory, CAMERA, 5)
+
+        assert task["time_from"] == datetime.combine(date.today(), time(3))
+        assert task["checkpoint"] == {"offset": 0, "report_rows": 3}
+
+    def test_complete_report_without_checkpoint_is_not_processed(self, tmp_path):
+        base_directory = str(tmp_path)
+        yesterday = date.today() - timedelta(days=1)
+        reports_directory = os.path.join(base_directory, CAMERA["id"], "reports", SocialDistancingMetric.reports_folder)
+        write_report(os.path.join(reports_directory, f"report_{yesterday}.csv"), SocialDistancingMetric, 24)
+
+        assert SocialDistancingMetric.get_hourly_report_task(base_directory, CAMERA, 0) is None
+
+
+# pytest -v api/tests/metrics/test_hourly_metrics.py::TestsSinglePassHourlyMetrics
+class TestsSinglePassHourlyMetrics:
+    """Hourly reports of the camera metrics computed parsing the objects log once"""
+
+    def test_reports_match_the_reports_of_each_metric(self, metrics_config, tmp_path):
+        camera = metrics_config.get_video_sources()[0]
+        rows = generate_objects_log_rows(date.today(), range(5))
+        single_pass_directory = get_source_log_directory(metrics_config)
+        per_metric_directory = str(tmp_path / "per_metric")
+        for base_directory in [single_pass_directory, per_metric_directory]:
+            write_objects_log(os.path.join(base_directory, camera["id"], "objects_log", f"{date.today()}.csv"), rows)
+
+        compute_sources_hourly_metrics(
+            metrics_config, [SocialDistancingMetric, FaceMaskUsageMetric], [camera], current_hour=3)
+        compute_sources_hourly_metrics(
+            metrics_config, [SocialDistancingMetric, FaceMaskUsageMetric], [camera], current_hour=5)
+        for metric in [SocialDistancingMetric, FaceMaskUsageMetric]:
+            for current_hour in [3, 5]:
+                run_hourly_task(metric, per_metric_directory, current_hour, camera)
+
+        for metric in [SocialDistancingMetric, FaceMaskUsageMetric]:
+            report_file = os.path.join("reports", metric.reports_folder, f"report_{date.today()}.csv")
+            single_pass_report = read_report(os.path.join(single_pass_directory, camera["id"], report_file))
+            assert len(single_pass_report) == 5
+            assert single_pass_report == read_report(os.path.join(per_metric_directory, camera["id"], report_file))
@@ -0,0 +1,105 @@
+import os
+
+from libs.metrics.reports_cache import ReportsCache
+
+
+class ReportGenerator:
+    """Generates a new report on each call"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"Hours": list(range(3)), "DetectedObjects": [self.calls] * 3}
+
+
+def write_file(file_path, content, mtime_ns=None):
+    with open(file_path, "w") as report_file:
+        report_file.write(content)
+    if mtime_ns is not None:
+        os.utime(file_path, ns=(mtime_ns, mtime_ns))
+    return str(file_path)
+
+
+# pytest -v api/tests/metrics/test_reports_cache.py::TestsReportsCache
+class TestsReportsCache:
+    """LRU cache of the reports of the metrics"""
+
+    def test_hit_while_the_files_dont_change(self, tmp_path):
+        cache = ReportsCache()
+        files = [write_file(tmp_path / "report.csv", "a,b\n1,2\n"), write_file(tmp_path / "live.csv", "a\n1\n")]
+        generate_report = ReportGenerator()
+
+        first_report = cache.get("key", files, generate_report)
+        second_report = cache.get("key", files, generate_report)
+
+        assert generate_report.calls == 1
+        assert second_report == first_report
+        assert cache.get_stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    def test_modification_time_change_invalidates_the_report(self, tmp_path):
+        cache = ReportsCache()
+        report_file = write_file(tmp_path / "report.csv", "a,b\n1,2\n", mtime_ns=1_000_000_000)
+        generate_report = ReportGenerator()
+        cache.get("key", [report_file], generate_report)
+
+        # Same size, different modification time
+        write_file(report_file, "a,b\n3,4\n", mtime_ns=2_000_000_000)
+
+        assert cache.get("key", [report_file], generate_report)["DetectedObjects"] == [2] * 3
+        assert generate_report.calls == 2
+
+    def test_size_change_invalidates_the_report(self, tmp_path):
+        cache = ReportsCache()
+        report_file = write_file(tmp_path / "report.csv", "a,b\n1,2\n", mtime_ns=1_000_000_000)
+        generate_report = ReportGenerator()
+        cache.get("key", [report_file], generate_report)
+
+        # Same modification time, different size
+        write_file(report_file, "a,b\n1,2\n3,4\n", mtime_ns=1_000_000_000)
+
+        assert cache.get("key", [report_file], generate_report)["DetectedObjects"] == [2] * 3
+
+    def test_missing_files(self, tmp_path):
+        cache = ReportsCache()
+        report_file = str(tmp_path / "report.csv")
+        generate_report = ReportGenerator()
+
+        # The missing file is part of the signature, the report is cached until the file is created
+        cache.get("key", [report_file], generate_report)
+        cache.get("key", [report_file], generate_report)
+        assert generate_report.calls == 1
+        write_file(report_file, "a,b\n1,2\n")
+        cache.get("key", [report_file], generate_report)
+        assert generate_report.calls == 2
+        os.remove(report_file)
+        cache.get("key", [report_file], generate_report)
+        assert generate_report.calls == 3
+
+    def test_least_recently_used_reports_are_discarded(self, tmp_path):
+        cache = ReportsCache(max_entries=2)
+        files = [write_file(tmp_path / "report.csv", "a,b\n1,2\n")]
+        generators = {key: ReportGenerator() for key in ["first", "second", "third"]}
+
+        cache.get("first", files, generators["first"])
+        cache.get("second", files, generators["second"])
+        # The first report is used again, the second one is the least recently used
+        cache.get("first", files, generators["first"])
+        cache.get("third", files, generators["third"])
+        for key in ["third", "first", "second"]:
+            cache.get(key, files, generators[key])
+
+        assert {key: generator.calls for key, generator in generators.items()} == {"first": 1, "second": 2, "third": 1}
+        assert cache.get_stats()["entries"] == 2
+
+    def test_returned_reports_are_copies(self, tmp_path):
+        cache = ReportsCache()
+        files = [write_file(tmp_path / "report.csv", "a,b\n1,2\n")]
+        generate_report = ReportGenerator()
+
+        cache.get("key", files, generate_report)["DetectedObjects"].append(10)
+        cache.get("key", files, generate_report)["Hours"] = []
+
+        assert cache.get("key", files, generate_report) == {"Hours": [0, 1, 2], "DetectedObjects": [1, 1, 1]}
+        assert generate_report.calls == 1
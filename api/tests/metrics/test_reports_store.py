@@ -0,0 +1,138 @@
+import csv
+import os
+
+from datetime import date, timedelta
+
+from libs.metrics.face_mask_usage import FaceMaskUsageMetric
+from libs.metrics.reports_store import DAILY_REPORT_HOUR, REPORTS_STORE_FILE, ReportsStore
+from libs.metrics.social_distancing import SocialDistancingMetric
+
+START_DATE = date(2020, 10, 1)
+ENTITIES = ["camera_0", "camera_1"]
+
+
+def report_row(metric, entity_index, day, hour):
+    return {header: (entity_index + 1) * 1000 + day * 100 + hour + index
+            for index, header in enumerate(metric.csv_headers)}
+
+
+def write_csv(file_path, headers, rows):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", newline="") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=headers)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_csv_reports(base_directory, metric, days=3, hours=24):
+    """Writes the hourly reports of each day and the daily report of the ENTITIES"""
+    for entity_index, entity in enumerate(ENTITIES):
+        reports_directory = os.path.join(base_directory, entity, "reports", metric.reports_folder)
+        daily_rows = []
+        for day in range(days):
+            report_date = START_DATE + timedelta(days=day)
+            hourly_rows = [report_row(metric, entity_index, day, hour) for hour in range(hours)]
+            write_csv(os.path.join(reports_directory, f"report_{report_date}.csv"), metric.csv_headers, hourly_rows)
+            daily_rows.append({"Date": str(report_date), **report_row(metric, entity_index, day, DAILY_REPORT_HOUR)})
+        write_csv(os.path.join(reports_directory, "report.csv"), ["Date"] + metric.csv_headers, daily_rows)
+        # Other files of the reports directory
+        write_csv(os.path.join(reports_directory, "live.csv"), metric.csv_headers, [report_row(metric, 0, 0, 0)])
+
+
+def expected_reports(metric, entities_indexes, days, hourly, hours=24):
+    reports = {}
+    for day in days:
+        for hour in range(hours) if hourly else [DAILY_REPORT_HOUR]:
+            values = {header: 0 for header in metric.csv_headers}
+            for entity_index in entities_indexes:
+                for header, value in report_row(metric, entity_index, day, hour).items():
+                    values[header] += value
+            reports[(str(START_DATE + timedelta(days=day)), hour)] = values
+    return reports
+
+
+# pytest -v api/tests/metrics/test_reports_store.py::TestsReportsStore
+class TestsReportsStore:
+    """SQLite store of the hourly and daily reports"""
+
+    def test_missing_store(self, tmp_path):
+        assert ReportsStore.get_store(str(tmp_path)) is None
+        assert ReportsStore.get_store(None) is None
+
+    def test_import_existing_csv_reports(self, tmp_path):
+        base_directory = str(tmp_path)
+        for metric in [SocialDistancingMetric, FaceMaskUsageMetric]:
+            write_csv_reports(base_directory, metric)
+
+        ReportsStore.create(base_directory, [SocialDistancingMetric, FaceMaskUsageMetric])
+
+        store = ReportsStore.get_store(base_directory)
+        assert store.db_path == os.path.join(base_directory, REPORTS_STORE_FILE)
+        assert not os.path.exists(store.db_path + ".tmp")
+        for metric in [SocialDistancingMetric, FaceMaskUsageMetric]:
+            for entity_index, entity in enumerate(ENTITIES):
+                assert store.get_reports(metric.reports_folder, [entity], START_DATE, START_DATE + timedelta(days=2),
+                                         hourly=True) == expected_reports(metric, [entity_index], range(3), True)
+                assert store.get_reports(metric.reports_folder, [entity], START_DATE, START_DATE + timedelta(days=2),
+                                         hourly=False) == expected_reports(metric, [entity_index], range(3), False)
+
+    def test_hourly_and_daily_ranges(self, tmp_path):
+        base_directory = str(tmp_path)
+        write_csv_reports(base_directory, SocialDistancingMetric, days=5)
+        store = ReportsStore.create(base_directory, [SocialDistancingMetric])
+        metric = SocialDistancingMetric.reports_folder
+        from_date, to_date = START_DATE + timedelta(days=1), START_DATE + timedelta(days=3)
+
+        assert store.get_reports(metric, ENTITIES, from_date, to_date, hourly=True) == expected_reports(
+            SocialDistancingMetric, [0, 1], range(1, 4), True)
+        assert store.get_reports(metric, ENTITIES, from_date, to_date, hourly=False) == expected_reports(
+            SocialDistancingMetric, [0, 1], range(1, 4), False)
+        # A single day, the same entity received twice (e.g. a camera of two areas) and a range without reports
+        assert store.get_reports(metric, ["camera_1", "camera_1"], from_date, from_date, hourly=False) == \
+            expected_reports(SocialDistancingMetric, [1, 1], [1], False)
+        assert store.get_reports(metric, ENTITIES, date(2021, 1, 1), date(2021, 1, 7), hourly=True) == {}
+        assert store.get_reports(FaceMaskUsageMetric.reports_folder, ENTITIES, from_date, to_date, hourly=True) == {}
+
+    def test_written_reports_replace_the_imported_ones(self, tmp_path):
+        base_directory = str(tmp_path)
+        write_csv_reports(base_directory, SocialDistancingMetric, days=1)
+        store = ReportsStore.create(base_directory, [SocialDistancingMetric])
+        row = {header: 7 for header in SocialDistancingMetric.csv_headers}
+
+        store.write_reports(SocialDistancingMetric.reports_folder, "camera_0", SocialDistancingMetric.csv_headers,
+                            [(START_DATE, 5, row)])
+
+        reports = store.get_reports(SocialDistancingMetric.reports_folder, ["camera_0"], START_DATE, START_DATE, True)
+        assert reports[(str(START_DATE), 5)] == row
+        assert reports[(str(START_DATE), 6)] == report_row(SocialDistancingMetric, 0, 0, 6)
+
+    def test_reports_match_the_csv_reports(self, tmp_path, monkeypatch):
+        base_directory = str(tmp_path)
+        monkeypatch.setenv("SourceLogDirectory", base_directory)
+        # The report of the last day is incomplete
+        write_csv_reports(base_directory, SocialDistancingMetric, days=3)
+        write_csv(
+            os.path.join(base_directory, "camera_0", "reports", SocialDistancingMetric.reports_folder,
+                         f"report_{START_DATE + timedelta(days=3)}.csv"),
+            SocialDistancingMetric.csv_headers,
+            [report_row(SocialDistancingMetric, 0, 3, hour) for hour in range(10)]
+        )
+        to_date = START_DATE + timedelta(days=4)
+        hourly_reports = [SocialDistancingMetric.get_hourly_report(ENTITIES, START_DATE + timedelta(days=day))
+                          for day in range(5)]
+        daily_report = SocialDistancingMetric.get_daily_report(ENTITIES, START_DATE - timedelta(days=1), to_date)
+
+        # The reports are read from the CSV files when the store is missing
+        assert ReportsStore.get_store(base_directory) is None
+        assert hourly_reports[1]["DetectedObjects"] == [
+            report_row(SocialDistancingMetric, 0, 1, hour)["DetectedObjects"] +
+            report_row(SocialDistancingMetric, 1, 1, hour)["DetectedObjects"] for hour in range(24)
+        ]
+        assert daily_report["DetectedObjects"][0] == 0
+
+        ReportsStore.create(base_directory, [SocialDistancingMetric])
+
+        assert [SocialDistancingMetric.get_hourly_report(ENTITIES, START_DATE + timedelta(days=day))
+                for day in range(5)] == hourly_reports
+        assert SocialDistancingMetric.get_daily_report(ENTITIES, START_DATE - timedelta(days=1), to_date) == \
+            daily_report
@@ -0,0 +1,171 @@
+import numpy as np
+import pytest
+
+from datetime import datetime, timedelta
+
+from libs.metrics.face_mask_usage import FaceMaskUsageMetric
+from libs.metrics.social_distancing import SocialDistancingMetric
+from libs.utils.objects_log import encode_timestamp
+
+START_TIME = datetime(2020, 10, 1, 10, 0, 0)
+
+
+def legacy_process_distance_violation_for_object(distance_violations, processing_count_threshold):
+    """State machine used to summarize the social distancing detections of a person before the vectorized version"""
+    current_status = None
+    processing_status = None
+    processing_count = 0
+    current_status_start_time = None
+    processing_start_time = None
+
+    CRITICAL_THRESHOLD = 60
+    HIGH_THRESHOLD = 30
+    LOW_TRESHOLD = 10
+
+    detections = []
+    if distance_violations:
+        for dist_violation in distance_violations:
+            status = dist_violation["infrigement"]
+            if processing_status != status:
+                processing_status = status
+                processing_start_time = dist_violation["time"]
+                processing_count = 0
+            processing_count += 1
+            if current_status != processing_status and processing_count >= processing_count_threshold:
+                if current_status is not None:
+                    seconds_in_status = (processing_start_time - current_status_start_time).seconds
+                    detections.append({"status": status, "seconds": seconds_in_status})
+                current_status = processing_status
+                current_status_start_time = processing_start_time
+        if current_status:
+            seconds_in_status = (distance_violations[-1]["time"] - current_status_start_time).seconds
+            detections.append({"status": status, "seconds": seconds_in_status})
+    detected_objects, no_infringements, low_infringements, high_infringements, critical_infringements = 0, 0, 0, 0, 0
+    for detection in detections:
+        detected_objects += 1
+        if not detection["status"] or detection["seconds"] < LOW_TRESHOLD:
+            no_infringements += 1
+        elif LOW_TRESHOLD <= detection["seconds"] < HIGH_THRESHOLD:
+            low_infringements += 1
+        elif HIGH_THRESHOLD <= detection["seconds"] < CRITICAL_THRESHOLD:
+            high_infringements += 1
+        else:
+            critical_infringements += 1
+    return detected_objects, no_infringements, low_infringements, high_infringements, critical_infringements
+
+
+def legacy_process_face_labels_for_object(face_labels, processing_count_threshold):
+    """State machine used to summarize the face labels of a person before the vectorized version"""
+    no_face_detections = 0
+    mask_detections = 0
+    no_mask_detections = 0
+    current_status = None
+    processing_status = None
+    processing_count = 0
+    for face_label in face_labels:
+        if processing_status != face_label:
+            processing_status = face_label
+            processing_count = 0
+        processing_count += 1
+        if current_status != processing_status and processing_count >= processing_count_threshold:
+            current_status = processing_status
+            if current_status == -1:
+                no_face_detections += 1
+            elif current_status == 0:
+                mask_detections += 1
+            else:
+                no_mask_detections += 1
+    return no_face_detections, mask_detections, no_mask_detections
+
+
+def legacy_summaries(detections):
+    """
+    Returns the social distancing and face mask summaries computed with the state machines, the `detections` are
+    (seconds since START_TIME, track id, violation, face label) tuples in chronological order.
+    """
+    tracks = {}
+    for seconds, track_id, violation, face_label in detections:
+        track = tracks.setdefault(track_id, {"distance_violations": [], "face_labels": []})
+        track["distance_violations"].append(
+            {"time": START_TIME + timedelta(seconds=seconds), "infrigement": violation})
+        track["face_labels"].append(face_label)
+    distancing_summary = np.zeros(5, dtype=int)
+    face_mask_summary = np.zeros(3, dtype=int)
+    for track in tracks.values():
+        distancing_summary += legacy_process_distance_violation_for_object(
+            track["distance_violations"], SocialDistancingMetric.processing_count_threshold)
+        face_mask_summary += legacy_process_face_labels_for_object(
+            track["face_labels"], FaceMaskUsageMetric.processing_count_threshold)
+    return distancing_summary.tolist(), face_mask_summary.tolist()
+
+
+def vectorized_summaries(detections):
+    seconds = [detection[0] for detection in detections]
+    track_ids = [detection[1] for detection in detections]
+    violations = [detection[2] for detection in detections]
+    face_labels = [detection[3] for detection in detections]
+    times = encode_timestamp(START_TIME) + np.array(seconds, dtype=np.int64)
+    distancing_summary = SocialDistancingMetric.process_distance_violations(track_ids, times, violations)
+    face_mask_summary = FaceMaskUsageMetric.process_face_labels(track_ids, face_labels)
+    return list(distancing_summary), list(face_mask_summary)
+
+
+def single_track(states, seconds_step=1):
+    """Detections of a single track with the given (violation, face label) states"""
+    return [(index * seconds_step, 7, violation, face_label) for index, (violation, face_label) in enumerate(states)]
+
+
+def random_detections(seed):
+    """Detections of several tracks in frames logged every 1-5 seconds, with random flickering states"""
+    random = np.random.RandomState(seed)
+    detections = []
+    tracks_states = {}
+    seconds = 0
+    for _ in range(random.randint(1, 400)):
+        seconds += int(random.randint(1, 6))
+        for track_id in random.choice(8, size=random.randint(0, 5), replace=False).tolist():
+            violation, face_label = tracks_states.get(track_id, (False, -1))
+            if random.rand() < 0.3:
+                violation = bool(random.rand() < 0.5)
+            if random.rand() < 0.3:
+                face_label = int(random.randint(-1, 2))
+            tracks_states[track_id] = (violation, face_label)
+            detections.append((seconds, track_id, violation, face_label))
+    return detections
+
+
+# pytest -v api/tests/metrics/test_track_summaries.py::TestsTrackSummaries
+class TestsTrackSummaries:
+    """The run-length summaries of the tracks match the previous state machines"""
+
+    @pytest.mark.parametrize("detections", [
+        # Empty log
+        [],
+        # Single frame
+        [(0, 1, True, 0)],
+        [(0, 1, True, 0), (0, 2, False, 1), (0, 3, True, -1)],
+        # Flicker shorter than the threshold
+        single_track([(True, 0)] * 5 + [(False, 1)] * 2 + [(True, 0)] * 30, seconds_step=2),
+        single_track([(False, 1)] * 4 + [(True, -1)] + [(False, 1)] + [(True, -1)] * 2 + [(False, 1)] * 4),
+        # Track ending in the middle of a run shorter than the threshold
+        single_track([(False, 0)] * 3 + [(True, 1)] * 40 + [(False, -1)] * 2, seconds_step=2),
+        # Track ending in the middle of a violation
+        single_track([(False, 0)] * 6 + [(True, 1)] * 25, seconds_step=3),
+        # Runs exactly as long as the threshold and infringements in the limits of the categories
+        single_track([(True, 0)] * 3 + [(False, 1)] * 3 + [(True, 0)] * 11 + [(False, 1)] * 3, seconds_step=1),
+        single_track([(False, 0)] * 3 + [(True, 1)] * 31 + [(False, 0)] * 3 + [(True, 1)] * 61 + [(False, 0)] * 3),
+        # Interleaved tracks
+        [(second, second % 2, second % 10 < 6, int(second % 14 < 7)) for second in range(200)],
+    ])
+    def test_summaries_match_the_state_machines(self, detections):
+        assert vectorized_summaries(detections) == legacy_summaries(detections)
+
+    @pytest.mark.parametrize("seed", range(50))
+    def test_random_logs_match_the_state_machines(self, seed):
+        detections = random_detections(seed)
+        assert vectorized_summaries(detections) == legacy_summaries(detections)
+
+    def test_hour_without_detections(self):
+        assert SocialDistancingMetric.generate_hourly_metric_data({}).tolist() == []
+        assert SocialDistancingMetric.generate_hourly_metric_data({10: {}}).tolist() == [[0, 0, 0, 0, 0]]
+        assert FaceMaskUsageMetric.generate_hourly_metric_data({10: {}}).tolist() == [[0, 0, 0]]
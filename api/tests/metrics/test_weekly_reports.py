@@ -0,0 +1,138 @@
+import numpy as np
+import os
+import pandas as pd
+import pytest
+
+from datetime import date, timedelta
+from statistics import mean
+
+from libs.metrics.base import parse_date_range
+from libs.metrics.occupancy import OccupancyMetric
+from libs.metrics.reports_store import ReportsStore
+from libs.metrics.social_distancing import SocialDistancingMetric
+from api.tests.metrics.test_reports_store import write_csv
+
+ENTITIES = ["entity_0", "entity_1"]
+
+
+def expected_weeks(from_date, to_date):
+    """Weeks (Monday to Sunday) of the range computed day by day"""
+    weeks = []
+    current_date = from_date
+    while current_date <= to_date:
+        week_end = min(current_date + timedelta(days=6 - current_date.weekday()), to_date)
+        weeks.append((current_date, week_end))
+        current_date = week_end + timedelta(days=1)
+    return weeks
+
+
+def legacy_weekly_report(metric, entities, number_of_weeks=0, from_date=None, to_date=None):
+    """Weekly report computed reading the daily report of each week, as it was done before the single read"""
+    number_of_days = number_of_weeks * 7
+    if number_of_days > 0:
+        date_range = pd.date_range(end=date.today() - timedelta(days=1), periods=number_of_days)
+        week_span = list(zip(date_range[0::7], date_range[6::7]))
+    elif isinstance(from_date, date) and isinstance(to_date, date):
+        week_span = list(parse_date_range(pd.date_range(start=from_date, end=to_date)))
+    else:
+        week_span = []
+    report = {"Weeks": []}
+    for header in metric.csv_headers:
+        report[header] = []
+    for start_date, end_date in week_span:
+        report["Weeks"].append(f"{start_date.strftime('%Y-%m-%d')} {end_date.strftime('%Y-%m-%d')}")
+        week_data = metric.get_daily_report(entities, start_date, end_date)
+        if metric is OccupancyMetric:
+            report["AverageOccupancy"].append(round(mean(week_data["AverageOccupancy"]), 2))
+            report["MaxOccupancy"].append(max(week_data["MaxOccupancy"]))
+            report["OccupancyThreshold"].append(max(week_data["OccupancyThreshold"]))
+        else:
+            for header in metric.csv_headers:
+                report[header].append(sum(week_data[header]))
+    return report
+
+
+def write_daily_reports(base_directory, metric, from_date, to_date):
+    """Writes random daily reports of the ENTITIES, the first entity has no report of some days"""
+    random = np.random.RandomState(0)
+    for entity_index, entity in enumerate(ENTITIES):
+        rows = []
+        for report_date in pd.date_range(from_date, to_date):
+            if entity_index == 0 and report_date.day % 5 == 0:
+                continue
+            values = random.randint(0, 100, len(metric.csv_headers)).tolist()
+            rows.append({"Date": report_date.strftime("%Y-%m-%d"), **dict(zip(metric.csv_headers, values))})
+        write_csv(os.path.join(base_directory, entity, "reports", metric.reports_folder, "report.csv"),
+                  ["Date"] + metric.csv_headers, rows)
+
+
+# pytest -v api/tests/metrics/test_weekly_reports.py::TestsParseDateRange
+class TestsParseDateRange:
+    """Weeks of the date ranges of the weekly reports"""
+
+    @pytest.mark.parametrize("start_day", range(7))
+    @pytest.mark.parametrize("number_of_days", [1, 2, 5, 6, 7, 8, 13, 14, 15, 30])
+    def test_weeks_end_on_sunday(self, start_day, number_of_days):
+        # 2020-10-05 is a Monday
+        from_date = date(2020, 10, 5) + timedelta(days=start_day)
+        to_date = from_date + timedelta(days=number_of_days - 1)
+
+        weeks = [(start.date(), end.date()) for start, end in parse_date_range(pd.date_range(from_date, to_date))]
+
+        assert weeks == expected_weeks(from_date, to_date)
+
+    def test_range_ending_the_day_before_sunday(self):
+        # From Monday to Saturday, the end of the week is out of the range
+        weeks = list(parse_date_range(pd.date_range(date(2020, 10, 5), date(2020, 10, 10))))
+
+        assert [(start.date(), end.date()) for start, end in weeks] == [(date(2020, 10, 5), date(2020, 10, 10))]
+
+    def test_empty_range(self):
+        assert list(parse_date_range(pd.date_range(date(2020, 10, 5), date(2020, 10, 4)))) == []
+
+
+# pytest -v api/tests/metrics/test_weekly_reports.py::TestsWeeklyReports
+class TestsWeeklyReports:
+    """Weekly reports grouped from a single read of the daily reports"""
+
+    @pytest.mark.parametrize("metric", [SocialDistancingMetric, OccupancyMetric])
+    @pytest.mark.parametrize("reports_store", [False, True])
+    def test_reports_match_the_legacy_reports(self, tmp_path, monkeypatch, metric, reports_store):
+        base_directory = str(tmp_path)
+        monkeypatch.setenv("SourceLogDirectory", base_directory)
+        monkeypatch.setenv("AreaLogDirectory", base_directory)
+        write_daily_reports(base_directory, metric, date.today() - timedelta(days=70), date.today())
+        if reports_store:
+            ReportsStore.create(base_directory, [metric])
+        ranges = [
+            # Partial first and last weeks
+            (date.today() - timedelta(days=40), date.today() - timedelta(days=2)),
+            # Seven days, a single day and the whole range of the reports
+            (date.today() - timedelta(days=13), date.today() - timedelta(days=7)),
+            (date.today() - timedelta(days=8), date.today() - timedelta(days=8)),
+            (date.today() - timedelta(days=70), date.today()),
+            # A range without reports
+            (date.today() + timedelta(days=10), date.today() + timedelta(days=30)),
+        ]
+
+        for from_date, to_date in ranges:
+            assert metric.get_weekly_report(ENTITIES, from_date=from_date, to_date=to_date) == legacy_weekly_report(
+                metric, ENTITIES, from_date=from_date, to_date=to_date)
+        for number_of_weeks in [1, 4, 9]:
+            assert metric.get_weekly_report(ENTITIES, number_of_weeks) == legacy_weekly_report(
+                metric, ENTITIES, number_of_weeks)
+        assert metric.get_weekly_report(["entity_1"], from_date=ranges[0][0], to_date=ranges[0][1]) == \
+            legacy_weekly_report(metric, ["entity_1"], from_date=ranges[0][0], to_date=ranges[0][1])
+
+    def test_partial_first_week(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("SourceLogDirectory", str(tmp_path))
+        write_daily_reports(str(tmp_path), SocialDistancingMetric, date(2020, 10, 1), date(2020, 10, 31))
+
+        # From Wednesday to the Sunday of the next week
+        report = SocialDistancingMetric.get_weekly_report(
+            ENTITIES, from_date=date(2020, 10, 7), to_date=date(2020, 10, 18))
+
+        assert report["Weeks"] == ["2020-10-07 2020-10-11", "2020-10-12 2020-10-18"]
+        daily_report = SocialDistancingMetric.get_daily_report(ENTITIES, date(2020, 10, 7), date(2020, 10, 18))
+        assert report["DetectedObjects"] == [sum(daily_report["DetectedObjects"][:5]),
+                                             sum(daily_report["DetectedObjects"][5:])]
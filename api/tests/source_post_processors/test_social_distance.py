@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from libs.config_engine import ConfigEngine
+from libs.detection_batch import DetectionBatch
+from libs.source_post_processors.social_distance import SocialDistancePostProcessor
+
+RESOLUTION = (640, 480)
+H_INVERSE = [0.8196721311475405, 0.6333830104321896, -302.9061102831591, -1.8201548094104302e-16,
+             1.7138599105812207, -531.2965722801783, -2.7856282300542207e-18, 0.008047690014903118,
+             -1.4947839046199658]
+
+
+@pytest.fixture
+def post_processor():
+    config = ConfigEngine("/repo/api/tests/data/config-x86-openvino.ini")
+    post_processor = SocialDistancePostProcessor(config, "Source_0", "SourcePostProcessor_1")
+    post_processor.h_inv = np.array(H_INVERSE).reshape((3, 3))
+    return post_processor
+
+
+def generate_objects(objects_count, seed=0):
+    """Returns the detected objects in the dict representation used before the DetectionBatch"""
+    rng = np.random.RandomState(seed)
+    x0, y0 = rng.uniform(0, 0.9, (2, objects_count))
+    bboxes = np.stack([x0, y0, x0 + rng.uniform(0.02, 0.1, objects_count), y0 + rng.uniform(0.05, 0.1, objects_count)])
+    batch = DetectionBatch.from_bboxes(bboxes.T, RESOLUTION)
+    return [{"id": f"1-{index}", "bbox": batch.bbox[index].tolist(), "centroid": batch.centroid[index].tolist(),
+             "bboxReal": batch.bbox_real[index].tolist(), "centroidReal": batch.centroid_real[index].tolist()}
+            for index in range(objects_count)]
+
+
+def scalar_distances(post_processor, objects, points_indexes):
+    """Distance matrix computed calling `calculate_distance_of_two_points_of_boxes` for each pair of points"""
+    distances = []
+    for first in objects:
+        distance_row = []
+        for second in objects:
+            if first is second:
+                distance_row.append(0)
+                continue
+            points_distances = []
+            for coordinates, x_index, y_index in points_indexes:
+                first_point = [first[coordinates][x_index], first[coordinates][y_index], first["centroidReal"][3]]
+                second_point = [second[coordinates][x_index], second[coordinates][y_index], second["centroidReal"][3]]
+                points_distances.append(
+                    post_processor.calculate_distance_of_two_points_of_boxes(first_point, second_point))
+            distance_row.append(min(points_distances))
+        distances.append(distance_row)
+    return np.asarray(distances, dtype=np.float32)
+
+
+def scalar_calibrated_distances(post_processor, objects):
+    """Distance matrix computed transforming the floor point of each box to the world coordinates"""
+    points = []
+    for obj in objects:
+        floor_point = np.array([int((obj["bboxReal"][0] + obj["bboxReal"][2]) / 2), obj["bboxReal"][3], 1])
+        floor_world_point = np.matmul(post_processor.h_inv, floor_point)
+        points.append(floor_world_point[:-1] / floor_world_point[-1])
+    distances = [[np.linalg.norm(first - second) for second in points] for first in points]
+    return np.asarray(distances).reshape(len(objects), len(objects))
+
+
+# Coordinates and (x, y) indexes of the points compared by each method
+CENTER_POINTS = [("centroidReal", 0, 1)]
+FOUR_CORNER_POINTS = [("bboxReal", 0, 1), ("bboxReal", 2, 1), ("bboxReal", 0, 3), ("bboxReal", 2, 3)]
+
+
+# pytest -v api/tests/source_post_processors/test_social_distance.py::TestsSocialDistanceMatrices
+class TestsSocialDistanceMatrices:
+    """The vectorized distance matrices match the distances calculated for each pair of objects"""
+
+    @pytest.mark.parametrize("objects_count", [0, 1, 2, 5, 40])
+    def test_center_points_distance(self, post_processor, objects_count):
+        objects = generate_objects(objects_count)
+        expected_distances = scalar_distances(post_processor, objects, CENTER_POINTS)
+        for nn_out in [objects, DetectionBatch.from_objects(objects)]:
+            distances = post_processor.calculate_center_points_distance(nn_out)
+            assert distances.dtype == np.float32
+            np.testing.assert_allclose(distances, expected_distances, rtol=1e-6)
+
+    @pytest.mark.parametrize("objects_count", [0, 1, 2, 5, 40])
+    def test_four_corner_distance(self, post_processor, objects_count):
+        objects = generate_objects(objects_count)
+        expected_distances = scalar_distances(post_processor, objects, FOUR_CORNER_POINTS)
+        for nn_out in [objects, DetectionBatch.from_objects(objects)]:
+            distances = post_processor.calculate_four_corner_distance(nn_out)
+            assert distances.dtype == np.float32
+            np.testing.assert_allclose(distances, expected_distances, rtol=1e-6)
+
+    @pytest.mark.parametrize("objects_count", [0, 1, 2, 5, 40])
+    def test_calibrated_distance(self, post_processor, objects_count):
+        objects = generate_objects(objects_count)
+        expected_distances = scalar_calibrated_distances(post_processor, objects)
+        for nn_out in [objects, DetectionBatch.from_objects(objects)]:
+            distances = post_processor.calculate_calibrated_distance(nn_out)
+            np.testing.assert_allclose(distances.reshape(expected_distances.shape), expected_distances, rtol=1e-9)
@@ -0,0 +1,121 @@
+import gzip
+import json
+import os
+import pytest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+from libs.uploaders.web_hook_uploader import WebHookUploader
+
+
+class StubEndpointHandler(BaseHTTPRequestHandler):
+    """Stores the PUT requests in the server and answers with the next status of `server.statuses` (200 by default)"""
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append({"headers": dict(self.headers), "body": body})
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def get_records(request):
+    body = request["body"]
+    if request["headers"].get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+@pytest.fixture
+def stub_endpoint():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubEndpointHandler)
+    server.requests = []
+    server.statuses = []
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+# pytest -v api/tests/uploaders/test_web_hook_uploader.py::TestsWebHookUploader
+class TestsWebHookUploader:
+    """Delivery of the records of the web hook logger"""
+
+    def test_records_are_sent_in_gzip_batches(self, stub_endpoint):
+        server, endpoint = stub_endpoint
+        uploader = WebHookUploader(endpoint, batch_size=3)
+
+        for i in range(5):
+            uploader.add({"id": i})
+        uploader.flush()
+
+        assert len(server.requests) == 2
+        for request in server.requests:
+            assert request["headers"]["Content-Encoding"] == "gzip"
+            assert request["headers"]["Content-Type"] == "application/json"
+        assert [get_records(request) for request in server.requests] == [
+            [{"id": 0}, {"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}]
+        ]
+
+    def test_failed_request_is_retried(self, stub_endpoint, tmp_path):
+        server, endpoint = stub_endpoint
+        server.statuses = [503]
+        uploader = WebHookUploader(endpoint, max_retries=2, backoff_factor=0, spool_directory=str(tmp_path))
+
+        uploader.add({"id": 0})
+        uploader.flush()
+
+        assert len(server.requests) == 2
+        assert get_records(server.requests[0]) == get_records(server.requests[1]) == [{"id": 0}]
+        assert os.listdir(tmp_path) == []
+
+    def test_spooled_batches_are_sent_when_the_endpoint_is_back(self, stub_endpoint, tmp_path):
+        server, endpoint = stub_endpoint
+        server.statuses = [500]
+        uploader = WebHookUploader(endpoint, max_retries=0, spool_directory=str(tmp_path))
+
+        uploader.add({"id": 0})
+        uploader.flush()
+
+        assert len(os.listdir(tmp_path)) == 1
+
+        uploader.add({"id": 1})
+        uploader.flush()
+
+        assert os.listdir(tmp_path) == []
+        assert [get_records(request) for request in server.requests] == [[{"id": 0}], [{"id": 1}], [{"id": 0}]]
+
+    def test_worker_sends_the_spooled_batches_when_it_starts(self, stub_endpoint, tmp_path):
+        server, endpoint = stub_endpoint
+        server.statuses = [500]
+        uploader = WebHookUploader(endpoint, max_retries=0, spool_directory=str(tmp_path))
+        uploader.add({"id": 0})
+        uploader.flush()
+
+        uploader.acquire()
+        uploader.add({"id": 1})
+        uploader.release()
+
+        assert os.listdir(tmp_path) == []
+        assert [get_records(request) for request in server.requests] == [[{"id": 0}], [{"id": 0}], [{"id": 1}]]
+
+    def test_uploaders_are_shared_by_endpoint(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(WebHookUploader, "_uploaders", {})
+        endpoint = "http://127.0.0.1:1/"
+
+        uploader = WebHookUploader.get_uploader(endpoint, batch_size=10, spool_directory=str(tmp_path))
+
+        # The parameters not sent have their default values
+        assert WebHookUploader.get_uploader(
+            endpoint, batch_size=10, flush_interval=5, spool_directory=str(tmp_path)) is uploader
+        assert WebHookUploader.get_uploader("http://127.0.0.1:2/", batch_size=20) is not uploader
+        with pytest.raises(ValueError):
+            WebHookUploader.get_uploader(endpoint, batch_size=20, spool_directory=str(tmp_path))
+        with pytest.raises(ValueError):
+            WebHookUploader.get_uploader(endpoint, batch_size=10)
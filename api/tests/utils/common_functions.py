@@ -1,3 +1,5 @@
+import csv
+import os
 import re
 import humps
 from libs.config_engine import ConfigEngine
@@ -135,3 +137,23 @@ def camel_case_to_snake_case_dict(dictionary):
         del di["dashboard_u_r_l"]
 
     return di
+
+
+def write_objects_log(log_file, rows):
+    """
+    Writes an objects log CSV with the `rows`, a list of (timestamp, detections, violations_indexes) tuples. The
+    detections are dicts with the "tracking_id", "bbox" and optional "face_label" of the objects.
+    """
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    with open(log_file, "w", newline="") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=[
+            "Version", "Timestamp", "DetectedObjects", "ViolatingObjects", "EnvironmentScore", "Detections",
+            "ViolationsIndexes"
+        ])
+        writer.writeheader()
+        for timestamp, detections, violations_indexes in rows:
+            writer.writerow({
+                "Version": "1.0", "Timestamp": timestamp, "DetectedObjects": len(detections),
+                "ViolatingObjects": len(violations_indexes), "EnvironmentScore": 0,
+                "Detections": str(detections), "ViolationsIndexes": str(violations_indexes)
+            })
@@ -3,6 +3,7 @@ import shutil
 import os
 import copy
 
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from libs.config_engine import ConfigEngine
@@ -105,3 +106,33 @@ def pts_destination():
             ]
         ]
     }
+
+
+@pytest.fixture
+def metrics_config(tmp_path):
+    """Config of the test data whose sources and areas are logged in a temporary directory"""
+    config_sample_path = str(tmp_path / "config-x86-openvino.ini")
+    shutil.copyfile("/repo/api/tests/data/config-x86-openvino.ini", config_sample_path)
+    config = ConfigEngine(config_sample_path)
+    config.set_option_in_section("SourceLogger_2", "LogDirectory", str(tmp_path / "sources"))
+    config.set_option_in_section("AreaLogger_0", "LogDirectory", str(tmp_path / "areas"))
+    config.save(config_sample_path)
+    config.reload()
+    return config
+
+
+@pytest.fixture
+def export_client(metrics_config, monkeypatch):
+    """
+    Client of an app with the export router only (the ProcessorAPI needs a running processor), the data of the
+    cameras and the areas is read from the temporary directories of the `metrics_config`.
+    """
+    Settings(config=metrics_config)
+    monkeypatch.setenv("SourceLogDirectory", metrics_config.get_section_dict("SourceLogger_2")["LogDirectory"])
+    monkeypatch.setenv("AreaLogDirectory", metrics_config.get_section_dict("AreaLogger_0")["LogDirectory"])
+
+    from api.routers.export import export_router
+
+    app = FastAPI()
+    app.include_router(export_router, prefix="/export")
+    return TestClient(app)
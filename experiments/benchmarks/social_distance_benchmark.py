@@ -0,0 +1,114 @@
+"""
+Micro-benchmark of the distance methods of the SocialDistancePostProcessor.
+
+Compares the vectorized implementation against the previous pairwise (Python loops) implementation for different
+numbers of detected objects and checks that both of them return the same distances.
+
+Usage (from the root of the repository):
+    python3 -m experiments.benchmarks.social_distance_benchmark
+"""
+import math
+import timeit
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+from libs.source_post_processors.social_distance import SocialDistancePostProcessor
+
+RESOLUTION = (640, 480)
+OBJECTS_COUNTS = [1, 2, 5, 10, 20, 50, 100, 200, 500]
+
+
+def generate_objects(objects_count, rng, dtype):
+    [w, h] = RESOLUTION
+    objects = []
+    for i in range(objects_count):
+        x0, y0 = rng.uniform(0, 0.9, 2).astype(dtype)
+        x1, y1 = x0 + rng.uniform(0.02, 0.1), y0 + rng.uniform(0.05, 0.1)
+        objects.append({
+            "id": f"1-{i}",
+            "centroidReal": [(x0 + x1) * w / 2, (y0 + y1) * h / 2, (x1 - x0) * w, (y1 - y0) * h],
+            "bboxReal": [x0 * w, y0 * h, x1 * w, y1 * h]
+        })
+    return objects
+
+
+def pairwise_distance(first_point, second_point):
+    [xc1, yc1, h1] = first_point
+    [xc2, yc2, h2] = second_point
+    dx = xc2 - xc1
+    dy = yc2 - yc1
+    lx = dx * 170 * (1 / h1 + 1 / h2) / 2
+    ly = dy * 170 * (1 / h1 + 1 / h2) / 2
+    return math.sqrt(lx ** 2 + ly ** 2)
+
+
+def legacy_center_points_distance(nn_out):
+    distances = []
+    for i in range(len(nn_out)):
+        distance_row = []
+        for j in range(len(nn_out)):
+            if i == j:
+                distance_row.append(0)
+                continue
+            first = [nn_out[i]["centroidReal"][0], nn_out[i]["centroidReal"][1], nn_out[i]["centroidReal"][3]]
+            second = [nn_out[j]["centroidReal"][0], nn_out[j]["centroidReal"][1], nn_out[j]["centroidReal"][3]]
+            distance_row.append(pairwise_distance(first, second))
+        distances.append(distance_row)
+    return np.asarray(distances, dtype=np.float32)
+
+
+def legacy_four_corner_distance(nn_out):
+    distances = []
+    for i in range(len(nn_out)):
+        distance_row = []
+        for j in range(len(nn_out)):
+            if i == j:
+                distance_row.append(0)
+                continue
+            corners_distances = []
+            for x_index, y_index in [(0, 1), (2, 1), (0, 3), (2, 3)]:
+                first = [nn_out[i]["bboxReal"][x_index], nn_out[i]["bboxReal"][y_index], nn_out[i]["centroidReal"][3]]
+                second = [nn_out[j]["bboxReal"][x_index], nn_out[j]["bboxReal"][y_index], nn_out[j]["centroidReal"][3]]
+                corners_distances.append(pairwise_distance(first, second))
+            distance_row.append(min(corners_distances))
+        distances.append(distance_row)
+    return np.asarray(distances, dtype=np.float32)
+
+
+def legacy_calibrated_distance(nn_out, h_inv):
+    points = []
+    for bbox in nn_out:
+        floor_point = np.array([int((bbox["bboxReal"][0] + bbox["bboxReal"][2]) / 2), bbox["bboxReal"][3], 1])
+        floor_world_point = np.matmul(h_inv, floor_point)
+        points.append(floor_world_point[:-1] / floor_world_point[-1])
+    points = np.array(points)
+    return cdist(points, points)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    post_processor = SocialDistancePostProcessor.__new__(SocialDistancePostProcessor)
+    post_processor.h_inv = np.array([[1.2, 0.1, -30], [0.05, 2.1, -12], [0.0001, 0.002, 1]])
+    methods = [
+        ("CenterPointsDistance", legacy_center_points_distance, post_processor.calculate_center_points_distance),
+        ("FourCornerPointsDistance", legacy_four_corner_distance, post_processor.calculate_four_corner_distance),
+        ("CalibratedDistance", lambda objects: legacy_calibrated_distance(objects, post_processor.h_inv),
+         post_processor.calculate_calibrated_distance),
+    ]
+    print(f"{'method':<26}{'N':>5}{'legacy (ms)':>14}{'vectorized (ms)':>18}{'speedup':>10}{'max diff':>12}")
+    for dtype in [np.float64, np.float32]:
+        print(f"Coordinates dtype: {np.dtype(dtype).name}")
+        for objects_count in OBJECTS_COUNTS:
+            objects = generate_objects(objects_count, rng, dtype)
+            for name, legacy_method, vectorized_method in methods:
+                repetitions = max(1, 2000 // (objects_count ** 2))
+                legacy_time = timeit.timeit(lambda: legacy_method(objects), number=repetitions) / repetitions
+                vectorized_time = timeit.timeit(lambda: vectorized_method(objects), number=repetitions) / repetitions
+                max_difference = np.max(np.abs(legacy_method(objects) - vectorized_method(objects)))
+                print(f"{name:<26}{objects_count:>5}{legacy_time * 1000:>14.3f}{vectorized_time * 1000:>18.3f}"
+                      f"{legacy_time / vectorized_time:>10.1f}{max_difference:>12.3g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Micro-benchmark of the IOUTracker.
+
+Compares the vectorized implementation (IoU matrix + greedy/hungarian assignment) against the previous
+implementation (one `iou` call for each track and detection) for different numbers of tracked objects and checks
+that the greedy assignment returns the same tracks.
+
+Usage (from the root of the repository):
+    python3 -m experiments.benchmarks.tracker_benchmark
+"""
+import time
+
+import numpy as np
+
+from libs.trackers.base_tracker import BaseTracker
+from libs.trackers.iou_tracker import IOUTracker
+from libs.trackers.utils.misc import get_centroids, iou
+
+RESOLUTION = (640, 480)
+OBJECTS_COUNTS = [10, 100, 500]
+FRAMES = 20
+
+
+class LegacyIOUTracker(BaseTracker):
+
+    def __init__(self, max_lost=2, iou_threshold=0.5):
+        self.iou_threshold = iou_threshold
+        super(LegacyIOUTracker, self).__init__(max_lost=max_lost)
+
+    def update(self, bboxes, class_ids, detection_scores):
+        self.frame_count += 1
+
+        new_bboxes = np.array(bboxes, dtype='int')
+        new_class_ids = np.array(class_ids, dtype='int')
+        new_detection_scores = np.array(detection_scores)
+        new_centroids = get_centroids(new_bboxes)
+
+        new_detections = list(zip(new_bboxes, new_class_ids, new_centroids, new_detection_scores))
+        track_ids = list(self.tracks.keys())
+
+        updated_tracks = []
+        for track_id in track_ids:
+            if len(new_detections) > 0:
+                idx, best_match = max(enumerate(new_detections), key=lambda x: iou(self.tracks[track_id].bbox, x[1][0]))
+                (bb, cid, ctrd, scr) = best_match
+
+                if iou(self.tracks[track_id].bbox, bb) > self.iou_threshold:
+                    max_score = max(self.tracks[track_id].info['max_score'], scr)
+                    self._update_track(track_id, ctrd, bb, score=scr, max_score=max_score)
+                    updated_tracks.append(track_id)
+                    del new_detections[idx]
+
+            if len(updated_tracks) == 0 or track_id is not updated_tracks[-1]:
+                self.tracks[track_id].lost += 1
+                if self.tracks[track_id].lost > self.max_lost:
+                    self._remove_track(track_id)
+
+        for bb_, cid_, ctrd_, scr_ in new_detections:
+            self._add_track(ctrd_, bb_, cid_, score=scr_, max_score=scr_)
+
+        return self._get_tracks(self.tracks)
+
+
+def generate_frames(objects_count, rng):
+    """
+    Generates the detections of objects moving randomly. Some of them are missed in each frame.
+    """
+    [w, h] = RESOLUTION
+    positions = rng.uniform(0, 1, (objects_count, 2)) * [w - 40, h - 80]
+    frames = []
+    for _ in range(FRAMES):
+        positions += rng.normal(0, 3, positions.shape)
+        detected = rng.uniform(0, 1, objects_count) > 0.1
+        bboxes = np.concatenate([positions, positions + [40, 80]], axis=1)[detected].astype(int)
+        frames.append((bboxes.tolist(), [1] * len(bboxes), rng.uniform(0.5, 1, len(bboxes)).tolist()))
+    return frames
+
+
+def run_tracker(tracker, frames):
+    outputs = []
+    begin_time = time.perf_counter()
+    for bboxes, class_ids, scores in frames:
+        outputs.append(tracker.update(bboxes, class_ids, scores))
+    return (time.perf_counter() - begin_time) / len(frames), outputs
+
+
+def same_tracks(first_outputs, second_outputs):
+    for first_tracks, second_tracks in zip(first_outputs, second_outputs):
+        if [(t[1], list(t[4]), t[5]["lost"]) for t in first_tracks] != \
+                [(t[1], list(t[4]), t[5]["lost"]) for t in second_tracks]:
+            return False
+    return True
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'N':>5}{'legacy (ms)':>14}{'greedy (ms)':>14}{'speedup':>10}{'hungarian (ms)':>17}{'same tracks':>14}")
+    for objects_count in OBJECTS_COUNTS:
+        frames = generate_frames(objects_count, rng)
+        legacy_time, legacy_outputs = run_tracker(LegacyIOUTracker(max_lost=2, iou_threshold=0.5), frames)
+        greedy_time, greedy_outputs = run_tracker(IOUTracker(max_lost=2, iou_threshold=0.5), frames)
+        hungarian_time, _ = run_tracker(IOUTracker(max_lost=2, iou_threshold=0.5, assignment="hungarian"), frames)
+        print(f"{objects_count:>5}{legacy_time * 1000:>14.3f}{greedy_time * 1000:>14.3f}"
+              f"{legacy_time / greedy_time:>10.1f}{hungarian_time * 1000:>17.3f}"
+              f"{str(same_tracks(legacy_outputs, greedy_outputs)):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,12 @@
 import os
 import time
 import logging
-import csv
 
 from datetime import date, datetime
-from collections import deque
 
 from libs.config_engine import ConfigEngine
 from libs.loggers.area_loggers.logger import Logger
+from .utils.log_tail import CsvTailReader
 from .utils.loggers import get_source_log_directory, get_source_logging_interval
 from .utils.mailing import MailService
 from .notifications.slack_notifications import SlackService
@@ -17,10 +16,12 @@ logger = logging.getLogger(__name__)
 
 class AreaEngine:
 
-    def __init__(self, config: ConfigEngine, area: dict):
+    def __init__(self, config: ConfigEngine, area: dict, live_state=None):
         self.processing_alerts = False
         self.config = config
         self.area = area
+        # Shared table with the latest state of the cameras (see libs.live_state)
+        self.live_state = live_state
 
         self.occupancy_sleep_time_interval = float(self.config.get_section_dict("App")["OccupancyAlertsMinInterval"])
         self.log_dir = get_source_log_directory(config)
@@ -34,6 +35,8 @@ class AreaEngine:
         for camera in self.cameras:
             camera["file_path"] = os.path.join(self.log_dir, camera["id"], "objects_log")
             camera["last_processed_time"] = time.time()
+            # Only the rows appended since the previous check are parsed
+            camera["log_reader"] = CsvTailReader()
 
         if self.should_send_email_notifications:
             self.mail_service = MailService(config)
@@ -55,24 +58,16 @@ class AreaEngine:
         self.processing_area = True
         logger.info(f"Enabled processing area - {self.area_id}: {self.area_name} with {len(self.cameras)} cameras")
         while self.processing_area:
-            camera_file_paths = [os.path.join(camera["file_path"], str(date.today()) + ".csv") for camera in self.cameras]
-            if not all(list(map(os.path.isfile, camera_file_paths))):
-                # Wait before csv for this day are created
-                logger.info(f"Area reporting on - {self.area_id}: {self.area_name} is waiting for reports to be created")
-                time.sleep(5)
-
             occupancy = 0
             active_cameras = []
             for camera in self.cameras:
-                with open(os.path.join(camera["file_path"], str(date.today()) + ".csv"), "r") as log:
-                    last_log = deque(csv.DictReader(log), 1)[0]
-                    log_time = datetime.strptime(last_log["Timestamp"], "%Y-%m-%d %H:%M:%S")
-                    # TODO: If the TimeInterval of the Logger is more than 30 seconds this would have to be revised.
-                    if (datetime.now() - log_time).total_seconds() < 30:
-                        occupancy += int(last_log["DetectedObjects"])
-                        active_cameras.append({"camera_id": camera["id"], "camera_name": camera["name"]})
-                    else:
-                        logger.warn(f"Logs aren't being updated for camera {camera['id']} - {camera['name']}")
+                last_state = self.get_camera_state(camera)
+                # TODO: If the TimeInterval of the Logger is more than 30 seconds this would have to be revised.
+                if last_state and time.time() - last_state["timestamp"] < 30:
+                    occupancy += last_state["occupancy"]
+                    active_cameras.append({"camera_id": camera["id"], "camera_name": camera["name"]})
+                else:
+                    logger.warn(f"Logs aren't being updated for camera {camera['id']} - {camera['name']}")
 
             for l in self.loggers:
                 l.update(active_cameras, {"occupancy": occupancy})
@@ -90,6 +85,27 @@ class AreaEngine:
 
         self.stop_process_area()
 
+    def get_camera_state(self, camera):
+        """
+        Returns the latest "timestamp" and "occupancy" of the camera. The state is read from the live state table
+        when it's available, otherwise from the last row of the objects log of the camera.
+        """
+        if self.live_state:
+            camera_state = self.live_state.read(camera["id"])
+            if camera_state:
+                return camera_state
+        log_path = os.path.join(camera["file_path"], str(date.today()) + ".csv")
+        if not os.path.isfile(log_path):
+            logger.info(f"Area reporting on - {self.area_id}: {self.area_name} is waiting for reports to be created")
+            return None
+        last_log = camera["log_reader"].read_last_row(log_path)
+        if not last_log:
+            return None
+        log_time = datetime.strptime(last_log["Timestamp"], "%Y-%m-%d %H:%M:%S")
+        return {"timestamp": log_time.timestamp(), "occupancy": int(last_log["DetectedObjects"])}
+
     def stop_process_area(self):
         logger.info(f"Disabled processing area - {self.area_id}: {self.area_name}")
         self.processing_area = False
+        for camera in self.cameras:
+            camera["log_reader"].close()
@@ -6,16 +6,18 @@ import time
 from datetime import datetime
 from threading import Thread
 from libs.area_engine import AreaEngine
+from libs.live_state import LiveStateTable
 
 logger = logging.getLogger(__name__)
 
 
-def run_area_processing(config, pipe, areas):
+def run_area_processing(config, pipe, areas, live_state_name=None):
     pid = os.getpid()
     logger.info(f"[{pid}] taking on notifications for {len(areas)} areas")
     threads = []
+    live_state = LiveStateTable.attach(live_state_name)
     for area in areas:
-        engine = AreaThread(config, area)
+        engine = AreaThread(config, area, live_state)
         engine.start()
         threads.append(engine)
 
@@ -24,20 +26,23 @@ def run_area_processing(config, pipe, areas):
     logger.info(f"[{pid}] will stop area alerts and die")
     for t in threads:
         t.stop()
+    if live_state:
+        live_state.close()
 
     logger.info(f"[{pid}] Goodbye!")
 
 
 class AreaThread(Thread):
-    def __init__(self, config, area):
+    def __init__(self, config, area, live_state=None):
         Thread.__init__(self)
         self.engine = None
         self.config = config
         self.area = area
+        self.live_state = live_state
 
     def run(self):
         try:
-            self.engine = AreaEngine(self.config, self.area)
+            self.engine = AreaEngine(self.config, self.area, self.live_state)
             restarts = 0
             max_restarts = int(self.config.get_section_dict("App")["MaxThreadRestarts"])
             while True:
@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 
 logging.getLogger().setLevel(logging.INFO)
 
@@ -30,9 +31,17 @@ class Classifier:
     def inference(self, objects):
         return self.classifier.inference(objects)
 
-    def object_post_process(self, object, classifier_result, classifier_score):
-        if 'face' in object.keys():
-            if object['face'] is not None and classifier_score > self.min_threshold:
-                object['face_label'] = classifier_result
-            else:
-                object['face_label'] = -1
+    def assign_face_labels(self, detections, classifier_results, classifier_scores):
+        """
+        Sets the `face_label` of the objects of a DetectionBatch. The classifier results are received in the
+        same order as the detected faces.
+        """
+        if detections.face is None:
+            return
+        detections.face_label = np.full(len(detections), -1)
+        faces = detections.has_faces
+        if faces.any():
+            detections.face_label[faces] = np.where(
+                np.asarray(classifier_scores).reshape(-1) > self.min_threshold,
+                np.asarray(classifier_results).reshape(-1), -1
+            )
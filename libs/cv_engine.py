@@ -3,11 +3,14 @@ import cv2 as cv
 import logging
 import numpy as np
 import os
+import time
 
 from datetime import date, datetime
 from statistics import mean
 
 from libs.classifiers.classifier import Classifier
+from libs.frame_grabber import FrameGrabber, FrameScheduler
+from libs.motion_gate import MotionGate
 from libs.trackers.tracker import Tracker
 from libs.loggers.source_loggers.logger import Logger
 from libs.detectors.detector import Detector
@@ -22,18 +25,38 @@ POST_PROCESSING = "Post processing steps"
 
 class CvEngine:
 
-    def __init__(self, config, source):
+    def __init__(self, config, source, inference_server=None, live_state=None):
         self.config = config
+        self.source = source
+        self.camera_id = self.config.get_section_dict(source)["Id"]
+        # Shared table where the latest state of the camera is published (see libs.live_state)
+        self.live_state = live_state
         self.resolution = tuple([int(i) for i in self.config.get_section_dict('App')['Resolution'].split(',')])
+        # Number of frames buffered by the capture thread (0 disables it)
+        self.frame_queue_size = int(self.config.get_section_dict(source).get("FrameQueueSize", 0))
+        # Number of frames analysed per second (0 analyses all the frames)
+        self.target_analysis_fps = float(self.config.get_section_dict(source).get("TargetAnalysisFps", 0))
 
         # Init detector, tracker and classifier
-        self.detector = Detector(self.config)
+        if inference_server:
+            # The detector is shared with the other sources of the process
+            self.detector = inference_server
+        else:
+            self.detector = Detector(self.config)
         self.tracker = Tracker(self.config)
         self.classifier = None
 
         if "Classifier" in self.config.get_sections():
             self.classifier = Classifier(self.config)
 
+        # Init motion gate (used to skip the detector on static frames)
+        self.motion_gate = None
+        self.last_detections = None
+        motion_threshold = float(self.config.get_section_dict(source).get("MotionGateThreshold", 0))
+        if motion_threshold > 0:
+            max_skipped_frames = int(self.config.get_section_dict(source).get("MotionGateMaxSkippedFrames", 25))
+            self.motion_gate = MotionGate(motion_threshold, max_skipped_frames)
+
         # Init post processors
         self.post_processors = []
         post_processors_names = [x for x in self.config.get_sections() if x.startswith("SourcePostProcessor_")]
@@ -56,44 +79,48 @@ class CvEngine:
             self.last_log_time = None
             self.reset_log_detail(set_headers=bool(self.log_performance_directory))
 
-    def __process(self, cv_image):
+    def __detect(self, cv_image):
         """
-        return object_list list of  dict for each obj,
-        obj["bbox"] is normalized coordinations for [x0, y0, x1, y1] of box
+        Executes the detector, classifier and tracker over the image.
         """
-
-        # Resize input image to resolution
-        cv_image = cv.resize(cv_image, self.resolution)
+        classifier_time = 0
 
         # Execute detector
         begin_time = datetime.now()
-        tmp_objects_list, detection_scores, class_ids, detection_bboxes, classifier_objects = self.detector.inference(cv_image)
+        detections, classifier_objects = self.detector.inference(cv_image)
         detector_time = (datetime.now() - begin_time).total_seconds()
 
         # Execute classifier and tracker
         if self.classifier:
             begin_time = datetime.now()
             classifier_results, classifier_scores = self.classifier.inference(classifier_objects)
+            self.classifier.assign_face_labels(detections, classifier_results, classifier_scores)
             classifier_time = (datetime.now() - begin_time).total_seconds()
 
         begin_time = datetime.now()
-        tracks = self.tracker.update(detection_bboxes, class_ids, detection_scores)
+        tracks = self.tracker.update_detections(detections)
         tracker_time = (datetime.now() - begin_time).total_seconds()
+        return detections, tracks, detector_time, classifier_time, tracker_time
 
-        idx = 0
-        for obj in tmp_objects_list:
-            begin_time = datetime.now()
-            self.tracker.object_post_process(obj, tracks)
-            tracker_time += (datetime.now() - begin_time).total_seconds()
-
-            if self.classifier is not None:
-                begin_time = datetime.now()
-                if obj.get("face") is not None:
-                    self.classifier.object_post_process(obj, classifier_results[idx], classifier_scores[idx])
-                    idx = idx + 1
-                else:
-                    self.classifier.object_post_process(obj, None, None)
-                classifier_time += (datetime.now() - begin_time).total_seconds()
+    def __process(self, cv_image):
+        """
+        return a DetectionBatch with the detected objects,
+        detections.bbox is normalized coordinations for [x0, y0, x1, y1] of each box
+        """
+
+        # Resize input image to resolution
+        cv_image = cv.resize(cv_image, self.resolution)
+
+        static_frame = self.motion_gate is not None and not self.motion_gate.has_motion(cv_image)
+        if static_frame and self.last_detections is not None:
+            # Nothing changed since the latest detection, reuse the previous detections and tracks
+            detector_time, classifier_time, tracker_time = 0, 0, 0
+            tmp_objects_list = self.last_detections[0].copy()
+            tracks = self.last_detections[1]
+        else:
+            tmp_objects_list, tracks, detector_time, classifier_time, tracker_time = self.__detect(cv_image)
+            if self.motion_gate is not None:
+                self.last_detections = (tmp_objects_list.copy(), tracks)
 
         # Execute post processors
         post_processing_data = {
@@ -116,9 +143,9 @@ class CvEngine:
         return cv_image, tmp_objects_list, post_processing_data
 
     def process_video(self, video_uri):
-        input_cap = cv.VideoCapture(video_uri)
-        fps = max(25, input_cap.get(cv.CAP_PROP_FPS))
-        if (input_cap.isOpened()):
+        frame_grabber = FrameGrabber(video_uri, self.frame_queue_size)
+        fps = max(25, frame_grabber.fps)
+        if (frame_grabber.is_opened()):
             logger.info(f'opened video {video_uri}')
         else:
             logger.error(f'failed to load video {video_uri}')
@@ -131,22 +158,49 @@ class CvEngine:
         for source_logger in self.loggers:
             source_logger.start_logging(fps)
 
+        frame_scheduler = None
+        if self.target_analysis_fps > 0:
+            frame_scheduler = FrameScheduler(frame_grabber.fps, self.target_analysis_fps)
+        frame_grabber.start()
+        self.last_detections = None
         frame_num = 0
-        while input_cap.isOpened() and self.running_video:
-            _, cv_image = input_cap.read()
+        while frame_grabber.is_opened() and self.running_video:
+            cv_image = frame_grabber.read()
             if np.shape(cv_image) != ():
+                begin_time = time.perf_counter()
                 cv_image, objects, post_processing_data = self.__process(cv_image)
+                if self.live_state:
+                    self.live_state.publish(
+                        self.camera_id, len(objects), len(post_processing_data.get("violating_objects", [])))
                 frame_num += 1
                 if frame_num % FRAMES_LOG_BATCH_SIZE == 1:
-                    logger.info(f'processed frame {frame_num} for {video_uri}')
+                    logger.info(f'processed frame {frame_num} for {video_uri} '
+                                f'(dropped frames: {frame_grabber.dropped_frames})')
+                    if frame_scheduler:
+                        logger.info(f'analysed FPS: {frame_scheduler.achieved_fps:.2f} '
+                                    f'(frame stride: {frame_grabber.frame_stride}) for {video_uri}')
                     self.write_performance_log()
+                    self.log_loggers_queues(video_uri)
                 for source_logger in self.loggers:
                     source_logger.update(cv_image, objects, post_processing_data, self.detector.fps)
-        input_cap.release()
+                if frame_scheduler:
+                    frame_grabber.frame_stride = frame_scheduler.update(time.perf_counter() - begin_time)
+        frame_grabber.release()
         for source_logger in self.loggers:
             source_logger.stop_logging()
         self.running_video = False
 
+    def log_loggers_queues(self, video_uri):
+        """
+        Logs the depth of the queues of the loggers that run in a worker thread.
+        """
+        for source_logger in self.loggers:
+            metrics = source_logger.get_queue_metrics()
+            if metrics:
+                logger.info(f'{source_logger.logger_name} queue for {video_uri}: depth {metrics["depth"]} '
+                            f'(max: {metrics["max_depth"]}), processed updates: {metrics["processed"]}, '
+                            f'dropped updates: {metrics["dropped"]}')
+
     def stop_process_video(self):
         self.running_video = False
 
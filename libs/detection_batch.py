@@ -0,0 +1,246 @@
+import numpy as np
+
+from collections.abc import MutableMapping
+
+# Keys of the legacy (dict based) representation of the detected objects
+COORDINATES_KEYS = {"bbox": "bbox", "centroid": "centroid", "bboxReal": "bbox_real", "centroidReal": "centroid_real"}
+OPTIONAL_KEYS = ["tracked_id", "track_info", "face", "face_label"]
+
+
+class DetectionBatch:
+    """
+    Struct-of-arrays representation of the objects detected in a frame. Each attribute is a numpy array
+    with one row per object:
+
+    - bbox: Nx4 normalized (xmin, ymin, xmax, ymax) coordinates of the boxes.
+    - bbox_real: Nx4 (xmin, ymin, xmax, ymax) coordinates of the boxes in pixels.
+    - centroid: Nx4 normalized (cx, cy, w, h) coordinates of the boxes.
+    - centroid_real: Nx4 (cx, cy, w, h) coordinates of the boxes in pixels.
+    - score: N detection scores.
+    - class_id: N class ids.
+    - object_index: N indexes of the objects in the frame (the second part of the legacy "id" string).
+    - track_id: N ids assigned by the tracker (-1 for untracked objects).
+    - track_info: N info dictionaries returned by the tracker (None for untracked objects).
+    - face: Nx4 normalized (ymin, xmin, ymax, xmax) coordinates of the faces (NaN if the face was not found).
+      None if the detector doesn't look for faces.
+    - face_label: N face mask classifier results (-1 if not available). None if the classifier is disabled.
+
+    Iterating over a batch (or indexing it with an integer) returns a `DetectionView`, a dict-compatible view
+    of the object that can be used by the plugins written for the legacy representation.
+    """
+
+    def __init__(self, bbox, bbox_real, centroid, centroid_real, score, class_id, object_index=None,
+                 track_id=None, track_info=None, face=None, face_label=None, extras=None):
+        self.bbox = bbox
+        self.bbox_real = bbox_real
+        self.centroid = centroid
+        self.centroid_real = centroid_real
+        self.score = score
+        self.class_id = class_id
+        self.object_index = object_index if object_index is not None else np.arange(len(bbox))
+        self.track_id = track_id if track_id is not None else np.full(len(bbox), -1)
+        self.track_info = track_info if track_info is not None else np.full(len(bbox), None, dtype=object)
+        self.face = face
+        self.face_label = face_label
+        # Attributes added by the legacy plugins (one dict per object, created on demand)
+        self.extras = extras
+
+    @classmethod
+    def from_bboxes(cls, bbox, resolution, score=None, class_id=None, **kwargs):
+        """
+        Creates a batch from the normalized (xmin, ymin, xmax, ymax) coordinates of the boxes.
+        """
+        bbox = np.asarray(bbox).reshape(-1, 4)
+        [w, h] = resolution
+        x0, y0, x1, y1 = bbox.T
+        centroid = np.stack([(x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0], axis=1)
+        centroid_real = np.stack([(x0 + x1) * w / 2, (y0 + y1) * h / 2, (x1 - x0) * w, (y1 - y0) * h], axis=1)
+        bbox_real = np.stack([x0 * w, y0 * h, x1 * w, y1 * h], axis=1)
+        if score is None:
+            score = np.ones(len(bbox))
+        if class_id is None:
+            class_id = np.zeros(len(bbox), dtype=int)
+        return cls(bbox, bbox_real, centroid, centroid_real, np.asarray(score), np.asarray(class_id, dtype=int),
+                   **kwargs)
+
+    @classmethod
+    def from_objects(cls, objects_list):
+        """
+        Creates a batch from a list of objects in the legacy representation (dicts with the "id", "bbox",
+        "centroid", "bboxReal" and "centroidReal" keys).
+        """
+        if isinstance(objects_list, DetectionBatch):
+            return objects_list
+        coordinates = {
+            attr: np.array([obj[key] for obj in objects_list], dtype=float).reshape(-1, 4)
+            for key, attr in COORDINATES_KEYS.items()
+        }
+        ids = [str(obj["id"]).split("-") for obj in objects_list]
+        batch = cls(
+            score=np.array([obj.get("score", 1.0) for obj in objects_list], dtype=float),
+            class_id=np.array([int(obj_id[0]) for obj_id in ids], dtype=int),
+            object_index=np.array([int(obj_id[-1]) for obj_id in ids], dtype=int),
+            **coordinates
+        )
+        for key in OPTIONAL_KEYS:
+            if any(key in obj for obj in objects_list):
+                for i, obj in enumerate(objects_list):
+                    if key in obj:
+                        batch[i][key] = obj[key]
+        extra_keys = set().union(*[obj.keys() for obj in objects_list]).difference(
+            ["id", "score"] + list(COORDINATES_KEYS) + OPTIONAL_KEYS)
+        for key in extra_keys:
+            for i, obj in enumerate(objects_list):
+                if key in obj:
+                    batch[i][key] = obj[key]
+        return batch
+
+    def __len__(self):
+        return len(self.bbox)
+
+    def __iter__(self):
+        return (DetectionView(self, i) for i in range(len(self)))
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if not -len(self) <= index < len(self):
+                raise IndexError("DetectionBatch index out of range")
+            return DetectionView(self, index % len(self))
+        return self.select(index)
+
+    def select(self, indexes):
+        """
+        Returns a new batch with the objects selected by `indexes` (a slice, an array of indexes or a boolean mask).
+        As in numpy, the arrays of the new batch are views of the original ones when `indexes` is a slice.
+        """
+        return DetectionBatch(
+            self.bbox[indexes], self.bbox_real[indexes], self.centroid[indexes], self.centroid_real[indexes],
+            self.score[indexes], self.class_id[indexes], self.object_index[indexes], self.track_id[indexes],
+            self.track_info[indexes],
+            face=self.face[indexes] if self.face is not None else None,
+            face_label=self.face_label[indexes] if self.face_label is not None else None,
+            extras=self.extras[indexes] if self.extras is not None else None
+        )
+
+    def copy(self):
+        batch = self.select(np.arange(len(self)))
+        if batch.extras is not None:
+            batch.extras[:] = [dict(extra) for extra in batch.extras]
+        return batch
+
+    @property
+    def ids(self):
+        """
+        Returns the legacy "<class_id>-<object_index>" ids of the objects.
+        """
+        return [f"{class_id}-{index}" for class_id, index in zip(self.class_id.tolist(), self.object_index.tolist())]
+
+    @property
+    def has_faces(self):
+        """
+        Returns a boolean mask with the objects with a detected face.
+        """
+        if self.face is None:
+            return np.zeros(len(self), dtype=bool)
+        return ~np.isnan(self.face).any(axis=1)
+
+    def to_dicts(self):
+        """
+        Returns the objects in the legacy representation (a list of dicts).
+        """
+        return [dict(obj) for obj in self]
+
+
+class DetectionView(MutableMapping):
+    """
+    Dict-compatible view of an object of a DetectionBatch. Reading a key returns a copy of the value, and
+    assigning a key updates the underlying arrays (keys unknown to the batch are stored as extra attributes).
+    """
+
+    def __init__(self, batch, index):
+        self.batch = batch
+        self.index = index
+
+    def _keys(self):
+        batch, i = self.batch, self.index
+        keys = ["id", "bbox", "centroid", "bboxReal", "centroidReal", "score"]
+        if batch.track_id[i] != -1:
+            keys += ["tracked_id", "track_info"]
+        if batch.face is not None:
+            keys.append("face")
+        if batch.face_label is not None:
+            keys.append("face_label")
+        if batch.extras is not None and batch.extras[i]:
+            keys.extend(batch.extras[i].keys())
+        return keys
+
+    def __getitem__(self, key):
+        batch, i = self.batch, self.index
+        if key not in self._keys():
+            raise KeyError(key)
+        if key == "id":
+            return f"{batch.class_id[i]}-{batch.object_index[i]}"
+        elif key in COORDINATES_KEYS:
+            return getattr(batch, COORDINATES_KEYS[key])[i].tolist()
+        elif key == "score":
+            return batch.score[i].item()
+        elif key == "tracked_id":
+            return batch.track_id[i].item()
+        elif key == "track_info":
+            return batch.track_info[i]
+        elif key == "face":
+            return None if np.isnan(batch.face[i]).any() else batch.face[i].tolist()
+        elif key == "face_label":
+            return batch.face_label[i].item()
+        return batch.extras[i][key]
+
+    def __setitem__(self, key, value):
+        batch, i = self.batch, self.index
+        if key == "id":
+            class_id, object_index = str(value).split("-")
+            batch.class_id[i] = int(class_id)
+            batch.object_index[i] = int(object_index)
+        elif key in COORDINATES_KEYS:
+            getattr(batch, COORDINATES_KEYS[key])[i] = value
+        elif key == "score":
+            batch.score[i] = value
+        elif key == "tracked_id":
+            batch.track_id[i] = value
+        elif key == "track_info":
+            batch.track_info[i] = value
+        elif key == "face":
+            if batch.face is None:
+                batch.face = np.full((len(batch), 4), np.nan)
+            batch.face[i] = value if value is not None else np.nan
+        elif key == "face_label":
+            if batch.face_label is None:
+                batch.face_label = np.full(len(batch), -1)
+            batch.face_label[i] = value if value is not None else -1
+        else:
+            if batch.extras is None:
+                batch.extras = np.empty(len(batch), dtype=object)
+                batch.extras[:] = [{} for _ in range(len(batch))]
+            batch.extras[i][key] = value
+
+    def __delitem__(self, key):
+        batch, i = self.batch, self.index
+        if key not in self._keys():
+            raise KeyError(key)
+        if key in ["tracked_id", "track_info"]:
+            batch.track_id[i] = -1
+            batch.track_info[i] = None
+        elif key in ["face", "face_label"]:
+            self[key] = None if key == "face" else -1
+        elif batch.extras is not None and key in batch.extras[i]:
+            del batch.extras[i][key]
+        else:
+            raise KeyError(f"{key} can't be removed from a DetectionBatch")
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __repr__(self):
+        return repr(dict(self))
@@ -2,6 +2,8 @@ import cv2 as cv
 import logging
 import numpy as np
 
+from libs.detection_batch import DetectionBatch
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,17 +51,45 @@ class Detector:
         object_list = self.detector.inference(rgb_resized_image)
         return self.objects_post_processing(object_list, cv_image)
 
+    def batch_inference(self, cv_images):
+        """
+        Runs the inference for a list of images in a single call (when the detector supports it) and returns the
+        output of `inference` for each one of them.
+        """
+        rgb_resized_images = [
+            cv.cvtColor(cv.resize(cv_image, tuple(self.image_size[:2])), cv.COLOR_BGR2RGB) for cv_image in cv_images
+        ]
+        if hasattr(self.detector, "batch_inference"):
+            objects_lists = self.detector.batch_inference(rgb_resized_images)
+        else:
+            objects_lists = [self.detector.inference(image) for image in rgb_resized_images]
+        return [
+            self.objects_post_processing(object_list, cv_image)
+            for object_list, cv_image in zip(objects_lists, cv_images)
+        ]
+
     def objects_post_processing(self, object_list, cv_image):
+        """
+        Converts the list of objects returned by the detector into a DetectionBatch and crops the faces
+        that have to be classified.
+        """
         # TODO: Move this logic into the inference implementation in each detector
-        [w, h] = self.resolution
-        detection_scores = []
-        class_ids = []
-        detection_bboxes = []
+        # The detectors return normalized [ymin, xmin, ymax, xmax] boxes
+        boxes = np.array([itm["bbox"] for itm in object_list]).reshape(-1, 4)
+        detections = DetectionBatch.from_bboxes(
+            boxes[:, [1, 0, 3, 2]],
+            self.resolution,
+            score=np.array([float(itm.get("score", 1.0)) for itm in object_list]),
+            class_id=np.array([int(itm["id"].split("-")[0]) for itm in object_list], dtype=int),
+            object_index=np.array([int(itm["id"].split("-")[1]) for itm in object_list], dtype=int)
+        )
         classifier_objects = []
-        for itm in object_list:
-            if self.has_classifier and "face" in itm.keys():
-                face_bbox = itm["face"]  # [ymin, xmin, ymax, xmax]
-                if face_bbox is not None:
+        if any("face" in itm for itm in object_list):
+            detections.face = np.array([
+                itm["face"] if itm.get("face") is not None else [np.nan] * 4 for itm in object_list
+            ], dtype=float).reshape(-1, 4)
+            if self.has_classifier:
+                for face_bbox in detections.face[detections.has_faces]:  # [ymin, xmin, ymax, xmax]
                     xmin, xmax = np.multiply([face_bbox[1], face_bbox[3]], self.resolution[0])
                     ymin, ymax = np.multiply([face_bbox[0], face_bbox[2]], self.resolution[1])
                     croped_face = cv_image[
@@ -72,14 +102,5 @@ class Detector:
                     # Normalizing input image to [0.0-1.0]
                     croped_face = np.array(croped_face) / 255.0
                     classifier_objects.append(croped_face)
-            # Prepare tracker input
-            box = itm["bbox"]
-            x0 = box[1]
-            y0 = box[0]
-            x1 = box[3]
-            y1 = box[2]
-            detection_scores.append(itm["score"])
-            class_ids.append(int(itm["id"].split("-")[0]))
-            detection_bboxes.append((int(x0 * w), int(y0 * h), int(x1 * w), int(y1 * h)))
         classifier_objects = np.array(classifier_objects)
-        return object_list, detection_scores, class_ids, detection_bboxes, classifier_objects
+        return detections, classifier_objects
@@ -0,0 +1,94 @@
+import logging
+import time
+
+from queue import Queue, Empty
+from threading import Event, Thread
+
+from .detector import Detector
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceRequest:
+
+    def __init__(self, cv_image):
+        self.cv_image = cv_image
+        self.result = None
+        self.error = None
+        self.done = Event()
+
+
+class InferenceServer(Thread):
+    """
+    Shares a single Detector between all the sources processed by the same process. The frames received from
+    the different CvEngines are grouped into batches of at most `MaxBatchSize` frames (waiting at most
+    `MaxBatchWaitMs` milliseconds for the batch to be completed) and processed with a single inference call.
+    The results are handed back to each CvEngine.
+
+    It exposes the same `inference` method and `fps` property as the Detector, so it can be used by the
+    CvEngine in the same way.
+
+    :param config: Is a ConfigEngine instance which provides necessary parameters.
+    """
+
+    def __init__(self, config):
+        Thread.__init__(self, daemon=True)
+        self.config = config
+        self.detector = Detector(self.config)
+        self.max_batch_size = max(int(self.config.get_section_dict("Detector").get("MaxBatchSize", 1)), 1)
+        self.max_wait_time = float(self.config.get_section_dict("Detector").get("MaxBatchWaitMs", 0)) / 1000
+        self.requests = Queue()
+        self.running = False
+
+    @property
+    def fps(self):
+        return self.detector.fps
+
+    def inference(self, cv_image):
+        """
+        Enqueues the image to be processed in the next batch and waits for the result.
+        """
+        request = InferenceRequest(cv_image)
+        self.requests.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def next_batch(self):
+        batch = [self.requests.get(timeout=1)]
+        deadline = time.perf_counter() + self.max_wait_time
+        while len(batch) < self.max_batch_size:
+            remaining_time = deadline - time.perf_counter()
+            try:
+                if remaining_time > 0:
+                    batch.append(self.requests.get(timeout=remaining_time))
+                else:
+                    batch.append(self.requests.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def run(self):
+        self.running = True
+        logger.info(f"Inference server started (max batch size: {self.max_batch_size})")
+        while self.running:
+            try:
+                batch = self.next_batch()
+            except Empty:
+                continue
+            try:
+                results = self.detector.batch_inference([request.cv_image for request in batch])
+                for request, result in zip(batch, results):
+                    request.result = result
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                for request in batch:
+                    request.error = e
+            finally:
+                for request in batch:
+                    request.done.set()
+
+    def stop(self):
+        self.running = False
+        self.join()
@@ -37,3 +37,8 @@ class Detector:
         output = self.net.inference(resized_rgb_image)
         return output
 
+    def batch_inference(self, resized_rgb_images):
+        self.fps = self.net.fps
+        if hasattr(self.net, "batch_inference"):
+            return self.net.batch_inference(resized_rgb_images)
+        return [self.net.inference(image) for image in resized_rgb_images]
@@ -54,14 +54,24 @@ class Detector:
         Returns:
             result: a dictionary contains of [{"id": 0, "bbox": [x1, y1, x2, y2], "score":s%}, {...}, {...}, ...]
         """
-        input_image = np.expand_dims(resized_rgb_image, axis=0)
-        input_tensor = tf.convert_to_tensor(input_image)
+        return self.batch_inference([resized_rgb_image])[0]
+
+    def batch_inference(self, resized_rgb_images):
+        """
+        Same as `inference` but feeds all the images to the model as a single batch.
+        Args:
+            resized_rgb_images: list of uint8 numpy arrays with shape (img_height, img_width, channels)
+
+        Returns:
+            results: a list with the `inference` result of each image
+        """
+        input_tensor = tf.convert_to_tensor(np.stack(resized_rgb_images))
         t_begin = time.perf_counter()
         output_dict = self.detection_model(input_tensor)
         inference_time = time.perf_counter() - t_begin  # Seconds
 
         # Calculate Frames rate (fps)
-        self.fps = convert_infr_time_to_fps(inference_time)
+        self.fps = convert_infr_time_to_fps(inference_time / len(resized_rgb_images))
 
         boxes = output_dict['detection_boxes']
         labels = output_dict['detection_classes']
@@ -69,9 +79,15 @@ class Detector:
 
         class_id = int(self.config.get_section_dict('Detector')['ClassID'])
         score_threshold = float(self.config.get_section_dict('Detector')['MinScore'])
-        result = []
-        for i in range(boxes.shape[1]):  # number of boxes
-            if labels[0, i] == class_id and scores[0, i] > score_threshold:
-                result.append({"id": str(class_id) + '-' + str(i), "bbox": boxes[0, i, :].numpy(), "score": scores[0, i]})
-
-        return result
+        results = []
+        for batch_index in range(boxes.shape[0]):
+            result = []
+            for i in range(boxes.shape[1]):  # number of boxes
+                if labels[batch_index, i] == class_id and scores[batch_index, i] > score_threshold:
+                    result.append({
+                        "id": str(class_id) + '-' + str(i),
+                        "bbox": boxes[batch_index, i, :].numpy(),
+                        "score": scores[batch_index, i]
+                    })
+            results.append(result)
+        return results
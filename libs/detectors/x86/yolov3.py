@@ -70,8 +70,16 @@ class Detector:
         return img_, orig_im, dim
 
     def inference(self, resized_rgb_image):
-        img, orig_im, dim = self.prep_image(resized_rgb_image, self._inp_dim)
-        im_dim = torch.FloatTensor(dim).repeat(1, 2)
+        return self.batch_inference([resized_rgb_image])[0]
+
+    def batch_inference(self, resized_rgb_images):
+        images, dims = [], []
+        for resized_rgb_image in resized_rgb_images:
+            img, orig_im, dim = self.prep_image(resized_rgb_image, self._inp_dim)
+            images.append(img)
+            dims.append(dim)
+        img = torch.cat(images)
+        im_dim = torch.FloatTensor(dims).repeat(1, 2)
 
         if self._CUDA:
             im_dim = im_dim.cuda()
@@ -83,9 +91,15 @@ class Detector:
             output = self._model(Variable(img), self._CUDA)
         output = write_results(output, self.confidence, self._num_classes, nms=True, nms_conf=self.nms_threshold)
         inference_time = time.perf_counter() - t_begin
-        self.fps = convert_infr_time_to_fps(inference_time)
+        self.fps = convert_infr_time_to_fps(inference_time / len(resized_rgb_images))
+
+        results = [[] for _ in resized_rgb_images]
+        if isinstance(output, int):
+            # No objects were detected in the batch
+            return results
 
-        im_dim = im_dim.repeat(output.size(0), 1)
+        # The first column of the output is the index of the image in the batch
+        im_dim = torch.index_select(im_dim, 0, output[:, 0].long())
         scaling_factor = torch.min(self._inp_dim / im_dim, 1)[0].view(-1, 1)
         output[:, [1, 3]] -= (self._inp_dim - scaling_factor * im_dim[:, 0].view(-1, 1)) / 2
         output[:, [2, 4]] -= (self._inp_dim - scaling_factor * im_dim[:, 1].view(-1, 1)) / 2
@@ -94,8 +108,11 @@ class Detector:
             output[i, [1, 3]] = torch.clamp(output[i, [1, 3]], 0.0, im_dim[i, 0])
             output[i, [2, 4]] = torch.clamp(output[i, [2, 4]], 0.0, im_dim[i, 1])
 
-        result = []
-        for i, pred in enumerate(output):
+        predictions_per_image = [0 for _ in resized_rgb_images]
+        for pred in output:
+            batch_index = int(pred[0].cpu())
+            i = predictions_per_image[batch_index]
+            predictions_per_image[batch_index] += 1
             c1 = pred[1:3].cpu().int().numpy()  # unormalized [xmin, ymin]
             c2 = pred[3:5].cpu().int().numpy()  # unormalized [xmax, ymax]
             cls = int(pred[-1].cpu())
@@ -104,5 +121,5 @@ class Detector:
                 bbox_dict = {"id": "1-" + str(i),
                              "bbox": [c1[1] / self.h, c1[0] / self.w, c2[1] / self.h, c2[0] / self.w], "score": score,
                              "face": None}
-                result.append(bbox_dict)
-        return result
+                results[batch_index].append(bbox_dict)
+        return results
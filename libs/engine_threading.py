@@ -6,16 +6,24 @@ from datetime import datetime
 from shutil import rmtree
 from threading import Thread
 from libs.cv_engine import CvEngine
+from libs.detectors.inference_server import InferenceServer
+from libs.live_state import LiveStateTable
 
 logger = logging.getLogger(__name__)
 
 
-def run_video_processing(config, pipe, sources):
+def run_video_processing(config, pipe, sources, live_state_name=None):
     pid = os.getpid()
     logger.info(f"[{pid}] taking on {len(sources)} cameras")
     threads = []
+    live_state = LiveStateTable.attach(live_state_name)
+    inference_server = None
+    if int(config.get_section_dict("Detector").get("MaxBatchSize", 0)) > 0:
+        # Share a single detector between all the cameras of the process
+        inference_server = InferenceServer(config)
+        inference_server.start()
     for src in sources:
-        engine = EngineThread(config, src)
+        engine = EngineThread(config, src, inference_server, live_state)
         engine.start()
         threads.append(engine)
 
@@ -24,6 +32,10 @@ def run_video_processing(config, pipe, sources):
     logger.info(f"[{pid}] will stop cameras and die")
     for t in threads:
         t.stop()
+    if inference_server:
+        inference_server.stop()
+    if live_state:
+        live_state.close()
 
     for src in sources:
         logger.info("Clean up video output")
@@ -37,15 +49,17 @@ def run_video_processing(config, pipe, sources):
 
 
 class EngineThread(Thread):
-    def __init__(self, config, source):
+    def __init__(self, config, source, inference_server=None, live_state=None):
         Thread.__init__(self)
         self.engine = None
         self.config = config
         self.source = source
+        self.inference_server = inference_server
+        self.live_state = live_state
 
     def run(self):
         try:
-            self.engine = CvEngine(self.config, self.source["section"])
+            self.engine = CvEngine(self.config, self.source["section"], self.inference_server, self.live_state)
             restarts = 0
             max_restarts = int(self.config.get_section_dict("App")["MaxThreadRestarts"])
             while True:
@@ -0,0 +1,158 @@
+import cv2 as cv
+import logging
+import numpy as np
+import os
+import time
+
+from collections import deque
+from threading import Condition, Thread
+
+logger = logging.getLogger(__name__)
+
+
+class FrameGrabber:
+    """
+    Wraps a cv.VideoCapture and decouples the capture of the frames from their processing.
+
+    When `queue_size` is greater than 0 the frames are captured in a dedicated thread and only the latest
+    `queue_size` frames are kept (drop-oldest policy). That way, the latency of a live source (RTSP, HTTP, etc.)
+    doesn't grow when the processing is slower than the camera. Otherwise, the frames are captured synchronously
+    every time `read` is called.
+
+    Only one of every `frame_stride` frames is retrieved, the others are grabbed (without being retrieved) and
+    discarded.
+
+    :param video_uri: Path or url of the video source.
+    :param queue_size: Maximum number of frames waiting to be processed. Use 0 to disable the capture thread.
+    """
+
+    def __init__(self, video_uri, queue_size=0):
+        self.video_uri = video_uri
+        self.queue_size = queue_size
+        self.input_cap = cv.VideoCapture(video_uri)
+        self.frames = deque(maxlen=max(queue_size, 1))
+        self.frames_available = Condition()
+        self.capturing = False
+        self.capture_thread = None
+        self.frame_stride = 1
+        # Counters
+        self.grabbed_frames = 0
+        self.dropped_frames = 0
+
+    @property
+    def fps(self):
+        return self.input_cap.get(cv.CAP_PROP_FPS)
+
+    def is_opened(self):
+        return self.input_cap.isOpened()
+
+    def start(self):
+        if self.queue_size <= 0:
+            return
+        self.capturing = True
+        self.capture_thread = Thread(target=self._capture_frames, daemon=True)
+        self.capture_thread.start()
+
+    def _read_frame(self):
+        for _ in range(self.frame_stride - 1):
+            self.input_cap.grab()
+        _, cv_image = self.input_cap.read()
+        return cv_image
+
+    def _capture_frames(self):
+        while self.capturing and self.input_cap.isOpened():
+            cv_image = self._read_frame()
+            if np.shape(cv_image) == ():
+                # Avoid a busy loop while the source is not delivering frames
+                time.sleep(0.01)
+                continue
+            with self.frames_available:
+                if len(self.frames) == self.frames.maxlen:
+                    # The oldest frame is discarded by the deque
+                    self.dropped_frames += 1
+                self.frames.append(cv_image)
+                self.grabbed_frames += 1
+                self.frames_available.notify()
+
+    def read(self, timeout=1):
+        """
+        Returns the next frame to process. If the capture thread is enabled, waits at most `timeout` seconds
+        for a new frame and returns None if there is nothing to process.
+        """
+        if self.capture_thread is None:
+            cv_image = self._read_frame()
+            if np.shape(cv_image) != ():
+                self.grabbed_frames += 1
+            return cv_image
+        with self.frames_available:
+            if not self.frames:
+                self.frames_available.wait(timeout)
+            if not self.frames:
+                return None
+            return self.frames.popleft()
+
+    def release(self):
+        self.capturing = False
+        if self.capture_thread is not None:
+            self.capture_thread.join()
+            self.capture_thread = None
+        self.input_cap.release()
+        if self.dropped_frames:
+            logger.info(f"{self.dropped_frames} of {self.grabbed_frames} frames dropped for {self.video_uri}")
+
+
+class FrameScheduler:
+    """
+    Computes the `frame_stride` required to analyse a source at a target rate. The stride is adapted to the
+    measured processing time of the frames and it is increased when the CPU is saturated (the load average is
+    greater than the number of CPUs).
+
+    :param source_fps: Frames per second delivered by the source.
+    :param target_fps: Desired number of frames analysed per second.
+    """
+
+    def __init__(self, source_fps, target_fps):
+        self.source_fps = source_fps
+        self.target_fps = target_fps
+        self.frame_stride = 1
+        self.processing_time = None
+        self.cpu_load = 0
+        self.last_cpu_load_check = 0
+        self.analysed_frames_times = deque(maxlen=50)
+
+    @property
+    def achieved_fps(self):
+        """
+        Returns the number of frames analysed per second (measured over the latest frames).
+        """
+        if len(self.analysed_frames_times) < 2:
+            return 0
+        elapsed_time = self.analysed_frames_times[-1] - self.analysed_frames_times[0]
+        if elapsed_time <= 0:
+            return 0
+        return (len(self.analysed_frames_times) - 1) / elapsed_time
+
+    def update(self, processing_time):
+        """
+        Receives the processing time of the latest analysed frame and returns the stride for the next ones.
+        """
+        now = time.perf_counter()
+        self.analysed_frames_times.append(now)
+        if self.processing_time is None:
+            self.processing_time = processing_time
+        else:
+            # Exponential moving average to smooth the peaks
+            self.processing_time = 0.9 * self.processing_time + 0.1 * processing_time
+        if now - self.last_cpu_load_check > 1:
+            self.last_cpu_load_check = now
+            self.cpu_load = os.getloadavg()[0] / os.cpu_count()
+
+        target_fps = self.target_fps
+        if self.processing_time > 0:
+            target_fps = min(target_fps, 1 / self.processing_time)
+        if self.cpu_load > 1:
+            # The CPU is shared with other sources, back off
+            target_fps /= self.cpu_load
+        if self.source_fps > 0:
+            self.frame_stride = max(1, int(round(self.source_fps / target_fps)))
+        return self.frame_stride
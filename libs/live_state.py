@@ -0,0 +1,124 @@
+import logging
+import numpy as np
+import time
+
+logger = logging.getLogger(__name__)
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # multiprocessing.shared_memory is only available from Python 3.8
+    shared_memory = None
+
+# One record for each camera. Each record has a single writer (the engine of the camera) and it is protected with
+# a sequence lock: the sequence is odd while the record is being written.
+LIVE_STATE_DTYPE = np.dtype([
+    ("camera_id", "U64"),
+    ("sequence", "<i8"),
+    ("timestamp", "<f8"),  # time.time() of the latest processed frame, 0 if the camera didn't publish yet
+    ("occupancy", "<i4"),
+    ("violations", "<i4"),
+])
+# Number of attempts to read a record that is being written before giving up (e.g. the writer was killed)
+MAX_READ_RETRIES = 20
+# Pause between two attempts, doubled after each attempt up to MAX_READ_BACKOFF seconds
+READ_BACKOFF = 0.0001
+MAX_READ_BACKOFF = 0.01
+
+
+class LiveStateTable:
+    """
+    Table of the latest state (occupancy, number of violations and timestamp) of each camera, stored in a
+    `multiprocessing.shared_memory` block. The processor core creates the table and the camera and area
+    processes attach to it by name, so the areas read the state of the cameras without any file I/O.
+    """
+
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner
+        self.records = np.ndarray((shm.size // LIVE_STATE_DTYPE.itemsize,), dtype=LIVE_STATE_DTYPE, buffer=shm.buf)
+        self.indexes = {camera_id: i for i, camera_id in enumerate(self.records["camera_id"].tolist())}
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @classmethod
+    def create(cls, cameras_ids):
+        """
+        Creates the table for the given cameras. Returns None if shared memory is not supported by this Python.
+        """
+        if shared_memory is None:
+            logger.warning("multiprocessing.shared_memory is not available, the areas will read the logs")
+            return None
+        shm = shared_memory.SharedMemory(create=True, size=max(len(cameras_ids), 1) * LIVE_STATE_DTYPE.itemsize)
+        records = np.ndarray((shm.size // LIVE_STATE_DTYPE.itemsize,), dtype=LIVE_STATE_DTYPE, buffer=shm.buf)
+        records[:] = np.zeros(len(records), dtype=LIVE_STATE_DTYPE)
+        records["camera_id"][:len(cameras_ids)] = cameras_ids
+        del records
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attaches to the table created by another process. Returns None if the table is not available.
+        """
+        if not name or shared_memory is None:
+            return None
+        try:
+            return cls(shared_memory.SharedMemory(name=name))
+        except FileNotFoundError:
+            logger.warning(f"Live state table {name} not found, the state will be read from the logs")
+            return None
+
+    def publish(self, camera_id, occupancy, violations, timestamp=None):
+        index = self.indexes.get(camera_id)
+        if index is None:
+            return
+        record = self.records[index:index + 1]
+        # A writer killed in the middle of a write leaves an odd sequence
+        sequence = record["sequence"][0] + record["sequence"][0] % 2
+        record["sequence"] = sequence + 1
+        record["timestamp"] = timestamp if timestamp is not None else time.time()
+        record["occupancy"] = occupancy
+        record["violations"] = violations
+        record["sequence"] = sequence + 2
+
+    def read(self, camera_id):
+        """
+        Returns a dict with the latest "timestamp", "occupancy" and "violations" of the camera, or None if the
+        camera is not in the table, it didn't publish its state yet or the record couldn't be read (it's being
+        written for too long).
+        """
+        index = self.indexes.get(camera_id)
+        if index is None:
+            return None
+        state = None
+        backoff = READ_BACKOFF
+        for attempt in range(MAX_READ_RETRIES):
+            if attempt:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_READ_BACKOFF)
+            sequence = self.records["sequence"][index]
+            if sequence % 2:
+                # The writer is updating the record
+                continue
+            record = self.records[index]
+            timestamp, occupancy, violations = record["timestamp"], record["occupancy"], record["violations"]
+            if self.records["sequence"][index] == sequence:
+                state = (timestamp, occupancy, violations)
+                break
+        if state is None:
+            logger.warning(f"Live state of the camera {camera_id} couldn't be read, it will be read from the logs")
+            return None
+        timestamp, occupancy, violations = state
+        if timestamp == 0:
+            return None
+        return {"timestamp": float(timestamp), "occupancy": int(occupancy), "violations": int(violations)}
+
+    def close(self):
+        # Release the views of the shared memory before closing it
+        self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,167 @@
+import csv
+import numpy as np
+import os
+
+from threading import Lock, Timer
+
+from libs.utils.objects_log import DETECTION_DTYPE, FRAME_DTYPE, build_records, get_binary_objects_log_paths
+
+
+class DailyLogWriter:
+    """
+    Long-lived writer of a daily log file (one file per day). The file is kept open and the rows are buffered in
+    memory, they are written when `max_rows` rows are buffered, `flush_interval` seconds after the first row is
+    buffered (by a timer, even if no other row is written), when the day changes (before opening the file of the new
+    day) and on `close`. The first row of a file is written right away, so the readers never find a log file without
+    rows.
+
+    :param directory: Directory of the log files.
+    :param max_rows: Maximum number of buffered rows.
+    :param flush_interval: Maximum time (in seconds) that a row is kept in memory.
+    """
+
+    def __init__(self, directory, max_rows=50, flush_interval=5):
+        self.directory = directory
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.log_date = None
+        self.buffer = []
+        # The timer flushes the rows from another thread
+        self.lock = Lock()
+        self.flush_timer = None
+
+    def write(self, log_date, row):
+        log_date = str(log_date)
+        with self.lock:
+            new_file = log_date != self.log_date
+            if new_file:
+                # Midnight rotation, the buffered rows belong to the previous day
+                self._close()
+                self.open(log_date)
+                self.log_date = log_date
+            self.buffer.append(row)
+            if new_file or len(self.buffer) >= self.max_rows:
+                self._flush()
+            elif self.flush_timer is None:
+                self.flush_timer = Timer(self.flush_interval, self.flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+    def _flush(self):
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        if self.buffer:
+            self.write_rows(self.buffer)
+            self.buffer = []
+
+    def _close(self):
+        if self.log_date is None:
+            return
+        self._flush()
+        self.close_files()
+        self.log_date = None
+
+    def open(self, log_date):
+        raise NotImplementedError
+
+    def write_rows(self, rows):
+        raise NotImplementedError
+
+    def close_files(self):
+        raise NotImplementedError
+
+
+class DailyCsvWriter(DailyLogWriter):
+    """
+    DailyLogWriter of <date>.csv files. The header is written when a new file is created.
+    """
+
+    def __init__(self, directory, headers, max_rows=50, flush_interval=5):
+        super().__init__(directory, max_rows, flush_interval)
+        self.headers = headers
+        self.csv_file = None
+        self.writer = None
+
+    def open(self, log_date):
+        file_path = os.path.join(self.directory, log_date + ".csv")
+        file_exists = os.path.isfile(file_path)
+        self.csv_file = open(file_path, "a", newline="")
+        self.writer = csv.DictWriter(self.csv_file, fieldnames=self.headers)
+        if not file_exists:
+            self.writer.writeheader()
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+        self.csv_file.flush()
+
+    def close_files(self):
+        self.csv_file.close()
+        self.csv_file = None
+        self.writer = None
+
+
+class DailyBinaryObjectsLogWriter(DailyLogWriter):
+    """
+    DailyLogWriter of binary objects logs (see libs.utils.objects_log). Each row is a tuple
+    (time_stamp, objects, violating_objects_index_list, violating_objects_count, environment_score).
+    """
+
+    def __init__(self, directory, max_rows=50, flush_interval=5):
+        super().__init__(directory, max_rows, flush_interval)
+        self.frames_file = None
+        self.detections_file = None
+        self.detections_count = 0
+
+    def open(self, log_date):
+        frames_path, detections_path = get_binary_objects_log_paths(self.directory, log_date)
+        self.detections_count = self.truncate_partial_records(frames_path, detections_path)
+        self.detections_file = open(detections_path, "ab")
+        self.frames_file = open(frames_path, "ab")
+
+    @staticmethod
+    def truncate_partial_records(frames_path, detections_path):
+        """
+        Removes the records left by an interrupted write (e.g. the process was killed), so the new records are
+        appended at the offset of a whole record: the partial record at the end of the frames file and the
+        detections without frame record. Returns the number of detections kept.
+        """
+        frames_count = 0
+        if os.path.isfile(frames_path):
+            frames_count = os.path.getsize(frames_path) // FRAME_DTYPE.itemsize
+            os.truncate(frames_path, frames_count * FRAME_DTYPE.itemsize)
+        detections_count = 0
+        if frames_count:
+            last_frame = np.fromfile(
+                frames_path, dtype=FRAME_DTYPE, count=1, offset=(frames_count - 1) * FRAME_DTYPE.itemsize)[0]
+            detections_count = int(last_frame["first_detection"] + last_frame["detections_count"])
+        if os.path.isfile(detections_path):
+            detections_count = min(detections_count, os.path.getsize(detections_path) // DETECTION_DTYPE.itemsize)
+            os.truncate(detections_path, detections_count * DETECTION_DTYPE.itemsize)
+        return detections_count
+
+    def write_rows(self, rows):
+        frames = []
+        for row in rows:
+            frame, detections = build_records(*row, first_detection=self.detections_count)
+            self.detections_file.write(detections.tobytes())
+            self.detections_count += len(detections)
+            frames.append(frame.tobytes())
+        # The detections are written before their frames
+        self.detections_file.flush()
+        self.frames_file.write(b"".join(frames))
+        self.frames_file.flush()
+
+    def close_files(self):
+        self.detections_file.close()
+        self.frames_file.close()
+        self.detections_file = None
+        self.frames_file = None
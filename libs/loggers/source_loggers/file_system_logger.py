@@ -1,14 +1,15 @@
-import csv
 import logging
 import os
 import time
 
 import cv2 as cv
-from datetime import date
 
+from libs.loggers.log_writers import DailyBinaryObjectsLogWriter, DailyCsvWriter
 from .raw_data_logger import RawDataLogger
 
 logger = logging.getLogger(__name__)
+OBJECTS_LOG_HEADERS = ["Version", "Timestamp", "DetectedObjects", "ViolatingObjects",
+                       "EnvironmentScore", "Detections", "ViolationsIndexes"]
 
 
 class FileSystemLogger(RawDataLogger):
@@ -18,6 +19,15 @@ class FileSystemLogger(RawDataLogger):
         self.log_directory = config.get_section_dict(logger)["LogDirectory"]
         self.objects_log_directory = os.path.join(self.log_directory, self.camera_id, "objects_log")
         os.makedirs(self.objects_log_directory, exist_ok=True)
+        logger_section = self.config.get_section_dict(logger)
+        # The rows are buffered and written at most every `BufferFlushInterval` seconds
+        max_rows = int(logger_section.get("BufferMaxRows", 50))
+        flush_interval = float(logger_section.get("BufferFlushInterval", 5))
+        self.csv_writer = DailyCsvWriter(self.objects_log_directory, OBJECTS_LOG_HEADERS, max_rows, flush_interval)
+        # Also write the objects log in the binary (columnar) format
+        self.binary_writer = None
+        if "BinaryObjectsLog" in logger_section and config.get_boolean(logger, "BinaryObjectsLog"):
+            self.binary_writer = DailyBinaryObjectsLogWriter(self.objects_log_directory, max_rows, flush_interval)
 
         # config.ini uses minutes as the unit for ScreenshotPeriod
         self.screenshot_period = float(self.config.get_section_dict(logger)["ScreenshotPeriod"]) * 60
@@ -32,23 +42,28 @@ class FileSystemLogger(RawDataLogger):
 
     def log_objects(self, objects, violating_objects, violating_objects_index_list, violating_objects_count,
                     detected_objects_cout, environment_score, time_stamp, version):
-        file_name = str(date.today())
-        file_path = os.path.join(self.objects_log_directory, file_name + ".csv")
-        file_exists = os.path.isfile(file_path)
-        with open(file_path, "a") as csvfile:
-            headers = ["Version", "Timestamp", "DetectedObjects", "ViolatingObjects",
-                       "EnvironmentScore", "Detections", 'ViolationsIndexes']
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(
-                {"Version": version, "Timestamp": time_stamp, "DetectedObjects": detected_objects_cout,
-                 "ViolatingObjects": violating_objects_count, "EnvironmentScore": environment_score,
-                 "Detections": str(objects), "ViolationsIndexes": str(violating_objects_index_list)})
-
-    def update(self, cv_image, objects, post_processing_data, fps):
+        # The row is logged in the file of the day of its timestamp ("%Y-%m-%d %H:%M:%S")
+        file_name = time_stamp.split(" ")[0]
+        self.csv_writer.write(
+            file_name,
+            {"Version": version, "Timestamp": time_stamp, "DetectedObjects": detected_objects_cout,
+             "ViolatingObjects": violating_objects_count, "EnvironmentScore": environment_score,
+             "Detections": str(objects), "ViolationsIndexes": str(violating_objects_index_list)}
+        )
+        if self.binary_writer:
+            self.binary_writer.write(
+                file_name,
+                (time_stamp, objects, violating_objects_index_list, violating_objects_count, environment_score)
+            )
+
+    def update(self, cv_image, objects, post_processing_data, fps, time_stamp=None):
         # Save a screenshot only if the period is greater than 0, and the minimum period has occured
         if (self.screenshot_period > 0) and (time.time() > self.last_screeenshot_time + self.screenshot_period):
             self.last_screeenshot_time = time.time()
             self.save_screenshot(cv_image)
-        super().update(cv_image, objects, post_processing_data, fps)
+        super().update(cv_image, objects, post_processing_data, fps, time_stamp)
+
+    def stop_logging(self):
+        self.csv_writer.close()
+        if self.binary_writer:
+            self.binary_writer.close()
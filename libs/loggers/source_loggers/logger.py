@@ -1,7 +1,24 @@
+from datetime import datetime
+
+from .logger_queue import BLOCK, DROP_NEWEST, DROP_OLDEST, LoggerQueue
+
+# Policy applied when the queue of a logger is full
+DEFAULT_DROP_POLICIES = {
+    # The live video only needs the latest frames
+    "video_logger": DROP_OLDEST,
+    # The screenshots already queued are kept while an upload is stalled
+    "s3_logger": DROP_NEWEST,
+    # Writing the logs is cheap and no row should be lost
+    "file_system_logger": BLOCK,
+    "web_hook_logger": DROP_OLDEST,
+}
+
+
 class Logger:
 
     def __init__(self, config, source: str, logger: str):
-        logger_name = config.get_section_dict(logger)["Name"]
+        logger_section = config.get_section_dict(logger)
+        logger_name = logger_section["Name"]
         self.logger = None
         if logger_name == "video_logger":
             from .video_logger import VideoLogger
@@ -17,12 +34,39 @@ class Logger:
             self.logger = WebHookLogger(config, source, logger)
         else:
             raise ValueError('Not supported logger named: ', logger_name)
+        self.logger_name = logger_name
+        # The video logger draws over the image, the other loggers must not see those changes
+        self.copy_image = logger_name == "video_logger"
+        # The updates are processed in a worker thread if QueueSize > 0 (by default in the processing thread)
+        self.queue = None
+        queue_size = int(logger_section.get("QueueSize", 0))
+        if queue_size > 0:
+            drop_policy = logger_section.get("DropPolicy", DEFAULT_DROP_POLICIES[logger_name])
+            source_id = config.get_section_dict(source)["Id"]
+            self.queue = LoggerQueue(f"{logger_name} ({source_id})", self.logger.update, queue_size, drop_policy)
 
     def update(self, cv_image, objects, post_processing_data, fps):
-        self.logger.update(cv_image, objects, post_processing_data, fps)
+        # The time of the frame is taken here, the update can wait in the queue before it's logged
+        time_stamp = datetime.now()
+        if self.queue is None:
+            self.logger.update(cv_image, objects, post_processing_data, fps, time_stamp)
+            return
+        if self.copy_image:
+            cv_image = cv_image.copy()
+        self.queue.put(cv_image, objects, post_processing_data, fps, time_stamp)
 
     def start_logging(self, fps):
         self.logger.start_logging(fps)
+        if self.queue:
+            self.queue.start()
 
     def stop_logging(self):
+        if self.queue:
+            self.queue.stop()
         self.logger.stop_logging()
+
+    def get_queue_metrics(self):
+        """
+        Returns the metrics of the queue of the logger (None if the logger runs in the processing thread).
+        """
+        return self.queue.get_metrics() if self.queue else None
@@ -0,0 +1,109 @@
+import logging
+
+from collections import deque
+from threading import Condition, Thread
+
+logger = logging.getLogger(__name__)
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+DROP_POLICIES = [BLOCK, DROP_OLDEST, DROP_NEWEST]
+
+
+class LoggerQueue:
+    """
+    Bounded queue of updates consumed by a worker thread, used to run a logger out of the processing thread of
+    the camera. When the queue is full the `drop_policy` is applied:
+
+    - block: the producer waits until the worker makes room (no update is lost).
+    - drop_oldest: the oldest queued update is discarded (keeps the latest frames, e.g. for the live video).
+    - drop_newest: the new update is discarded (keeps the updates already queued).
+
+    :param name: Name used in the logs.
+    :param handler: Callable that processes each update (the arguments passed to `put`).
+    :param max_size: Maximum number of queued updates.
+    :param drop_policy: One of DROP_POLICIES.
+    """
+
+    def __init__(self, name, handler, max_size, drop_policy=DROP_OLDEST):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Not supported drop policy: {drop_policy}")
+        self.name = name
+        self.handler = handler
+        self.max_size = max_size
+        self.drop_policy = drop_policy
+        self.updates = deque()
+        self.condition = Condition()
+        self.running = False
+        self.worker = None
+        # Metrics
+        self.processed_updates = 0
+        self.dropped_updates = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self):
+        return len(self.updates)
+
+    def start(self):
+        self.running = True
+        self.worker = Thread(target=self._process_updates, daemon=True)
+        self.worker.start()
+
+    def put(self, *args):
+        with self.condition:
+            if len(self.updates) >= self.max_size:
+                if self.drop_policy == DROP_NEWEST:
+                    self.dropped_updates += 1
+                    return
+                elif self.drop_policy == DROP_OLDEST:
+                    self.updates.popleft()
+                    self.dropped_updates += 1
+                else:
+                    while len(self.updates) >= self.max_size and self.running:
+                        self.condition.wait()
+            self.updates.append(args)
+            self.max_depth = max(self.max_depth, len(self.updates))
+            self.condition.notify_all()
+
+    def _process_updates(self):
+        while True:
+            with self.condition:
+                while not self.updates and self.running:
+                    self.condition.wait()
+                if not self.updates:
+                    # Stopped and drained
+                    return
+                args = self.updates.popleft()
+                self.condition.notify_all()
+            try:
+                self.handler(*args)
+            except Exception:
+                logger.exception(f"Error processing an update of {self.name}")
+            self.processed_updates += 1
+
+    def stop(self):
+        """
+        Waits until the queued updates are processed and stops the worker.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+
+    def get_metrics(self):
+        """
+        Returns the queue depth metrics and resets the maximum depth.
+        """
+        with self.condition:
+            metrics = {
+                "depth": len(self.updates),
+                "max_depth": self.max_depth,
+                "processed": self.processed_updates,
+                "dropped": self.dropped_updates,
+            }
+            self.max_depth = len(self.updates)
+        return metrics
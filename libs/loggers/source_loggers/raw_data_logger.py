@@ -1,6 +1,5 @@
 import logging
 import itertools
-import time
 
 from datetime import datetime
 
@@ -22,13 +21,14 @@ class RawDataLogger:
                     detected_objects_cout, environment_score, time_stamp, version):
         raise NotImplementedError
 
-    def update(self, cv_image, objects, post_processing_data, fps):
+    def update(self, cv_image, objects, post_processing_data, fps, time_stamp=None):
         violating_objects = post_processing_data.get("violating_objects", [])
         # Save a screenshot only if the period is greater than 0, a violation is detected, and the minimum period
         # has occured
-        if time.time() - self.submited_time > self.time_interval:
+        # The interval is measured with the time of the frame, the update could have waited in the logger queue
+        now = time_stamp or datetime.now()
+        if now.timestamp() - self.submited_time > self.time_interval:
             # Get timeline which is used for as Timestamp
-            now = datetime.now()
             current_time = now.strftime("%Y-%m-%d %H:%M:%S")
             # Process objects
             objects_formated = self.format_objects(objects)
@@ -50,23 +50,26 @@ class RawDataLogger:
                 current_time,
                 version=LOG_FORMAT_VERSION
             )
-            self.submited_time = time.time()
+            self.submited_time = now.timestamp()
 
     def format_objects(self, objects_list):
         """ Format the attributes of the objects in a way ready to be saved
 
             Args:
-                objects_list: a list of dictionary where each dictionary stores information of an object (person) in a frame.
+                objects_list: a DetectionBatch which stores information of the objects (people) in a frame.
         """
         objects = []
-        for obj_dict in objects_list:
+        tracking_ids = objects_list.track_id.tolist()
+        ids = objects_list.ids
+        face_labels = objects_list.face_label.tolist() if objects_list.face_label is not None else None
+        for i, bbox in enumerate(objects_list.bbox.tolist()):
             obj = {}
             # TODO: Get 3D position of objects
             obj["position"] = [0.0, 0.0, 0.0]
-            obj["bbox"] = obj_dict["bbox"]
-            obj["tracking_id"] = obj_dict.get("tracked_id", obj_dict["id"])
-            if "face_label" in obj_dict and obj_dict["face_label"] != -1:
-                obj["face_label"] = obj_dict["face_label"]
+            obj["bbox"] = bbox
+            obj["tracking_id"] = tracking_ids[i] if tracking_ids[i] != -1 else ids[i]
+            if face_labels is not None and face_labels[i] != -1:
+                obj["face_label"] = face_labels[i]
             # TODO: Add more optional parameters
             objects.append(obj)
         return objects
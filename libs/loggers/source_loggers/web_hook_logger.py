@@ -1,35 +1,47 @@
-import logging
-import requests
-
-from requests.exceptions import ConnectionError
-
+from libs.uploaders.web_hook_uploader import WebHookUploader
 from .raw_data_logger import RawDataLogger
 
-logger = logging.getLogger(__name__)
-
 
 class WebHookLogger(RawDataLogger):
 
     def __init__(self, config, source: str, logger: str):
         super().__init__(config, source, logger)
-        self.web_hook_endpoint = config.get_section_dict(logger)["Endpoint"]
+        logger_section = config.get_section_dict(logger)
+        self.web_hook_endpoint = logger_section["Endpoint"]
+        self.uploader = None
+        if self.web_hook_endpoint:
+            # The uploader (and its connections) is shared by all the cameras of the process
+            self.uploader = WebHookUploader.get_uploader(
+                self.web_hook_endpoint,
+                batch_size=int(logger_section.get("BatchSize", 50)),
+                flush_interval=float(logger_section.get("FlushInterval", 5)),
+                timeout=float(logger_section.get("RequestTimeout", 5)),
+                max_retries=int(logger_section.get("MaxRetries", 3)),
+                compress="Gzip" not in logger_section or config.get_boolean(logger, "Gzip"),
+                spool_directory=logger_section.get("SpoolDirectory")
+            )
 
     def log_objects(self, objects, violating_objects, violating_objects_index_list, violating_objects_count,
                     detected_objects_cout, environment_score, time_stamp, version):
-        request_data = {
+        self.uploader.add({
             "version": version,
+            "camera_id": self.camera_id,
             "timestamp": time_stamp,
             "detected_objects": detected_objects_cout,
             "violating_objects": violating_objects_count,
             "environment_score": environment_score,
             "detections": str(objects),
             "violations_indexes": str(violating_objects_index_list)
-        }
-        try:
-            requests.put(self.web_hook_endpoint, data=request_data)
-        except ConnectionError:
-            logger.error(f"Connection with endpoint {self.web_hook_endpoint} can't be established")
+        })
 
-    def update(self, cv_image, objects, post_processing_data, fps):
+    def update(self, cv_image, objects, post_processing_data, fps, time_stamp=None):
         if self.web_hook_endpoint:
-            super().update(cv_image, objects, post_processing_data, fps)
+            super().update(cv_image, objects, post_processing_data, fps, time_stamp)
+
+    def start_logging(self, fps):
+        if self.uploader:
+            self.uploader.acquire()
+
+    def stop_logging(self):
+        if self.uploader:
+            self.uploader.release()
@@ -1,14 +1,18 @@
 import os
 import csv
+import json
 import numpy as np
 import pandas as pd
 import logging
+import shutil
 
-from collections import deque
 from datetime import date, datetime, timedelta, time
 from typing import Dict, List, Iterator
 
+from libs.utils.log_tail import read_last_rows
 from libs.utils.loggers import get_source_log_directory, get_area_log_directory, get_source_logging_interval
+from libs.utils.objects_log import decode_csv_row, read_complete_binary_objects_log, select_detections
+from .reports_store import ReportsStore, DAILY_REPORT_HOUR, REPORTS_STORE_FILE
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +22,83 @@ def parse_date_range(dates):
     while not dates.empty:
         start = 0
         end = (7 - dates[start].weekday()) - 1
-        if end > len(dates):
+        if end >= len(dates):
             end = len(dates) - 1
 
         yield (dates[start], dates[end])
         dates = dates[end+1:]
 
 
+def group_by_track(track_ids, *values) -> tuple:
+    """
+    Returns the index of the track of each detection and the `values` arrays, sorted by track. The sort is stable,
+    so the detections of each track keep their chronological order.
+    """
+    _, tracks = np.unique(np.asarray(track_ids), return_inverse=True)
+    tracks = tracks.reshape(-1)
+    order = np.argsort(tracks, kind="stable")
+    return (tracks[order],) + tuple(np.asarray(value)[order] for value in values)
+
+
+def get_stable_state_changes(tracks, states, processing_count_threshold: int):
+    """
+    Run-length encodes the `states` of each track (see `group_by_track`) and returns the index of the first
+    detection of the runs where the track changes its state. A run is a change when it has at least
+    `processing_count_threshold` detections and its state differs from the one of the previous change of the
+    track (shorter runs are ignored).
+    """
+    if len(states) == 0:
+        return np.zeros(0, dtype=np.int64)
+    new_run = np.ones(len(states), dtype=bool)
+    new_run[1:] = (tracks[1:] != tracks[:-1]) | (states[1:] != states[:-1])
+    runs_starts = np.flatnonzero(new_run)
+    runs_lengths = np.diff(np.append(runs_starts, len(states)))
+    stable_runs = runs_starts[runs_lengths >= processing_count_threshold]
+    changes = np.ones(len(stable_runs), dtype=bool)
+    changes[1:] = ((tracks[stable_runs[1:]] != tracks[stable_runs[:-1]]) |
+                   (states[stable_runs[1:]] != states[stable_runs[:-1]]))
+    return stable_runs[changes]
+
+
+def append_csv_rows(file_path: str, headers: List[str], rows: List[Dict]):
+    """
+    Appends the `rows` to the CSV `file_path` (creating it with the `headers` if it doesn't exist). The rows are
+    written in a copy of the file that replaces it once it's completely written, so a reader (or a crash) never
+    sees a partially written report.
+    """
+    tmp_path = file_path + ".tmp"
+    file_exists = os.path.isfile(file_path)
+    if file_exists:
+        shutil.copyfile(file_path, tmp_path)
+    with open(tmp_path, "a", newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=headers)
+        if not file_exists:
+            writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, file_path)
+
+
+def read_log_rows(log_file: str, offset: int, time_until: datetime) -> Iterator:
+    """
+    Generator. Yields a tuple (row_time, row, end_offset) for each complete row of the CSV `log_file` logged before
+    `time_until`, starting at the byte `offset`. `end_offset` is the offset of the next row.
+    """
+    with open(log_file, "rb") as log:
+        headers = next(csv.reader([log.readline().decode("utf-8")]), [])
+        offset = max(offset, log.tell())
+        log.seek(offset)
+        for line in iter(log.readline, b""):
+            if not line.endswith(b"\n"):
+                # The row is still being written
+                return
+            row = dict(zip(headers, next(csv.reader([line.decode("utf-8")]))))
+            row_time = datetime.strptime(row["Timestamp"], "%Y-%m-%d %H:%M:%S")
+            if row_time >= time_until:
+                return
+            offset += len(line)
+            yield row_time, row, offset
+
+
 class BaseMetric:
     processing_count_threshold = 3
     reports_folder = None
@@ -52,6 +126,22 @@ class BaseMetric:
         """
         raise NotImplementedError
 
+    @classmethod
+    def procces_objects_log_row(cls, row_time, detections, violations_indexes, object_logs):
+        """
+        Same as `procces_csv_row` but receives the decoded values of a row of an objects log (see
+        libs.utils.objects_log.decode_csv_row), so the rows can be decoded once for several metrics.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def procces_binary_log(cls, frames, detections, object_logs):
+        """
+        Same as `procces_csv_row` but extracts the information from the records of a binary objects log
+        (see libs.utils.objects_log).
+        """
+        raise NotImplementedError
+
     @classmethod
     def generate_hourly_metric_data(cls, object_logs, entity):
         """
@@ -61,7 +151,14 @@ class BaseMetric:
 
     @classmethod
     def generate_hourly_csv_data(cls, entity: Dict, entity_file: str, time_from: datetime,
-                                 time_until: datetime):
+                                 time_until: datetime, checkpoint: Dict = None):
+        """
+        Generates the hourly reports of the rows of `entity_file` logged in the [time_from, time_until) interval.
+
+        If a `checkpoint` dict is received, the file is read from its "offset" (the byte offset of the first row
+        not processed by the previous run) and the offset is updated with the position of the first row logged
+        after `time_until`. The rows are logged in chronological order, so each run only parses the new rows.
+        """
         if not os.path.isfile(entity_file):
             entity_type = "Camera" if cls.entity else "Area"
             logger.warn(f"The [{entity_type}: {entity['id']}] contains no recorded data for that day")
@@ -69,63 +166,154 @@ class BaseMetric:
         objects_logs = {}
         for hour in range(time_from.hour, time_until.hour):
             objects_logs[hour] = {}
-        with open(entity_file, newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                row_time = datetime.strptime(row["Timestamp"], "%Y-%m-%d %H:%M:%S")
-                if time_from <= row_time < time_until:
-                    cls.procces_csv_row(row, objects_logs)
+        binary_log = read_complete_binary_objects_log(entity_file) if cls.entity == "source" else None
+        if binary_log is not None:
+            # Avoid parsing the CSV rows
+            frames, detections = select_detections(*binary_log, time_from, time_until)
+            cls.procces_binary_log(frames, detections, objects_logs)
             return cls.generate_hourly_metric_data(objects_logs, entity)
+        offset = checkpoint.get("offset", 0) if checkpoint is not None else 0
+        for row_time, row, offset in read_log_rows(entity_file, offset, time_until):
+            if time_from <= row_time:
+                cls.procces_csv_row(row, objects_logs)
+        if checkpoint is not None:
+            checkpoint["offset"] = offset
+        return cls.generate_hourly_metric_data(objects_logs, entity)
+
+    @classmethod
+    def read_checkpoint(cls, checkpoint_file: str) -> Dict:
+        """
+        Returns the checkpoint stored by the previous run of `compute_hourly_metrics` (None if there is no one).
+
+        The checkpoint has the end of the processed hours, the offset of the first row logged after them and the
+        number of rows of the report. The runs always process complete hours and the tracks are summarized for
+        each hour (a track seen in two hours is reported in both), so there is no partial state of the tracks to
+        carry to the next run.
+        """
+        if not os.path.isfile(checkpoint_file):
+            return None
+        with open(checkpoint_file, "r") as f:
+            checkpoint = json.load(f)
+        checkpoint["time_until"] = datetime.strptime(checkpoint["time_until"], "%Y-%m-%d %H:%M:%S")
+        checkpoint.setdefault("report_rows", -1)
+        return checkpoint
+
+    @classmethod
+    def write_checkpoint(cls, checkpoint_file: str, checkpoint: Dict):
+        tmp_file = checkpoint_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({
+                "time_until": checkpoint["time_until"].strftime("%Y-%m-%d %H:%M:%S"),
+                "offset": checkpoint["offset"],
+                "report_rows": checkpoint["report_rows"]
+            }, f)
+        # Replace the checkpoint once it's completely written
+        os.replace(tmp_file, checkpoint_file)
+
+    @classmethod
+    def get_hourly_report_task(cls, base_directory: str, entity: Dict, current_hour: int) -> Dict:
+        """
+        Returns the files and the interval of the hourly report pending to be generated for the `entity`, or None if
+        the report is updated.
+        """
+        entity_directory = os.path.join(base_directory, entity["id"])
+        log_directory = None
+        if cls.entity == "source":
+            log_directory = os.path.join(entity_directory, "objects_log")
+        else:
+            # cls.entity == "area"
+            log_directory = os.path.join(entity_directory, "occupancy_log")
+        reports_directory = os.path.join(entity_directory, "reports", cls.reports_folder)
+        # Create missing directories
+        os.makedirs(log_directory, exist_ok=True)
+        os.makedirs(reports_directory, exist_ok=True)
+        time_until = datetime.combine(date.today(), time(current_hour, 0))
+        if current_hour == 0:
+            # Pending to process the latest hour from yesterday
+            report_date = date.today() - timedelta(days=1)
+        else:
+            report_date = date.today()
+        entity_csv = os.path.join(log_directory, str(report_date) + ".csv")
+        daily_csv = os.path.join(reports_directory, "report_" + str(report_date) + ".csv")
+        # Stores the progress of the daily report (the end of the processed hours and its offset in the log)
+        checkpoint_file = os.path.join(reports_directory, "report_" + str(report_date) + ".checkpoint.json")
+
+        time_from = datetime.combine(report_date, time(0, 0))
+        checkpoint = None
+        if os.path.isfile(daily_csv):
+            with open(daily_csv, "r", newline='') as csvfile:
+                processed_hours = sum(1 for line in csv.reader(csvfile)) - 1
+            checkpoint = cls.read_checkpoint(checkpoint_file)
+            if checkpoint and checkpoint["report_rows"] != processed_hours:
+                # The report was updated after the checkpoint (e.g. the process was stopped between both writes)
+                checkpoint = None
+        if checkpoint:
+            time_from = checkpoint["time_until"]
+        elif os.path.isfile(daily_csv):
+            # Report generated without checkpoints, the log is processed from the beginning. The report has a row
+            # for each processed hour, so it's resumed at the hour after them (a complete report has 24 rows).
+            time_from = datetime.combine(report_date, time(0, 0)) + timedelta(hours=min(processed_hours, 24))
+            checkpoint = {"offset": 0, "report_rows": processed_hours}
+        else:
+            append_csv_rows(daily_csv, cls.csv_headers, [])
+            checkpoint = {"offset": 0, "report_rows": 0}
+        if time_from >= time_until:
+            # The hours were already processed
+            return None
+        return {
+            "base_directory": base_directory,
+            "entity_id": entity["id"],
+            "report_date": report_date,
+            "entity_csv": entity_csv,
+            "daily_csv": daily_csv,
+            "checkpoint_file": checkpoint_file,
+            "checkpoint": checkpoint,
+            "time_from": time_from,
+            "time_until": time_until,
+        }
+
+    @classmethod
+    def write_hourly_report(cls, task: Dict, csv_data):
+        """
+        Appends the `csv_data` rows to the hourly report of the `task` and updates its checkpoint.
+        """
+        rows = []
+        for item in csv_data:
+            row = {}
+            for index, header in enumerate(cls.csv_headers):
+                row[header] = item[index]
+            rows.append(row)
+        reports_store = ReportsStore.get_store(task["base_directory"])
+        if reports_store:
+            # The rows of the report are the hours of the day
+            first_hour = task["checkpoint"]["report_rows"]
+            reports_store.write_reports(
+                cls.reports_folder, task["entity_id"], cls.csv_headers,
+                [(task["report_date"], first_hour + index, row) for index, row in enumerate(rows)]
+            )
+        append_csv_rows(task["daily_csv"], cls.csv_headers, rows)
+        task["checkpoint"]["time_until"] = task["time_until"]
+        task["checkpoint"]["report_rows"] += len(rows)
+        cls.write_checkpoint(task["checkpoint_file"], task["checkpoint"])
 
     @classmethod
-    def compute_hourly_metrics(cls, config):
+    def compute_hourly_metrics(cls, config, entities: List[Dict] = None):
         if not cls.reports_folder:
             raise Exception(f"The metric {cls} doesn't have configured the folder parameter")
         base_directory = cls.get_entity_base_directory(config)
-        entities = cls.get_entities(config)
+        entities = entities if entities is not None else cls.get_entities(config)
         current_hour = datetime.now().hour
         for entity in entities:
-            entity_directory = os.path.join(base_directory, entity["id"])
-            log_directory = None
-            if cls.entity == "source":
-                log_directory = os.path.join(entity_directory, "objects_log")
-            else:
-                # cls.entity == "area"
-                log_directory = os.path.join(entity_directory, "occupancy_log")
-            reports_directory = os.path.join(entity_directory, "reports", cls.reports_folder)
-            # Create missing directories
-            os.makedirs(log_directory, exist_ok=True)
-            os.makedirs(reports_directory, exist_ok=True)
-            time_until = datetime.combine(date.today(), time(current_hour, 0))
-            if current_hour == 0:
-                # Pending to process the latest hour from yesterday
-                report_date = date.today() - timedelta(days=1)
-            else:
-                report_date = date.today()
-            entity_csv = os.path.join(log_directory, str(report_date) + ".csv")
-            daily_csv = os.path.join(reports_directory, "report_" + str(report_date) + ".csv")
-
-            time_from = datetime.combine(report_date, time(0, 0))
-            if os.path.isfile(daily_csv):
-                with open(daily_csv, "r", newline='') as csvfile:
-                    processed_hours = sum(1 for line in csv.reader(csvfile)) - 1
-                    time_from = datetime.combine(report_date, time(processed_hours + 1, 0))
-            else:
-                with open(daily_csv, "a", newline='') as csvfile:
-                    writer = csv.DictWriter(csvfile, fieldnames=cls.csv_headers)
-                    writer.writeheader()
-            csv_data = cls.generate_hourly_csv_data(entity, entity_csv, time_from, time_until)
+            task = cls.get_hourly_report_task(base_directory, entity, current_hour)
+            if task is None:
+                continue
+            csv_data = cls.generate_hourly_csv_data(
+                entity, task["entity_csv"], task["time_from"], task["time_until"], task["checkpoint"])
             if csv_data is None:
                 entity_type = "Camera" if cls.entity else "Area"
                 logger.warn(f"Hourly report not generated! [{entity_type}: {entity['id']}]")
                 continue
-            with open(daily_csv, "a", newline='') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=cls.csv_headers)
-                for item in csv_data:
-                    row = {}
-                    for index, header in enumerate(cls.csv_headers):
-                        row[header] = item[index]
-                    writer.writerow(row)
+            cls.write_hourly_report(task, csv_data)
 
     @classmethod
     def generate_daily_csv_data(cls, yesterday_hourly_file):
@@ -135,9 +323,10 @@ class BaseMetric:
         raise NotImplementedError
 
     @classmethod
-    def compute_daily_metrics(cls, config):
+    def compute_daily_metrics(cls, config, entities: List[Dict] = None):
         base_directory = cls.get_entity_base_directory(config)
-        entities = cls.get_entities(config)
+        reports_store = ReportsStore.get_store(base_directory)
+        entities = entities if entities is not None else cls.get_entities(config)
         for entity in entities:
             entity_directory = os.path.join(base_directory, entity["id"])
             reports_directory = os.path.join(entity_directory, "reports", cls.reports_folder)
@@ -152,16 +341,13 @@ class BaseMetric:
                 continue
             daily_data = cls.generate_daily_csv_data(hourly_csv)
             headers = ["Date"] + cls.csv_headers
-            report_file_exists = os.path.isfile(report_csv)
-            with open(report_csv, "a") as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=headers)
-
-                if not report_file_exists:
-                    writer.writeheader()
-                row = {"Date": yesterday}
-                for index, header in enumerate(cls.csv_headers):
-                    row[header] = daily_data[index]
-                writer.writerow(row)
+            row = {"Date": yesterday}
+            for index, header in enumerate(cls.csv_headers):
+                row[header] = daily_data[index]
+            if reports_store:
+                reports_store.write_reports(
+                    cls.reports_folder, entity["id"], cls.csv_headers, [(yesterday, DAILY_REPORT_HOUR, row)])
+            append_csv_rows(report_csv, headers, [row])
 
     @classmethod
     def generate_live_csv_data(cls, today_entity_csv, entity, entries_in_interval):
@@ -171,9 +357,9 @@ class BaseMetric:
         raise NotImplementedError
 
     @classmethod
-    def compute_live_metrics(cls, config, live_interval):
+    def compute_live_metrics(cls, config, live_interval, entities: List[Dict] = None):
         base_directory = cls.get_entity_base_directory(config)
-        entities = cls.get_entities(config)
+        entities = entities if entities is not None else cls.get_entities(config)
         for entity in entities:
             entity_directory = os.path.join(base_directory, entity["id"])
             reports_directory = os.path.join(entity_directory, "reports", cls.reports_folder)
@@ -204,6 +390,21 @@ class BaseMetric:
                     row[header] = live_data[index]
                 writer.writerow(row)
 
+    @classmethod
+    def get_report_files(cls, entities: List[str], report_file: str) -> List[str]:
+        """
+        Returns the files read to generate the `report_file` report (e.g. "live.csv" or "report.csv") of the
+        `entities`, used to invalidate the cached reports of the API.
+        """
+        base_directory = cls.get_entity_base_directory()
+        files = [
+            os.path.join(base_directory, entity, "reports", cls.reports_folder, report_file) for entity in entities
+        ]
+        if report_file != "live.csv":
+            # The hourly and daily reports are read from the store when it exists
+            files.extend(os.path.join(base_directory, REPORTS_STORE_FILE + suffix) for suffix in ["", "-wal"])
+        return files
+
     @classmethod
     def get_hourly_report(cls, entities: List[str], report_date: date) -> Dict:
         base_directory = cls.get_entity_base_directory()
@@ -211,6 +412,15 @@ class BaseMetric:
         results = {}
         for header in cls.csv_headers:
             results[header] = np.zeros(24)
+        reports_store = ReportsStore.get_store(base_directory)
+        if reports_store:
+            reports = reports_store.get_reports(cls.reports_folder, entities, report_date, report_date, hourly=True)
+            for (_, hour), values in reports.items():
+                if hour < 24:
+                    for header in cls.csv_headers:
+                        results[header][hour] += values.get(header, 0)
+            # The reports were read from the store
+            entities = []
         for entity in entities:
             entity_directory = os.path.join(base_directory, entity)
             reports_directory = os.path.join(entity_directory, "reports", cls.reports_folder)
@@ -227,15 +437,23 @@ class BaseMetric:
         return results
 
     @classmethod
-    def get_daily_report(cls, entities: List[str], from_date: date, to_date: date) -> Dict:
+    def get_daily_report_data(cls, entities: List[str], from_date: date, to_date: date) -> np.ndarray:
+        """
+        Returns an array with a row for each day of the [from_date, to_date] range and a column for each header of
+        the metric, with the sum of the daily reports of the `entities`. The report of each entity is read once.
+        """
         base_directory = cls.get_entity_base_directory()
-        date_range = pd.date_range(start=from_date, end=to_date)
-        base_results = {}
-        for key in date_range:
-            base_results[key.strftime('%Y-%m-%d')] = {}
-            for header in cls.csv_headers:
-                base_results[key.strftime('%Y-%m-%d')][header] = 0
-
+        from_day = np.datetime64(from_date.strftime("%Y-%m-%d"), "D")
+        number_of_days = int((np.datetime64(to_date.strftime("%Y-%m-%d"), "D") - from_day).astype(int)) + 1
+        report_data = np.zeros((max(number_of_days, 0), len(cls.csv_headers)))
+        reports_store = ReportsStore.get_store(base_directory)
+        if reports_store:
+            reports = reports_store.get_reports(cls.reports_folder, entities, from_date, to_date, hourly=False)
+            for (report_date, _), values in reports.items():
+                day = int((np.datetime64(report_date, "D") - from_day).astype(int))
+                report_data[day] += [values.get(header, 0) for header in cls.csv_headers]
+            # The reports were read from the store
+            entities = []
         for entity in entities:
             entity_directory = os.path.join(base_directory, entity)
             reports_directory = os.path.join(entity_directory, "reports", cls.reports_folder)
@@ -243,29 +461,31 @@ class BaseMetric:
             if not os.path.isfile(file_path):
                 continue
             df = pd.read_csv(file_path)
-            df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d')
-            mask = (df['Date'] >= pd.to_datetime(from_date)) & (df['Date'] <= pd.to_datetime(to_date))
-            entity_report = df.loc[mask]
-            entity_report['Date'] = entity_report['Date'].apply(lambda x: x.strftime('%Y-%m-%d'))
-            entity_report = entity_report.set_index('Date').T
-            entity_report_dict = entity_report.to_dict()
-            for key in entity_report_dict:
-                for header in cls.csv_headers:
-                    base_results[key][header] += entity_report_dict[key][header]
+            days = (pd.to_datetime(df["Date"], format="%Y-%m-%d").to_numpy().astype("datetime64[D]") -
+                    from_day).astype(int)
+            # If a day was reported several times, the latest report is used
+            _, last_rows = np.unique(days[::-1], return_index=True)
+            rows = len(days) - 1 - last_rows
+            rows = rows[(days[rows] >= 0) & (days[rows] < len(report_data))]
+            report_data[days[rows]] += df[cls.csv_headers].to_numpy(dtype=float)[rows]
+        return report_data
 
-        report = {"Dates": []}
-        for header in cls.csv_headers:
-            report[header] = []
-        for report_date in sorted(base_results):
-            report["Dates"].append(report_date)
-            for header in cls.csv_headers:
-                report[header].append(base_results[report_date][header])
+    @classmethod
+    def get_daily_report(cls, entities: List[str], from_date: date, to_date: date) -> Dict:
+        report_data = cls.get_daily_report_data(entities, from_date, to_date)
+        date_range = pd.date_range(start=from_date, end=to_date)
+        report = {"Dates": [report_date.strftime('%Y-%m-%d') for report_date in date_range]}
+        for index, header in enumerate(cls.csv_headers):
+            report[header] = report_data[:, index].tolist()
         return report
 
     @classmethod
     def generate_weekly_report_data(cls, entities: List[str], number_of_weeks: int = 0,
-                                    from_date: date = None, to_date: date = None) -> Dict:
-        weekly_report_data = {}
+                                    from_date: date = None, to_date: date = None):
+        """
+        Returns the weeks of the report ("<start date> <end date>" strings), the daily report data of the whole
+        range (see `get_daily_report_data`) and the index of the first day of each week in the data.
+        """
         number_of_days = number_of_weeks*7
         if number_of_days > 0:
             # Separate weeks in range taking a number of weeks ago, considering the week ended yesterday
@@ -279,23 +499,27 @@ class BaseMetric:
             week_span = list(parse_date_range(date_range))
         else:
             week_span = []
-        for start_date, end_date in week_span:
-            weekly_report_data[
-                f"{start_date.strftime('%Y-%m-%d')} {end_date.strftime('%Y-%m-%d')}"
-            ] = cls.get_daily_report(entities, start_date, end_date)
-        return weekly_report_data
+        if not week_span:
+            return [], np.zeros((0, len(cls.csv_headers))), np.zeros(0, dtype=int)
+        weeks = [f"{start_date.strftime('%Y-%m-%d')} {end_date.strftime('%Y-%m-%d')}"
+                 for start_date, end_date in week_span]
+        # The weeks are consecutive, the reports of the whole range are read at once
+        first_date = week_span[0][0]
+        daily_report_data = cls.get_daily_report_data(entities, first_date, week_span[-1][1])
+        weeks_starts = np.array([(start_date - first_date).days for start_date, _ in week_span])
+        return weeks, daily_report_data, weeks_starts
 
     @classmethod
     def get_weekly_report(cls, entities: List[str], number_of_weeks: int = 0,
                           from_date: date = None, to_date: date = None) -> Dict:
-        weekly_report_data = cls.generate_weekly_report_data(entities, number_of_weeks, from_date, to_date)
-        report = {"Weeks": []}
-        for header in cls.csv_headers:
-            report[header] = []
-        for week, week_data in weekly_report_data.items():
-            report["Weeks"].append(week)
-            for header in cls.csv_headers:
-                report[header].append(sum(week_data[header]))
+        weeks, daily_report_data, weeks_starts = cls.generate_weekly_report_data(
+            entities, number_of_weeks, from_date, to_date)
+        report = {"Weeks": weeks}
+        weekly_report_data = daily_report_data[:0]
+        if weeks:
+            weekly_report_data = np.add.reduceat(daily_report_data, weeks_starts, axis=0)
+        for index, header in enumerate(cls.csv_headers):
+            report[header] = weekly_report_data[:, index].tolist()
         return report
 
     @classmethod
@@ -324,12 +548,14 @@ class BaseMetric:
             file_path = os.path.join(reports_directory, "live.csv")
             if not os.path.exists(file_path):
                 continue
+            lastest_entries = read_last_rows(file_path, 1)
+            if not lastest_entries:
+                continue
             live_report_paths.append(file_path)
-            with open(file_path, "r") as live_file:
-                lastest_entry = deque(csv.DictReader(live_file), 1)[0]
-                times.append(datetime.strptime(lastest_entry["Time"], "%Y-%m-%d %H:%M:%S"))
-                for header in live_headers:
-                    report[header] += int(lastest_entry[header])
+            lastest_entry = lastest_entries[0]
+            times.append(datetime.strptime(lastest_entry["Time"], "%Y-%m-%d %H:%M:%S"))
+            for header in live_headers:
+                report[header] += int(lastest_entry[header])
         report["Time"] = ""
         report["Trend"] = 0
         if times:
@@ -338,3 +564,59 @@ class BaseMetric:
         if trend_live_values:
             report["Trend"] = cls.calculate_trend_value(trend_live_values)
         return report
+
+
+def compute_sources_hourly_metrics(config, metrics: List[BaseMetric], entities: List[Dict] = None,
+                                   current_hour: int = None):
+    """
+    Computes the hourly reports of several source `metrics` reading the objects log of each camera once. Each row is
+    decoded once and dispatched to all the metrics that are pending to process it. The `metrics` can also be other
+    consumers of the rows with the same hourly interface (e.g. the heatmaps, see
+    libs.metrics.social_distancing.SocialDistancingHeatmaps).
+
+    The hours before `current_hour` (the current hour by default) are processed, at hour 0 the pending hours of
+    yesterday are processed.
+    """
+    base_directory = get_source_log_directory(config)
+    current_hour = current_hour if current_hour is not None else datetime.now().hour
+    entities = entities if entities is not None else config.get_video_sources()
+    for entity in entities:
+        tasks = []
+        for metric in metrics:
+            task = metric.get_hourly_report_task(base_directory, entity, current_hour)
+            if task is not None:
+                tasks.append((metric, task))
+        if not tasks:
+            continue
+        entity_csv = tasks[0][1]["entity_csv"]
+        if not os.path.isfile(entity_csv) or read_complete_binary_objects_log(entity_csv) is not None:
+            # Nothing to parse, the binary objects log is read by each metric
+            for metric, task in tasks:
+                csv_data = metric.generate_hourly_csv_data(
+                    entity, entity_csv, task["time_from"], task["time_until"], task["checkpoint"])
+                if csv_data is None:
+                    logger.warn(f"Hourly report not generated! [Camera: {entity['id']}]")
+                    continue
+                metric.write_hourly_report(task, csv_data)
+            continue
+        # The consumers that don't store their offset in the log (e.g. the heatmaps) start at the offset of a metric
+        # with the same progress, or at the beginning of the log
+        offsets = {
+            task["time_from"]: task["checkpoint"]["offset"] for _, task in tasks if "offset" in task["checkpoint"]
+        }
+        for _, task in tasks:
+            task["checkpoint"].setdefault("offset", offsets.get(task["time_from"], 0))
+        objects_logs = []
+        for metric, task in tasks:
+            objects_logs.append({hour: {} for hour in range(task["time_from"].hour, task["time_until"].hour)})
+        offset = min(task["checkpoint"]["offset"] for _, task in tasks)
+        time_until = tasks[0][1]["time_until"]
+        for row_time, row, offset in read_log_rows(entity_csv, offset, time_until):
+            decoded_row = None
+            for (metric, task), metric_objects_logs in zip(tasks, objects_logs):
+                if task["time_from"] <= row_time:
+                    decoded_row = decoded_row or decode_csv_row(row)
+                    metric.procces_objects_log_row(*decoded_row, metric_objects_logs)
+        for (metric, task), metric_objects_logs in zip(tasks, objects_logs):
+            task["checkpoint"]["offset"] = max(offset, task["checkpoint"]["offset"])
+            metric.write_hourly_report(task, metric.generate_hourly_metric_data(metric_objects_logs, entity))
@@ -1,13 +1,14 @@
 
-import ast
 import csv
 import numpy as np
 
-from collections import deque
 from datetime import datetime
 from typing import Dict, List, Iterator, Tuple
 
-from .base import BaseMetric
+from libs.utils.log_tail import read_last_rows
+from libs.utils.objects_log import decode_csv_row
+
+from .base import BaseMetric, get_stable_state_changes, group_by_track
 
 
 class FaceMaskUsageMetric(BaseMetric):
@@ -17,64 +18,59 @@ class FaceMaskUsageMetric(BaseMetric):
 
     @classmethod
     def procces_csv_row(cls, csv_row: Dict, objects_logs: Dict):
-        row_time = datetime.strptime(csv_row["Timestamp"], "%Y-%m-%d %H:%M:%S")
-        detections = ast.literal_eval(csv_row["Detections"])
+        cls.procces_objects_log_row(*decode_csv_row(csv_row), objects_logs)
+
+    @classmethod
+    def procces_objects_log_row(cls, row_time: datetime, detections: List[Dict], violations_indexes: List[int],
+                                objects_logs: Dict):
         row_hour = row_time.hour
         if not objects_logs.get(row_hour):
-            objects_logs[row_hour] = {}
+            objects_logs[row_hour] = {"tracks": {}, "track_ids": [], "face_labels": []}
+        hour_log = objects_logs[row_hour]
         for d in detections:
-            if not objects_logs[row_hour].get(d["tracking_id"]):
-                objects_logs[row_hour][d["tracking_id"]] = {"face_labels": []}
-            # Append social distancing violations
-            objects_logs[row_hour][d["tracking_id"]]["face_labels"].append(d.get("face_label", -1))
+            # Tracks are stored with an integer index (untracked objects have string ids)
+            hour_log["track_ids"].append(hour_log["tracks"].setdefault(d["tracking_id"], len(hour_log["tracks"])))
+            hour_log["face_labels"].append(d.get("face_label", -1))
+
+    @classmethod
+    def procces_binary_log(cls, frames, detections, objects_logs: Dict):
+        detections_hours = detections["timestamp"] % 86400 // 3600
+        for hour in np.unique(detections_hours).tolist():
+            hour_detections = detections[detections_hours == hour]
+            objects_logs[hour] = {
+                "track_ids": hour_detections["track_id"],
+                "face_labels": hour_detections["face_label"]
+            }
 
     @classmethod
     def generate_hourly_metric_data(cls, objects_logs, entity=None):
         summary = np.zeros((len(objects_logs), 3), dtype=np.long)
         for index, hour in enumerate(sorted(objects_logs)):
-            hour_objects_detections = objects_logs[hour]
-            for detection_object in hour_objects_detections.values():
-                no_face_detections, mask_detections, no_mask_detections = cls.process_face_labels_for_object(
-                    detection_object["face_labels"]
-                )
-                summary[index] += (no_face_detections, mask_detections, no_mask_detections)
+            hour_log = objects_logs[hour]
+            if hour_log:
+                summary[index] = cls.process_face_labels(hour_log["track_ids"], hour_log["face_labels"])
         return summary
 
     @classmethod
-    def process_face_labels_for_object(cls, face_labels: List[int]) -> Tuple[int, int]:
+    def process_face_labels(cls, track_ids, face_labels) -> Tuple[int, int, int]:
         """
-        Receives a list with the "facesmask detections" (for a single person) and returns a
-        tuple with the summary of faces and mask detected. Consecutive detections in the same state are
+        Receives the "facesmask detections" (the track and the face label, in chronological order) and returns a
+        tuple with the summary of faces and mask detected. Consecutive detections of a person in the same state are
         grouped and returned as a single one. Detections lower than the constant PROCESSING_COUNT_THRESHOLD
         are ignored.
 
-        For example, the input [0, 0, 0, 0, 0, 1, 0, 0, 1, 1, 1, 1 1, 1,
-        -1, -1, -1, -1, -1, -1, 0, 0, 0, 0] returns (3, 2).
+        For example, the labels [0, 0, 0, 0, 0, 1, 0, 0, 1, 1, 1, 1 1, 1,
+        -1, -1, -1, -1, -1, -1, 0, 0, 0, 0] of a single person return (1, 2, 1).
         """
-        no_face_detections = 0
-        mask_detections = 0
-        no_mask_detections = 0
-        current_status = None
-        processing_status = None
-        processing_count = 0
-        for face_label in face_labels:
-            if processing_status != face_label:
-                processing_status = face_label
-                processing_count = 0
-            processing_count += 1
-            if current_status != processing_status and processing_count >= cls.processing_count_threshold:
-                # FaceLabel was enouth time in the same state, change it
-                current_status = processing_status
-                if current_status == -1:
-                    #  Face was not detected
-                    no_face_detections += 1
-                elif current_status == 0:
-                    # A face using mask was detected
-                    mask_detections += 1
-                else:
-                    # current_status == 1
-                    # A face without mask was detected
-                    no_mask_detections += 1
+        tracks, face_labels = group_by_track(track_ids, face_labels)
+        changes = get_stable_state_changes(tracks, face_labels, cls.processing_count_threshold)
+        states = face_labels[changes]
+        #  Face was not detected
+        no_face_detections = int(np.count_nonzero(states == -1))
+        # A face using mask was detected
+        mask_detections = int(np.count_nonzero(states == 0))
+        # A face without mask was detected
+        no_mask_detections = len(states) - no_face_detections - mask_detections
         return no_face_detections, mask_detections, no_mask_detections
 
     @classmethod
@@ -93,11 +89,9 @@ class FaceMaskUsageMetric(BaseMetric):
         """
         Generates the live report using the `today_entity_csv` file received.
         """
-        with open(today_entity_csv, "r") as log:
-            objects_logs = {}
-            lastest_entries = deque(csv.DictReader(log), entries_in_interval)
-            for entry in lastest_entries:
-                cls.procces_csv_row(entry, objects_logs)
+        objects_logs = {}
+        for entry in read_last_rows(today_entity_csv, entries_in_interval):
+            cls.procces_csv_row(entry, objects_logs)
         return np.sum(cls.generate_hourly_metric_data(objects_logs), axis=0)
 
     @classmethod
@@ -106,10 +100,8 @@ class FaceMaskUsageMetric(BaseMetric):
         for n in range(10):
             latest_facemask_results[n] = None
         for live_path in live_report_paths:
-            with open(live_path, "r") as live_file:
-                lastest_10_entries = deque(csv.DictReader(live_file), 10)
-                for index, item in enumerate(lastest_10_entries):
-                    if not latest_facemask_results[index]:
-                        latest_facemask_results[index] = 0
-                    latest_facemask_results[index] += int(item["FaceWithMask"])
+            for index, item in enumerate(read_last_rows(live_path, 10)):
+                if not latest_facemask_results[index]:
+                    latest_facemask_results[index] = 0
+                latest_facemask_results[index] += int(item["FaceWithMask"])
         return [item for item in latest_facemask_results.values() if item is not None]
@@ -2,11 +2,12 @@ import csv
 import numpy as np
 import os
 
-from collections import deque
 from datetime import date, datetime
 from statistics import mean
 from typing import Dict, Iterator, List
 
+from libs.utils.log_tail import read_last_rows
+
 from .base import BaseMetric
 
 
@@ -58,28 +59,26 @@ class OccupancyMetric(BaseMetric):
         """
         Generates the live report using the `today_entity_csv` file received.
         """
-        with open(today_entity_csv, "r") as log:
-            objects_logs = {}
-            lastest_entries = deque(csv.DictReader(log), entries_in_interval)
-            for entry in lastest_entries:
-                cls.procces_csv_row(entry, objects_logs)
-            # Put the rows in the same hour
-            objects_logs_merged = {
-                0: {"Occupancy": []}
-            }
-            for hour in objects_logs:
-                objects_logs_merged[0]["Occupancy"].extend(objects_logs[hour]["Occupancy"])
+        objects_logs = {}
+        for entry in read_last_rows(today_entity_csv, entries_in_interval):
+            cls.procces_csv_row(entry, objects_logs)
+        # Put the rows in the same hour
+        objects_logs_merged = {
+            0: {"Occupancy": []}
+        }
+        for hour in objects_logs:
+            objects_logs_merged[0]["Occupancy"].extend(objects_logs[hour]["Occupancy"])
         occupancy_live = cls.generate_hourly_metric_data(objects_logs_merged, entity)[0].tolist()
         occupancy_live.append(int(entity["occupancy_threshold"]))
         daily_violations = 0
         entity_directory = entity["base_directory"]
         reports_directory = os.path.join(entity_directory, "reports", cls.reports_folder)
         file_path = os.path.join(reports_directory, "live.csv")
-        if os.path.exists(file_path):
-            with open(file_path, "r") as live_file:
-                lastest_entry = deque(csv.DictReader(live_file), 1)[0]
-                if datetime.strptime(lastest_entry["Time"], "%Y-%m-%d %H:%M:%S").date() == datetime.today().date():
-                    daily_violations = int(lastest_entry["Violations"])
+        lastest_entries = read_last_rows(file_path, 1) if os.path.exists(file_path) else []
+        if lastest_entries:
+            lastest_entry = lastest_entries[0]
+            if datetime.strptime(lastest_entry["Time"], "%Y-%m-%d %H:%M:%S").date() == datetime.today().date():
+                daily_violations = int(lastest_entry["Violations"])
         if occupancy_live[1] > occupancy_live[2]:
             # Max Occupancy detections > Occupancy threshold
             daily_violations += 1
@@ -92,25 +91,27 @@ class OccupancyMetric(BaseMetric):
         for n in range(10):
             latest_occupancy_results[n] = None
         for live_path in live_report_paths:
-            with open(live_path, "r") as live_file:
-                lastest_10_entries = deque(csv.DictReader(live_file), 10)
-                for index, item in enumerate(lastest_10_entries):
-                    if not latest_occupancy_results[index]:
-                        latest_occupancy_results[index] = 0
-                    latest_occupancy_results[index] += int(item["MaxOccupancy"])
+            for index, item in enumerate(read_last_rows(live_path, 10)):
+                if not latest_occupancy_results[index]:
+                    latest_occupancy_results[index] = 0
+                latest_occupancy_results[index] += int(item["MaxOccupancy"])
         return [item for item in latest_occupancy_results.values() if item is not None]
 
     @classmethod
     def get_weekly_report(cls, entities: List[str], number_of_weeks: int = 0,
                           from_date: date = None, to_date: date = None) -> Dict:
         # The occupancy metrics can not be aggregated using "sum"
-        weekly_report_data = cls.generate_weekly_report_data(entities, number_of_weeks, from_date, to_date)
-        report = {"Weeks": []}
+        weeks, daily_report_data, weeks_starts = cls.generate_weekly_report_data(
+            entities, number_of_weeks, from_date, to_date)
+        report = {"Weeks": weeks}
         for header in cls.csv_headers:
             report[header] = []
-        for week, week_data in weekly_report_data.items():
-            report["Weeks"].append(week)
-            report["AverageOccupancy"].append(round(mean(week_data["AverageOccupancy"]), 2))
-            report["MaxOccupancy"].append(max(week_data["MaxOccupancy"]))
-            report["OccupancyThreshold"].append(max(week_data["OccupancyThreshold"]))
+        if not weeks:
+            return report
+        weeks_lengths = np.diff(np.append(weeks_starts, len(daily_report_data)))
+        average_occupancy = np.add.reduceat(daily_report_data[:, 0], weeks_starts) / weeks_lengths
+        max_values = np.maximum.reduceat(daily_report_data, weeks_starts, axis=0)
+        report["AverageOccupancy"] = [round(value, 2) for value in average_occupancy.tolist()]
+        report["MaxOccupancy"] = max_values[:, 1].tolist()
+        report["OccupancyThreshold"] = max_values[:, 2].tolist()
         return report
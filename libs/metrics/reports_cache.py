@@ -0,0 +1,74 @@
+import copy
+import logging
+import os
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+
+class ReportsCache:
+    """
+    LRU cache of the reports generated by the metrics. Each entry stores the signature (modification time and size)
+    of the files used to generate the report, and it's only returned while the files don't change. The reports are
+    updated at most every few minutes, so the requests of the dashboards are answered without reading the reports.
+
+    :param max_entries: Maximum number of cached reports (the least recently used ones are discarded).
+    :param log_interval: Number of lookups between the logs of the hit/miss counters.
+    """
+
+    def __init__(self, max_entries=256, log_interval=1000):
+        self.max_entries = max_entries
+        self.log_interval = log_interval
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_files_signature(files: List[str]) -> tuple:
+        signature = []
+        for file_path in files:
+            try:
+                stat = os.stat(file_path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def get(self, key: Hashable, files: List[str], generate_report: Callable):
+        """
+        Returns the cached report of the `key`, calling `generate_report` if it isn't cached or the `files` used
+        to generate it changed. The cached reports are copied, so the callers can modify the returned report.
+        """
+        signature = self.get_files_signature(files)
+        with self.lock:
+            entry = self.entries.get(key)
+            hit = entry is not None and entry[0] == signature
+            if hit:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            else:
+                self.misses += 1
+            if (self.hits + self.misses) % self.log_interval == 0:
+                logger.info(f"Reports cache: {self.hits} hits, {self.misses} misses, {len(self.entries)} entries")
+        if hit:
+            return copy.deepcopy(entry[1])
+        # The signature is taken before generating the report, so a report that changed meanwhile is regenerated
+        report = generate_report()
+        with self.lock:
+            self.entries[key] = (signature, copy.deepcopy(report))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return report
+
+    def get_stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
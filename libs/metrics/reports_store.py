@@ -0,0 +1,135 @@
+import csv
+import logging
+import os
+import re
+import sqlite3
+
+from collections import Counter
+from contextlib import closing
+from datetime import date
+from typing import Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+REPORTS_STORE_FILE = "reports.db"
+# Hour of the rows of the daily reports (report.csv)
+DAILY_REPORT_HOUR = -1
+HOURLY_REPORT_FILE_PATTERN = re.compile(r"^report_(\d{4}-\d{2}-\d{2})\.csv$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    metric TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value NUMERIC,
+    PRIMARY KEY (metric, entity, hour, date, name)
+) WITHOUT ROWID
+"""
+
+
+class ReportsStore:
+    """
+    Indexed copy of the hourly and daily reports of the metrics (the report_<date>.csv and report.csv files) stored
+    in a SQLite database in the log directory of the cameras or the areas. Each value is stored with the
+    (metric, entity, hour, date, name) key, the rows of the daily reports have the DAILY_REPORT_HOUR hour.
+
+    The periodic task writes the reports in both formats, the API uses the store (when it exists) to answer each
+    request with a single range query instead of parsing the CSV reports of every entity.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    @classmethod
+    def get_store(cls, base_directory: str):
+        """
+        Returns the store of the `base_directory`, or None if it wasn't created.
+        """
+        if not base_directory:
+            return None
+        db_path = os.path.join(base_directory, REPORTS_STORE_FILE)
+        if not os.path.isfile(db_path):
+            return None
+        return cls(db_path)
+
+    @classmethod
+    def create(cls, base_directory: str, metrics: List) -> "ReportsStore":
+        """
+        Creates the store of the `base_directory` importing the existing CSV reports of the `metrics`. The database
+        is created in a temporary file that is renamed once the import finishes, so the API never reads a partially
+        imported store.
+        """
+        db_path = os.path.join(base_directory, REPORTS_STORE_FILE)
+        tmp_path = db_path + ".tmp"
+        if os.path.isfile(tmp_path):
+            # Import interrupted by a previous run
+            os.remove(tmp_path)
+        store = cls(tmp_path)
+        with closing(store.connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(SCHEMA)
+        for metric in metrics:
+            for entity in sorted(os.listdir(base_directory)):
+                reports_directory = os.path.join(base_directory, entity, "reports", metric.reports_folder)
+                if os.path.isdir(reports_directory):
+                    store.import_csv_reports(metric, entity, reports_directory)
+        os.replace(tmp_path, db_path)
+        store.db_path = db_path
+        logger.info(f"Reports store created in {db_path}")
+        return store
+
+    def connect(self):
+        # The store is written by the processes of the periodic task, wait until the other writers finish
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def import_csv_reports(self, metric, entity: str, reports_directory: str):
+        for file_name in sorted(os.listdir(reports_directory)):
+            file_path = os.path.join(reports_directory, file_name)
+            match = HOURLY_REPORT_FILE_PATTERN.match(file_name)
+            if match:
+                with open(file_path, newline="") as csvfile:
+                    rows = [(match.group(1), hour, row) for hour, row in enumerate(csv.DictReader(csvfile))]
+            elif file_name == "report.csv":
+                with open(file_path, newline="") as csvfile:
+                    rows = [(row["Date"], DAILY_REPORT_HOUR, row) for row in csv.DictReader(csvfile)]
+            else:
+                continue
+            self.write_reports(metric.reports_folder, entity, metric.csv_headers, rows)
+
+    def write_reports(self, metric: str, entity: str, headers: List[str], rows: Iterator[Tuple[str, int, Dict]]):
+        """
+        Stores the (date, hour, row) `rows` of a report of the `entity`, replacing the existing values.
+        """
+        values = [
+            (metric, entity, hour, str(report_date), header, row[header])
+            for report_date, hour, row in rows for header in headers
+        ]
+        with closing(self.connect()) as connection, connection:
+            connection.executemany("INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?)", values)
+
+    def get_reports(self, metric: str, entities: List[str], from_date: date, to_date: date,
+                    hourly: bool) -> Dict[Tuple[str, int], Dict]:
+        """
+        Returns the sum of the values of the `entities` reports in the [from_date, to_date] range, grouped by
+        (date, hour). If `hourly` is False the daily reports are returned.
+        """
+        if hourly:
+            hour_condition = "hour >= 0"
+        else:
+            hour_condition = f"hour = {DAILY_REPORT_HOUR}"
+        # The same entity can be received several times (e.g. the cameras of several areas)
+        entities_count = Counter(entities)
+        query = (
+            f"SELECT entity, date, hour, name, SUM(value) FROM reports "
+            f"WHERE metric = ? AND entity IN ({', '.join('?' * len(entities_count))}) AND {hour_condition} "
+            f"AND date BETWEEN ? AND ? GROUP BY entity, date, hour, name"
+        )
+        reports = {}
+        with closing(self.connect()) as connection:
+            for entity, report_date, hour, name, value in connection.execute(
+                    query, [metric, *entities_count, from_date.strftime("%Y-%m-%d"), to_date.strftime("%Y-%m-%d")]):
+                values = reports.setdefault((report_date, hour), {})
+                values[name] = values.get(name, 0) + (value or 0) * entities_count[entity]
+        return reports
@@ -1,15 +1,15 @@
 import csv
-import ast
 import numpy as np
 import os
 
-from collections import deque
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
 from typing import Dict, List, Iterator, Tuple
 
-from libs.utils.loggers import get_source_log_directory
+from libs.utils.log_tail import read_last_rows
+from libs.utils.objects_log import (decode_csv_row, encode_timestamp, read_complete_binary_objects_log,
+                                    select_detections)
 
-from .base import BaseMetric
+from .base import BaseMetric, get_stable_state_changes, group_by_track
 
 
 class SocialDistancingMetric(BaseMetric):
@@ -20,39 +20,52 @@ class SocialDistancingMetric(BaseMetric):
 
     @classmethod
     def procces_csv_row(cls, csv_row: Dict, objects_logs: Dict):
-        row_time = datetime.strptime(csv_row["Timestamp"], "%Y-%m-%d %H:%M:%S")
-        detections = ast.literal_eval(csv_row["Detections"])
+        cls.procces_objects_log_row(*decode_csv_row(csv_row), objects_logs)
+
+    @classmethod
+    def procces_objects_log_row(cls, row_time: datetime, detections: List[Dict], violations_indexes: List[int],
+                                objects_logs: Dict):
         row_hour = row_time.hour
         if not objects_logs.get(row_hour):
-            objects_logs[row_hour] = {}
+            objects_logs[row_hour] = {"tracks": {}, "track_ids": [], "times": [], "violations": []}
+        hour_log = objects_logs[row_hour]
+        row_timestamp = encode_timestamp(row_time)
         for index, d in enumerate(detections):
-            if not objects_logs[row_hour].get(d["tracking_id"]):
-                objects_logs[row_hour][d["tracking_id"]] = {"distance_violations": []}
+            # Tracks are stored with an integer index (untracked objects have string ids)
+            hour_log["track_ids"].append(hour_log["tracks"].setdefault(d["tracking_id"], len(hour_log["tracks"])))
+            hour_log["times"].append(row_timestamp)
             # Append social distancing violations
-            objects_logs[row_hour][d["tracking_id"]]["distance_violations"].append(
-                {
-                    "time": row_time,
-                    "infrigement": index in ast.literal_eval(csv_row["ViolationsIndexes"])
-                }
-            )
+            hour_log["violations"].append(index in violations_indexes)
+
+    @classmethod
+    def procces_binary_log(cls, frames, detections, objects_logs: Dict):
+        detections_hours = detections["timestamp"] % 86400 // 3600
+        for hour in np.unique(detections_hours).tolist():
+            hour_detections = detections[detections_hours == hour]
+            objects_logs[hour] = {
+                "track_ids": hour_detections["track_id"],
+                "times": hour_detections["timestamp"],
+                "violations": hour_detections["violation"]
+            }
 
     @classmethod
     def generate_hourly_metric_data(cls, objects_logs, entity=None):
         summary = np.zeros((len(objects_logs), 5), dtype=np.long)
         for index, hour in enumerate(sorted(objects_logs)):
-            hour_objects_detections = objects_logs[hour]
-            for detection_object in hour_objects_detections.values():
-                summary[index] += cls.process_distance_violation_for_object(
-                    detection_object["distance_violations"])
+            hour_log = objects_logs[hour]
+            if hour_log:
+                summary[index] = cls.process_distance_violations(
+                    hour_log["track_ids"], hour_log["times"], hour_log["violations"])
         return summary
 
     @classmethod
-    def process_distance_violation_for_object(cls, distance_violations: List[dict]) -> Tuple[int, int]:
+    def process_distance_violations(cls, track_ids, times, violations) -> Tuple[int, int, int, int, int]:
         """
-        Receives a list with the "social distancing detections" (for a single person) and returns a
-        tuple with the summary of detections and violations (grouped by severity). Consecutive detections in
-        the same state are grouped and returned as a single one. Detections lower than the constant
-        PROCESSING_COUNT_THRESHOLD are ignored.
+        Receives the "social distancing detections" (the track, the time in seconds and whether the person was
+        violating the social distancing, in chronological order) and returns a tuple with the summary of
+        detections and violations (grouped by severity). Consecutive detections of a person in the same state are
+        grouped and returned as a single one. Detections lower than the constant PROCESSING_COUNT_THRESHOLD
+        are ignored.
 
         The infrigement categories are :
             - Low: Between 10 seconds 30 seconds
@@ -61,51 +74,35 @@ class SocialDistancingMetric(BaseMetric):
         """
         # TODO: The categories values defined need to be updated taking into account the OMS recommendations.
         # The current values only have demo purposes
-        current_status = None
-        processing_status = None
-        processing_count = 0
-        current_status_start_time = None
-        processing_start_time = None
-
         CRITICAL_THRESHOLD = 60
         HIGH_THRESHOLD = 30
         LOW_TRESHOLD = 10
 
-        detections = []
-        if distance_violations:
-            for dist_violation in distance_violations:
-                status = dist_violation["infrigement"]
-                if processing_status != status:
-                    processing_status = status
-                    processing_start_time = dist_violation["time"]
-                    processing_count = 0
-                processing_count += 1
-                if current_status != processing_status and processing_count >= cls.processing_count_threshold:
-                    # Object was enouth time in the same state, change it
-                    if current_status is not None:
-                        # Append the previous status in the detections list
-                        seconds_in_status = (processing_start_time - current_status_start_time).seconds
-                        detections.append({"status": status, "seconds": seconds_in_status})
-                    current_status = processing_status
-                    current_status_start_time = processing_start_time
-            if current_status:
-                # Append the latest status
-                seconds_in_status = (distance_violations[-1]["time"] - current_status_start_time).seconds
-                detections.append({"status": status, "seconds": seconds_in_status})
-        detected_objects, no_infringements, low_infringements, high_infringements, critical_infringements = 0, 0, 0, 0, 0
-        for detection in detections:
-            detected_objects += 1
-            if not detection["status"] or detection["seconds"] < LOW_TRESHOLD:
-                no_infringements += 1
-            elif LOW_TRESHOLD <= detection["seconds"] < HIGH_THRESHOLD:
-                low_infringements += 1
-            elif HIGH_THRESHOLD <= detection["seconds"] < CRITICAL_THRESHOLD:
-                high_infringements += 1
-            else:
-                # CRITICAL_THRESHOLD <= detection["time"]
-                critical_infringements += 1
+        tracks, times, violations = group_by_track(track_ids, times, violations)
+        violations = violations.astype(bool)
+        changes = get_stable_state_changes(tracks, violations, cls.processing_count_threshold)
+        if len(changes) == 0:
+            return 0, 0, 0, 0, 0
+        changes_tracks = tracks[changes]
+        same_track = changes_tracks[1:] == changes_tracks[:-1]
+        # Each state lasts until the next change of the track, it's reported with the status of the new state
+        statuses = violations[changes[1:][same_track]]
+        seconds = times[changes[1:][same_track]] - times[changes[:-1][same_track]]
+        # The latest state of each track lasts until its last detection, it's reported only for violations
+        latest_changes = changes[np.append(~same_track, True)]
+        latest_changes = latest_changes[violations[latest_changes]]
+        tracks_ends = np.flatnonzero(np.append(tracks[1:] != tracks[:-1], True))
+        last_detections = tracks_ends[tracks[latest_changes]]
+        statuses = np.concatenate([statuses, violations[last_detections]])
+        seconds = np.concatenate([seconds, times[last_detections] - times[latest_changes]])
 
-        return detected_objects, no_infringements, low_infringements, high_infringements, critical_infringements
+        no_infringements = ~statuses | (seconds < LOW_TRESHOLD)
+        detected_objects = len(statuses)
+        low_infringements = ~no_infringements & (seconds < HIGH_THRESHOLD)
+        high_infringements = ~no_infringements & (HIGH_THRESHOLD <= seconds) & (seconds < CRITICAL_THRESHOLD)
+        critical_infringements = ~no_infringements & (CRITICAL_THRESHOLD <= seconds)
+        return (detected_objects, int(no_infringements.sum()), int(low_infringements.sum()),
+                int(high_infringements.sum()), int(critical_infringements.sum()))
 
     @classmethod
     def generate_daily_csv_data(cls, yesterday_hourly_file):
@@ -120,59 +117,14 @@ class SocialDistancingMetric(BaseMetric):
                 critical_infringements += int(row["CriticalInfringement"])
         return detected_objects, no_infringements, low_infringements, high_infringements, critical_infringements
 
-    @classmethod
-    def create_heatmap_report(cls, config, yesterday_csv, heatmap_file, column):
-        heatmap_resolution = config.get_section_dict("App")["HeatmapResolution"].split(",")
-        heatmap_x = int(heatmap_resolution[0])
-        heatmap_y = int(heatmap_resolution[1])
-        heatmap_grid = np.zeros((heatmap_x, heatmap_y))
-
-        with open(yesterday_csv, newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                detections = ast.literal_eval(row['Detections'])
-                if column == 'Violations':
-                    violations_indexes = ast.literal_eval(row['ViolationsIndexes'])
-                    # Get bounding boxes of violations
-                    detections = [detections[object_id] for object_id in violations_indexes]
-
-                for detection in detections:
-                    bbox = detection.get('bbox')
-                    x = int((np.floor((bbox[0] + bbox[2]) * heatmap_x / 2)).item())
-                    y = int((np.floor((bbox[1] + bbox[3]) * heatmap_y / 2)).item())
-                    heatmap_grid[x][y] += 1 / (1 + heatmap_grid[x][y])
-            np.save(heatmap_file, heatmap_grid)
-
-    @classmethod
-    def compute_daily_metrics(cls, config):
-        super().compute_daily_metrics(config)
-        base_directory = get_source_log_directory(config)
-        entities = config.get_video_sources()
-        for entity in entities:
-            entity_directory = os.path.join(base_directory, entity["id"])
-            objects_log_directory = os.path.join(entity_directory, "objects_log")
-            heatmaps_directory = os.path.join(entity_directory, "heatmaps")
-            # Create missing directories
-            os.makedirs(objects_log_directory, exist_ok=True)
-            os.makedirs(heatmaps_directory, exist_ok=True)
-            yesterday = str(date.today() - timedelta(days=1))
-            yesterday_csv = os.path.join(objects_log_directory, yesterday + ".csv")
-            if os.path.isfile(yesterday_csv):
-                detection_heatmap_file = os.path.join(heatmaps_directory, "detections_heatmap_" + yesterday)
-                violation_heatmap_file = os.path.join(heatmaps_directory, "violations_heatmap_" + yesterday)
-                cls.create_heatmap_report(config, yesterday_csv, detection_heatmap_file, "Detections")
-                cls.create_heatmap_report(config, yesterday_csv, violation_heatmap_file, "Violations")
-
     @classmethod
     def generate_live_csv_data(cls, today_entity_csv, entity, entries_in_interval):
         """
         Generates the live report using the `today_entity_csv` file received.
         """
-        with open(today_entity_csv, "r") as log:
-            objects_logs = {}
-            lastest_entries = deque(csv.DictReader(log), entries_in_interval)
-            for entry in lastest_entries:
-                cls.procces_csv_row(entry, objects_logs)
+        objects_logs = {}
+        for entry in read_last_rows(today_entity_csv, entries_in_interval):
+            cls.procces_csv_row(entry, objects_logs)
         return np.sum(cls.generate_hourly_metric_data(objects_logs), axis=0)
 
     @classmethod
@@ -181,10 +133,150 @@ class SocialDistancingMetric(BaseMetric):
         for n in range(10):
             latest_social_distancing_results[n] = None
         for live_path in live_report_paths:
-            with open(live_path, "r") as live_file:
-                lastest_10_entries = deque(csv.DictReader(live_file), 10)
-                for index, item in enumerate(lastest_10_entries):
-                    if not latest_social_distancing_results[index]:
-                        latest_social_distancing_results[index] = 0
-                    latest_social_distancing_results[index] += int(item["DetectedObjects"]) - int(item["NoInfringement"])
+            for index, item in enumerate(read_last_rows(live_path, 10)):
+                if not latest_social_distancing_results[index]:
+                    latest_social_distancing_results[index] = 0
+                latest_social_distancing_results[index] += int(item["DetectedObjects"]) - int(item["NoInfringement"])
         return [item for item in latest_social_distancing_results.values() if item is not None]
+
+
+class SocialDistancingHeatmaps:
+    """
+    Accumulates the detections and violations heatmaps of the day of each camera. It implements the hourly interface
+    of the metrics used by `compute_sources_hourly_metrics`, so the heatmaps are built from the rows of the objects
+    log decoded for the hourly reports. The number of detections and violations of each cell and the end of the
+    processed hours are stored in the heatmap_counts_<date>.npz file, so each run only adds the new hours.
+    """
+
+    def __init__(self, config):
+        heatmap_resolution = config.get_section_dict("App")["HeatmapResolution"].split(",")
+        self.heatmap_x = int(heatmap_resolution[0])
+        self.heatmap_y = int(heatmap_resolution[1])
+
+    def get_hourly_report_task(self, base_directory: str, entity: Dict, current_hour: int) -> Dict:
+        """
+        Returns the files, the interval and the stored counts of the heatmaps pending to be updated for the
+        `entity`, or None if the heatmaps are updated.
+        """
+        entity_directory = os.path.join(base_directory, entity["id"])
+        objects_log_directory = os.path.join(entity_directory, "objects_log")
+        heatmaps_directory = os.path.join(entity_directory, "heatmaps")
+        # Create missing directories
+        os.makedirs(objects_log_directory, exist_ok=True)
+        os.makedirs(heatmaps_directory, exist_ok=True)
+        time_until = datetime.combine(date.today(), time(current_hour, 0))
+        if current_hour == 0:
+            # Pending to process the latest hour from yesterday
+            report_date = date.today() - timedelta(days=1)
+        else:
+            report_date = date.today()
+        counts_file = os.path.join(heatmaps_directory, "heatmap_counts_" + str(report_date) + ".npz")
+        time_from = datetime.combine(report_date, time(0, 0))
+        heatmap_counts = np.zeros((2, self.heatmap_x, self.heatmap_y), dtype=np.int64)
+        if os.path.isfile(counts_file):
+            with np.load(counts_file) as stored_counts:
+                # The counts are discarded if the resolution of the heatmaps changed
+                if stored_counts["counts"].shape == heatmap_counts.shape:
+                    heatmap_counts = stored_counts["counts"]
+                    time_from = datetime.strptime(str(stored_counts["time_until"]), "%Y-%m-%d %H:%M:%S")
+        if time_from >= time_until:
+            # The hours were already processed
+            return None
+        return {
+            "entity_id": entity["id"],
+            "report_date": report_date,
+            "entity_csv": os.path.join(objects_log_directory, str(report_date) + ".csv"),
+            "heatmaps_directory": heatmaps_directory,
+            "counts_file": counts_file,
+            "heatmap_counts": heatmap_counts,
+            # The progress in the objects log is taken from the metrics read in the same pass
+            "checkpoint": {},
+            "time_from": time_from,
+            "time_until": time_until,
+        }
+
+    def procces_objects_log_row(self, row_time: datetime, detections: List[Dict], violations_indexes: List[int],
+                                objects_logs: Dict):
+        row_hour = row_time.hour
+        if not objects_logs.get(row_hour):
+            objects_logs[row_hour] = {"bboxes": [], "violations": []}
+        hour_log = objects_logs[row_hour]
+        hour_log["bboxes"].extend(detection["bbox"] for detection in detections)
+        row_violations = [False] * len(detections)
+        for object_id in violations_indexes:
+            row_violations[object_id] = True
+        hour_log["violations"].extend(row_violations)
+
+    def procces_binary_log(self, frames, detections, objects_logs: Dict):
+        detections_hours = detections["timestamp"] % 86400 // 3600
+        for hour in np.unique(detections_hours).tolist():
+            hour_detections = detections[detections_hours == hour]
+            objects_logs[hour] = {"bboxes": hour_detections["bbox"], "violations": hour_detections["violation"]}
+
+    def generate_hourly_metric_data(self, objects_logs: Dict, entity=None):
+        """
+        Returns the number of detections and violations of each cell of the heatmaps in the `objects_logs` hours.
+        """
+        heatmap_counts = np.zeros((2, self.heatmap_x, self.heatmap_y), dtype=np.int64)
+        for hour_log in objects_logs.values():
+            if not hour_log:
+                continue
+            bboxes = np.array(hour_log["bboxes"], dtype=float).reshape(-1, 4)
+            violations = np.array(hour_log["violations"], dtype=bool)
+            heatmap_counts[0] += self.get_heatmap_counts(bboxes)
+            heatmap_counts[1] += self.get_heatmap_counts(bboxes[violations])
+        return heatmap_counts
+
+    def generate_hourly_csv_data(self, entity: Dict, entity_file: str, time_from: datetime, time_until: datetime,
+                                 checkpoint: Dict = None):
+        """
+        Returns the counts of the detections logged in the [time_from, time_until) interval of the binary objects
+        log of the `entity_file` (the CSV rows are dispatched by `compute_sources_hourly_metrics`).
+        """
+        binary_log = read_complete_binary_objects_log(entity_file) if os.path.isfile(entity_file) else None
+        if binary_log is None:
+            return None
+        objects_logs = {}
+        self.procces_binary_log(*select_detections(*binary_log, time_from, time_until), objects_logs)
+        return self.generate_hourly_metric_data(objects_logs, entity)
+
+    def write_hourly_report(self, task: Dict, heatmap_counts):
+        """
+        Adds the `heatmap_counts` to the heatmaps of the `task` and stores the counts with the end of the processed
+        hours.
+        """
+        heatmap_counts = task["heatmap_counts"] + heatmap_counts
+        report_date = str(task["report_date"])
+        heatmaps_directory = task["heatmaps_directory"]
+        self.save_heatmap(heatmap_counts[0], os.path.join(heatmaps_directory, "detections_heatmap_" + report_date))
+        self.save_heatmap(heatmap_counts[1], os.path.join(heatmaps_directory, "violations_heatmap_" + report_date))
+        # The counts are stored after the heatmaps, if the process is stopped in the middle the hours are processed
+        # again by the next run
+        counts_file = task["counts_file"]
+        with open(counts_file + ".tmp", "wb") as f:
+            np.savez(f, counts=heatmap_counts, time_until=task["time_until"].strftime("%Y-%m-%d %H:%M:%S"))
+        os.replace(counts_file + ".tmp", counts_file)
+
+    def get_heatmap_counts(self, bboxes):
+        """
+        Returns the number of `bboxes` centered in each cell of the heatmaps grid.
+        """
+        heatmap_counts = np.zeros((self.heatmap_x, self.heatmap_y), dtype=np.int64)
+        heatmap_xs = np.floor((bboxes[:, 0] + bboxes[:, 2]) * self.heatmap_x / 2).astype(int)
+        heatmap_ys = np.floor((bboxes[:, 1] + bboxes[:, 3]) * self.heatmap_y / 2).astype(int)
+        np.add.at(heatmap_counts, (heatmap_xs, heatmap_ys), 1)
+        return heatmap_counts
+
+    @classmethod
+    def save_heatmap(cls, heatmap_counts, heatmap_file: str):
+        """
+        Saves the heatmap of the `heatmap_counts` grid. Each detection adds 1 / (1 + value) to the value of its
+        cell, so the value of a cell only depends on its number of detections.
+        """
+        values = np.zeros(int(heatmap_counts.max(initial=0)) + 1)
+        for count in range(1, len(values)):
+            values[count] = values[count - 1] + 1 / (1 + values[count - 1])
+        # Replace the heatmap once it's completely written
+        with open(heatmap_file + ".npy.tmp", "wb") as f:
+            np.save(f, values[heatmap_counts])
+        os.replace(heatmap_file + ".npy.tmp", heatmap_file + ".npy")
@@ -1,28 +1,136 @@
+import logging
 import numpy as np
 import os
 import pandas as pd
+import time
 
+from concurrent.futures import ProcessPoolExecutor
+
+from libs.config_engine import ConfigEngine
+from .base import compute_sources_hourly_metrics
 from .face_mask_usage import FaceMaskUsageMetric
 from .occupancy import OccupancyMetric
-from .social_distancing import SocialDistancingMetric
+from .reports_store import ReportsStore
+from .social_distancing import SocialDistancingHeatmaps, SocialDistancingMetric
+
+logger = logging.getLogger(__name__)
+
+# Config of the processes of the pool (the ConfigEngine can't be pickled)
+_worker_config = None
+
+
+def _init_worker(config_file_path):
+    global _worker_config
+    _worker_config = ConfigEngine(config_file_path)
+
+
+def _run_entity_task(task, config, entity, *args):
+    """
+    Runs the metrics `task` for the `entity` and returns its duration (in seconds).
+    """
+    begin_time = time.perf_counter()
+    task(config or _worker_config, entity, *args)
+    return time.perf_counter() - begin_time
+
+
+def run_entities_tasks(config, tasks, max_workers=1):
+    """
+    Runs the metrics tasks of each entity, a list of (task, entity, args) tuples. When `max_workers` is greater
+    than 1 the tasks are distributed in a pool of processes. The tasks of different entities only share the
+    reports store (see libs.metrics.reports_store), its SQLite database serializes the concurrent writes (WAL
+    journal and busy timeout), so they can run in parallel.
+    """
+    durations = {}
+    if max_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker,
+                                 initargs=(config.config_file_path,)) as executor:
+            futures = [
+                (task, entity, executor.submit(_run_entity_task, task, None, entity, *args))
+                for task, entity, args in tasks
+            ]
+            for task, entity, future in futures:
+                try:
+                    durations[(task.__name__, entity["id"])] = future.result()
+                except Exception:
+                    logger.exception(f"Error running {task.__name__} for {entity['id']}")
+    else:
+        for task, entity, args in tasks:
+            try:
+                durations[(task.__name__, entity["id"])] = _run_entity_task(task, config, entity, *args)
+            except Exception:
+                logger.exception(f"Error running {task.__name__} for {entity['id']}")
+    # Report the most expensive entities first
+    for (task_name, entity_id), duration in sorted(durations.items(), key=lambda item: -item[1]):
+        logger.info(f"{task_name} for {entity_id} took {duration:.2f} seconds")
+    return durations
+
+
+def compute_camera_hourly_metrics(config, camera, current_hour=None):
+    # The objects log is parsed once for both metrics and the heatmaps
+    compute_sources_hourly_metrics(
+        config, [SocialDistancingMetric, FaceMaskUsageMetric, SocialDistancingHeatmaps(config)], [camera],
+        current_hour
+    )
+
+
+def compute_area_hourly_metrics(config, area):
+    OccupancyMetric.compute_hourly_metrics(config, [area])
+
+
+def compute_camera_daily_metrics(config, camera):
+    # Process the hours of yesterday missed by the hourly task (e.g. the latest one if it didn't run at midnight)
+    compute_camera_hourly_metrics(config, camera, current_hour=0)
+    SocialDistancingMetric.compute_daily_metrics(config, [camera])
+    FaceMaskUsageMetric.compute_daily_metrics(config, [camera])
+
+
+def compute_area_daily_metrics(config, area):
+    OccupancyMetric.compute_daily_metrics(config, [area])
+
+
+def compute_camera_live_metrics(config, camera, live_interval):
+    SocialDistancingMetric.compute_live_metrics(config, live_interval, [camera])
+    FaceMaskUsageMetric.compute_live_metrics(config, live_interval, [camera])
+
+
+def compute_area_live_metrics(config, area, live_interval):
+    OccupancyMetric.compute_live_metrics(config, live_interval, [area])
+
+
+def create_reports_stores(config):
+    """
+    Creates the reports stores of the log directories of the cameras and the areas, importing their existing CSV
+    reports. The stores that already exist are not modified.
+    """
+    metrics_by_directory = {}
+    for metric in [SocialDistancingMetric, FaceMaskUsageMetric, OccupancyMetric]:
+        base_directory = metric.get_entity_base_directory(config)
+        if base_directory:
+            metrics_by_directory.setdefault(base_directory, []).append(metric)
+    for base_directory, metrics in metrics_by_directory.items():
+        if ReportsStore.get_store(base_directory) is None:
+            os.makedirs(base_directory, exist_ok=True)
+            ReportsStore.create(base_directory, metrics)
 
 
-def compute_hourly_metrics(config):
-    SocialDistancingMetric.compute_hourly_metrics(config)
-    FaceMaskUsageMetric.compute_hourly_metrics(config)
-    OccupancyMetric.compute_hourly_metrics(config)
+def compute_hourly_metrics(config, max_workers=1):
+    create_reports_stores(config)
+    tasks = [(compute_camera_hourly_metrics, camera, ()) for camera in config.get_video_sources()]
+    tasks.extend((compute_area_hourly_metrics, area, ()) for area in config.get_areas())
+    run_entities_tasks(config, tasks, max_workers)
 
 
-def compute_daily_metrics(config):
-    SocialDistancingMetric.compute_daily_metrics(config)
-    FaceMaskUsageMetric.compute_daily_metrics(config)
-    OccupancyMetric.compute_daily_metrics(config)
+def compute_daily_metrics(config, max_workers=1):
+    create_reports_stores(config)
+    tasks = [(compute_camera_daily_metrics, camera, ()) for camera in config.get_video_sources()]
+    tasks.extend((compute_area_daily_metrics, area, ()) for area in config.get_areas())
+    run_entities_tasks(config, tasks, max_workers)
 
 
-def compute_live_metrics(config, live_interval):
-    SocialDistancingMetric.compute_live_metrics(config, live_interval)
-    FaceMaskUsageMetric.compute_live_metrics(config, live_interval)
-    OccupancyMetric.compute_live_metrics(config, live_interval)
+def compute_live_metrics(config, live_interval, max_workers=1):
+    tasks = [(compute_camera_live_metrics, camera, (live_interval,)) for camera in config.get_video_sources()]
+    tasks.extend((compute_area_live_metrics, area, (live_interval,)) for area in config.get_areas())
+    run_entities_tasks(config, tasks, max_workers)
 
 
 def generate_heatmap(camera_id, from_date, to_date, report_type):
@@ -0,0 +1,45 @@
+import cv2 as cv
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap motion detector used to skip the inference on static frames. Each frame is downscaled, converted to
+    grayscale and compared against a running average of the previous frames (the background).
+
+    :param threshold: Minimum fraction (0-1) of changed pixels to consider that the frame has motion.
+    :param max_skipped_frames: Maximum number of consecutive frames without motion. After that, a frame is
+        reported as changed to force a full detection.
+    :param resolution: Resolution used to compare the frames.
+    :param pixel_threshold: Minimum difference (0-255) in a pixel to consider it changed.
+    :param learning_rate: Weight of the new frames in the running background.
+    """
+
+    def __init__(self, threshold, max_skipped_frames, resolution=(160, 120), pixel_threshold=25,
+                 learning_rate=0.05):
+        self.threshold = threshold
+        self.max_skipped_frames = max_skipped_frames
+        self.resolution = resolution
+        self.pixel_threshold = pixel_threshold
+        self.learning_rate = learning_rate
+        self.background = None
+        self.skipped_frames = 0
+
+    def has_motion(self, cv_image):
+        """
+        Returns True if the frame changed enough since the previous ones (or the detection must be forced).
+        """
+        gray_image = cv.cvtColor(cv.resize(cv_image, self.resolution, interpolation=cv.INTER_AREA), cv.COLOR_BGR2GRAY)
+        gray_image = cv.GaussianBlur(gray_image, (5, 5), 0)
+        if self.background is None:
+            self.background = gray_image.astype(np.float32)
+            self.skipped_frames = 0
+            return True
+        difference = cv.absdiff(gray_image, cv.convertScaleAbs(self.background))
+        changed_pixels = np.count_nonzero(difference > self.pixel_threshold) / difference.size
+        cv.accumulateWeighted(gray_image, self.background, self.learning_rate)
+        if changed_pixels >= self.threshold or self.skipped_frames >= self.max_skipped_frames:
+            self.skipped_frames = 0
+            return True
+        self.skipped_frames += 1
+        return False
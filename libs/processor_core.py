@@ -7,6 +7,7 @@ from queue import Empty
 import schedule
 from libs.engine_threading import run_video_processing
 from libs.area_threading import run_area_processing
+from libs.live_state import LiveStateTable
 from libs.utils.notifications import run_check_violations
 
 logger = logging.getLogger(__name__)
@@ -25,6 +26,7 @@ class ProcessorCore:
         self._setup_queues()
         self._tasks = {}
         self._engines = []
+        self._live_state = None
 
     def _setup_queues(self):
         QueueManager.register('get_cmd_queue', callable=lambda: self._cmd_queue)
@@ -130,18 +132,29 @@ class ProcessorCore:
             p_src = sources[index:(index + tasks_per_process + extra)]
             index += tasks_per_process + extra
             recv_conn, send_conn = mp.Pipe(False)
-            p = mp.Process(target=run_video_processing, args=(self.config, recv_conn, p_src))
+            p = mp.Process(target=run_video_processing, args=(self.config, recv_conn, p_src, self._live_state_name()))
             p.start()
             engines.append((send_conn, p))
         return engines
 
     def start_processing_areas(self):
         recv_conn, send_conn = mp.Pipe(False)
-        p = mp.Process(target=run_area_processing, args=(self.config, recv_conn, self.config.get_areas()))
+        p = mp.Process(
+            target=run_area_processing,
+            args=(self.config, recv_conn, self.config.get_areas(), self._live_state_name())
+        )
         p.start()
         return (send_conn, p)
 
+    def _live_state_name(self):
+        return self._live_state.name if self._live_state else None
+
     def _start_processing(self):
+        # The cameras publish their latest state in a shared memory table read by the areas
+        try:
+            self._live_state = LiveStateTable.create([src["id"] for src in self.config.get_video_sources()])
+        except OSError as e:
+            logger.warning(f"The live state table can't be created, the areas will read the logs: {e}")
         self._engines = self.start_processing_sources()
         area_engine = self.start_processing_areas()
         self._engines.append(area_engine)
@@ -155,3 +168,6 @@ class ProcessorCore:
                 proc.terminate()
             del proc
         self._engines = []
+        if self._live_state:
+            self._live_state.close()
+            self._live_state = None
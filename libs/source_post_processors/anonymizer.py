@@ -11,11 +11,11 @@ class AnonymizerPostProcesor:
         Anonymize every instance in the frame.
         """
         h, w = img.shape[:2]
-        for box in objects_list:
-            xmin = max(int(box["bboxReal"][0]), 0)
-            xmax = min(int(box["bboxReal"][2]), w)
-            ymin = max(int(box["bboxReal"][1]), 0)
-            ymax = min(int(box["bboxReal"][3]), h)
+        for box in objects_list.bbox_real:
+            xmin = max(int(box[0]), 0)
+            xmax = min(int(box[2]), w)
+            ymin = max(int(box[1]), 0)
+            ymax = min(int(box[3]), h)
             ymax = (ymax - ymin) // 3 + ymin
             roi = img[ymin:ymax, xmin:xmax]
             roi = self.anonymize_face(roi)
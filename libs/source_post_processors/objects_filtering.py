@@ -15,18 +15,13 @@ class ObjectsFilteringPostProcessor:
         """
         filtering boxes which are biger than the 1/4 of the size the image
         params:
-            object_list: a list of dictionaries. each dictionary has attributes of a detected object such as
-            "id", "centroid" (a tuple of the normalized centroid coordinates (cx,cy,w,h) of the box) and "bbox" (a tuple
-            of the normalized (xmin,ymin,xmax,ymax) coordinate of the box)
+            object_list: a DetectionBatch with the detected objects. Its "centroid" array has the normalized centroid
+            coordinates (cx,cy,w,h) of the boxes.
         returns:
         object_list: input object list without large boxes
         """
-        large_boxes = []
-        for i in range(len(object_list)):
-            if (object_list[i]["centroid"][2] * object_list[i]["centroid"][3]) > 0.25:
-                large_boxes.append(i)
-        updated_object_list = [j for i, j in enumerate(object_list) if i not in large_boxes]
-        return updated_object_list
+        large_boxes = (object_list.centroid[:, 2] * object_list.centroid[:, 3]) > 0.25
+        return object_list.select(~large_boxes)
 
     @staticmethod
     def non_max_suppression_fast(object_list, overlapThresh):
@@ -34,20 +29,19 @@ class ObjectsFilteringPostProcessor:
         """
         omitting duplicated boxes by applying an auxilary non-maximum-suppression.
         params:
-        object_list: a list of dictionaries. each dictionary has attributes of a detected object such
-        "id", "centroid" (a tuple of the normalized centroid coordinates (cx,cy,w,h) of the box) and "bbox" (a tuple
-        of the normalized (xmin,ymin,xmax,ymax) coordinate of the box)
+        object_list: a DetectionBatch with the detected objects. Its "centroid" array has the normalized centroid
+        coordinates (cx,cy,w,h) and its "bbox" array has the normalized (xmin,ymin,xmax,ymax) coordinates of the boxes.
 
         overlapThresh: threshold of minimum IoU of to detect two box as duplicated.
 
         returns:
         object_list: input object list without duplicated boxes
         """
-        # if there are no boxes, return an empty list
-        boxes = np.array([item["centroid"] for item in object_list])
-        corners = np.array([item["bbox"] for item in object_list])
+        # if there are no boxes, return the empty batch
+        boxes = object_list.centroid
+        corners = object_list.bbox
         if len(boxes) == 0:
-            return []
+            return object_list
         if boxes.dtype.kind == "i":
             boxes = boxes.astype("float")
         # initialize the list of picked indexes
@@ -77,8 +71,7 @@ class ObjectsFilteringPostProcessor:
             overlap = (w * h) / area[idxs[:last]]
             # delete all indexes from the index list that have
             idxs = np.delete(idxs, np.concatenate(([last], np.where(overlap > overlapThresh)[0])))
-        updated_object_list = [j for i, j in enumerate(object_list) if i in pick]
-        return updated_object_list
+        return object_list.select(np.sort(pick))
 
     def filter_objects(self, objects_list):
         new_objects_list = self.ignore_large_boxes(objects_list)
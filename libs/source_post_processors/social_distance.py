@@ -1,11 +1,11 @@
 import logging
-import math
 import numpy as np
 
 from scipy.spatial.distance import cdist
 
+from libs.detection_batch import DetectionBatch
 from libs.utils.camera_calibration import get_camera_calibration_path
-from tools.objects_post_process import extract_violating_objects
+from tools.objects_post_process import extract_close_pairs, extract_violating_objects, sort_pairs
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +37,12 @@ class SocialDistancePostProcessor:
                 logger.error("The specified 'CalibrationFile' does not exist")
                 logger.info(f"Falling back using {default_dist_method}")
                 self.dist_method = default_dist_method
+        # The distances between each pair of objects are only required to visualize the live feed
+        video_loggers = [
+            x for x in self.config.get_sections() if x.startswith("SourceLogger_")
+            and self.config.get_section_dict(x)["Name"] == "video_logger" and self.config.get_boolean(x, "Enabled")
+        ]
+        self.distances_required = bool(video_loggers) and self.config.get_boolean(source, "LiveFeedEnabled")
 
     def calculate_box_distances(self, nn_out):
 
@@ -64,64 +70,69 @@ class SocialDistancePostProcessor:
         else:
             raise ValueError(f"Not supported distance method {self.dist_method}")
 
+    @staticmethod
+    def get_boxes_arrays(nn_out):
+        """
+        Converts the detected objects (a DetectionBatch or a list of dictionaries) into a pair of arrays.
+
+        Returns:
+            bboxes: a Nx4 ndarray with the "bboxReal" (xmin,ymin,xmax,ymax) of each object.
+            centroids: a Nx4 ndarray with the "centroidReal" (cx,cy,w,h) of each object.
+        """
+        if isinstance(nn_out, DetectionBatch):
+            return nn_out.bbox_real, nn_out.centroid_real
+        bboxes = np.array([obj["bboxReal"] for obj in nn_out])
+        centroids = np.array([obj["centroidReal"] for obj in nn_out])
+        return bboxes, centroids
+
     def calculate_four_corner_distance(self, nn_out):
-        distances = []
-        for i in range(len(nn_out)):
-            distance_row = []
-            for j in range(len(nn_out)):
-                if i == j:
-                    distance_row.append(0)
-                    continue
-                lower_left_of_first_box = [nn_out[i]["bboxReal"][0], nn_out[i]["bboxReal"][1],
-                                           nn_out[i]["centroidReal"][3]]
-                lower_right_of_first_box = [nn_out[i]["bboxReal"][2], nn_out[i]["bboxReal"][1],
-                                            nn_out[i]["centroidReal"][3]]
-                upper_left_of_first_box = [nn_out[i]["bboxReal"][0], nn_out[i]["bboxReal"][3],
-                                           nn_out[i]["centroidReal"][3]]
-                upper_right_of_first_box = [nn_out[i]["bboxReal"][2], nn_out[i]["bboxReal"][3],
-                                            nn_out[i]["centroidReal"][3]]
-
-                lower_left_of_second_box = [nn_out[j]["bboxReal"][0], nn_out[j]["bboxReal"][1],
-                                            nn_out[j]["centroidReal"][3]]
-                lower_right_of_second_box = [nn_out[j]["bboxReal"][2], nn_out[j]["bboxReal"][1],
-                                             nn_out[j]["centroidReal"][3]]
-                upper_left_of_second_box = [nn_out[j]["bboxReal"][0], nn_out[j]["bboxReal"][3],
-                                            nn_out[j]["centroidReal"][3]]
-                upper_right_of_second_box = [nn_out[j]["bboxReal"][2], nn_out[j]["bboxReal"][3],
-                                             nn_out[j]["centroidReal"][3]]
-
-                l1 = self.calculate_distance_of_two_points_of_boxes(
-                    lower_left_of_first_box, lower_left_of_second_box)
-                l2 = self.calculate_distance_of_two_points_of_boxes(
-                    lower_right_of_first_box, lower_right_of_second_box)
-                l3 = self.calculate_distance_of_two_points_of_boxes(
-                    upper_left_of_first_box, upper_left_of_second_box)
-                l4 = self.calculate_distance_of_two_points_of_boxes(
-                    upper_right_of_first_box, upper_right_of_second_box)
-                distance_row.append(min(l1, l2, l3, l4))
-            distances.append(distance_row)
+        if len(nn_out) == 0:
+            return np.asarray([], dtype=np.float32)
+        bboxes, centroids = self.get_boxes_arrays(nn_out)
+        heights = centroids[:, 3]
+        corners_distances = []
+        # Lower left, lower right, upper left and upper right corners
+        for x_index, y_index in [(0, 1), (2, 1), (0, 3), (2, 3)]:
+            corners = np.stack([bboxes[:, x_index], bboxes[:, y_index], heights])
+            corners_distances.append(
+                self.calculate_distance_of_two_points_of_boxes(corners[:, :, None], corners[:, None, :]))
+        distances = np.min(corners_distances, axis=0)
+        np.fill_diagonal(distances, 0)
         return np.asarray(distances, dtype=np.float32)
 
     def calculate_center_points_distance(self, nn_out):
-        distances = []
-        for i in range(len(nn_out)):
-            distance_row = []
-            for j in range(len(nn_out)):
-                if i == j:
-                    distance_row.append(0)
-                    continue
-                center_of_first_box = [nn_out[i]["centroidReal"][0], nn_out[i]["centroidReal"][1], nn_out[i]["centroidReal"][3]]
-                center_of_second_box = [nn_out[j]["centroidReal"][0], nn_out[j]["centroidReal"][1], nn_out[j]["centroidReal"][3]]
-                distance_row.append(self.calculate_distance_of_two_points_of_boxes(center_of_first_box, center_of_second_box))
-            distances.append(distance_row)
+        if len(nn_out) == 0:
+            return np.asarray([], dtype=np.float32)
+        _, centroids = self.get_boxes_arrays(nn_out)
+        centers = centroids[:, [0, 1, 3]].T
+        distances = self.calculate_distance_of_two_points_of_boxes(centers[:, :, None], centers[:, None, :])
+        np.fill_diagonal(distances, 0)
         return np.asarray(distances, dtype=np.float32)
 
     def calculate_calibrated_distance(self, nn_out):
-        world_coordinate_points = np.array([self.transform_to_world_coordinate(bbox) for bbox in nn_out])
-        if len(world_coordinate_points) == 0:
+        if len(nn_out) == 0:
             return np.array([])
+        bboxes, _ = self.get_boxes_arrays(nn_out)
+        world_coordinate_points = self.transform_to_world_coordinates(bboxes)
         return cdist(world_coordinate_points, world_coordinate_points)
 
+    def transform_to_world_coordinates(self, bboxes):
+        """
+        This function will transform the center of the bottom line of the bounding boxes from image coordinate to
+        world coordinate via a homography matrix
+        Args:
+            bboxes: a Nx4 ndarray with the (xmin,ymin,xmax,ymax) coordinates of the boxes
+
+        Returns:
+            A Nx2 ndarray of (X,Y) of transformed points
+
+        """
+        floor_points = np.stack([
+            np.trunc((bboxes[:, 0] + bboxes[:, 2]) / 2), bboxes[:, 3], np.ones(len(bboxes))
+        ], axis=1).astype(np.float64)
+        floor_world_points = np.matmul(floor_points, self.h_inv.T)
+        return floor_world_points[:, :-1] / floor_world_points[:, -1:]
+
     def transform_to_world_coordinate(self, bbox):
         """
         This function will transform the center of the bottom line of a bounding box from image coordinate to world
@@ -135,10 +146,7 @@ class SocialDistancePostProcessor:
             A numpy array of (X,Y) of transformed point
 
         """
-        floor_point = np.array([int((bbox["bboxReal"][0] + bbox["bboxReal"][2]) / 2), bbox["bboxReal"][3], 1])
-        floor_world_point = np.matmul(self.h_inv, floor_point)
-        floor_world_point = floor_world_point[:-1] / floor_world_point[-1]
-        return floor_world_point
+        return self.transform_to_world_coordinates(np.array([bbox["bboxReal"]]))[0]
 
     def calculate_distance_of_two_points_of_boxes(self, first_point, second_point):
 
@@ -146,6 +154,8 @@ class SocialDistancePostProcessor:
         This function calculates a distance l for two input corresponding points of two detected bounding boxes.
         it is assumed that each person is H = 170 cm tall in real scene to map the distances in the image (in pixels) to
         physical distance measures (in meters).
+        The points can also be ndarrays of shape (3, ...), in that case the distances are calculated element-wise
+        (following the numpy broadcasting rules).
 
         params:
         first_point: (x, y, h)-tuple, where x,y is the location of a point (center or each of 4 corners of a bounding box)
@@ -167,7 +177,7 @@ class SocialDistancePostProcessor:
 
         lx = dx * 170 * (1 / h1 + 1 / h2) / 2
         ly = dy * 170 * (1 / h1 + 1 / h2) / 2
-        return math.sqrt(lx ** 2 + ly ** 2)
+        return np.sqrt(lx ** 2 + ly ** 2)
 
     def calculate_distancing(self, objects_list):
         """
@@ -188,15 +198,64 @@ class SocialDistancePostProcessor:
         distances: a NxN ndarray which i,j element is distance between i-th and l-th bounding box
 
         """
-        for i, item in enumerate(objects_list):
-            item["id"] = item["id"].split("-")[0] + "-" + str(i)
+        self.update_objects_ids(objects_list)
         distances = self.calculate_box_distances(objects_list)
 
         return distances
 
+    @staticmethod
+    def update_objects_ids(objects_list):
+        if isinstance(objects_list, DetectionBatch):
+            objects_list.object_index = np.arange(len(objects_list))
+            return
+        for i, item in enumerate(objects_list):
+            item["id"] = item["id"].split("-")[0] + "-" + str(i)
+
+    def calculate_violating_objects(self, objects_list):
+        """
+        Returns the same pairs of objects than `extract_violating_objects` without calculating a distance matrix.
+        A radius query (in the image or world coordinates) returns the candidate pairs of objects and the
+        distance is only calculated for them.
+        """
+        self.update_objects_ids(objects_list)
+        if len(objects_list) < 2:
+            return np.empty((0, 2), dtype=int)
+        bboxes, centroids = self.get_boxes_arrays(objects_list)
+        if self.dist_method == self.CALIBRATED_DISTANCE:
+            world_coordinate_points = self.transform_to_world_coordinates(bboxes)
+            pairs = extract_close_pairs(world_coordinate_points, self.dist_threshold)
+            distances = np.linalg.norm(
+                world_coordinate_points[pairs[:, 0]] - world_coordinate_points[pairs[:, 1]], axis=1)
+        elif self.dist_method in [self.CENTER_POINTS_DISTANCE, self.FOUR_CORNER_DISTANCE]:
+            heights = centroids[:, 3]
+            # Two objects closer than the threshold are at most (threshold * max_height / 170) pixels away
+            radius = self.dist_threshold * np.max(heights) / 170
+            if self.dist_method == self.CENTER_POINTS_DISTANCE:
+                points_indexes = [(0, 1)]
+                points_coordinates = centroids
+            else:
+                # Lower left, lower right, upper left and upper right corners
+                points_indexes = [(0, 1), (2, 1), (0, 3), (2, 3)]
+                points_coordinates = bboxes
+            points = [np.stack([points_coordinates[:, x_index], points_coordinates[:, y_index], heights])
+                      for x_index, y_index in points_indexes]
+            pairs = np.unique(np.concatenate(
+                [extract_close_pairs(p[:2].T, radius) for p in points]), axis=0).reshape(-1, 2)
+            distances = np.min([
+                self.calculate_distance_of_two_points_of_boxes(p[:, pairs[:, 0]], p[:, pairs[:, 1]])
+                for p in points
+            ], axis=0)
+            distances = np.asarray(distances, dtype=np.float32)
+        else:
+            raise ValueError(f"Not supported distance method {self.dist_method}")
+        return sort_pairs(pairs[distances < self.dist_threshold])
+
     def process(self, cv_image, objects_list, post_processing_data):
-        post_processing_data["distances"] = self.calculate_distancing(objects_list)
-        post_processing_data["violating_objects"] = extract_violating_objects(
-            post_processing_data["distances"], self.dist_threshold)
+        if self.distances_required:
+            post_processing_data["distances"] = self.calculate_distancing(objects_list)
+            post_processing_data["violating_objects"] = extract_violating_objects(
+                post_processing_data["distances"], self.dist_threshold)
+        else:
+            post_processing_data["violating_objects"] = self.calculate_violating_objects(objects_list)
         post_processing_data["dist_threshold"] = self.dist_threshold
         return cv_image, objects_list, post_processing_data
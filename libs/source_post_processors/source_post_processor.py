@@ -1,3 +1,6 @@
+from libs.detection_batch import DetectionBatch
+
+
 class SourcePostProcessor:
 
     def __init__(self, config, source: str, post_processor: str):
@@ -16,4 +19,7 @@ class SourcePostProcessor:
             raise ValueError(f"Not supported post processor named: {self.post_processor_name}")
 
     def process(self, cv_image, objects_list, post_processing_data):
-        return self.post_processor.process(cv_image, objects_list, post_processing_data)
+        cv_image, objects_list, post_processing_data = self.post_processor.process(
+            cv_image, objects_list, post_processing_data)
+        # Post processors written for the legacy representation may return a list of dicts
+        return cv_image, DetectionBatch.from_objects(objects_list), post_processing_data
@@ -4,17 +4,85 @@ https://github.com/bochinski/iou-tracker
 """
 
 import numpy as np
-from libs.trackers.utils.misc import get_centroids, iou
+from scipy.optimize import linear_sum_assignment
+from libs.trackers.utils.misc import get_centroids, iou_matrix
 from libs.trackers.base_tracker import BaseTracker
 
+GREEDY_ASSIGNMENT = "greedy"
+HUNGARIAN_ASSIGNMENT = "hungarian"
+
 
 class IOUTracker(BaseTracker):
-    def __init__(self, max_lost=2, iou_threshold=0.5, min_detection_confidence=0.4, max_detection_confidence=0.7):
+    def __init__(self, max_lost=2, iou_threshold=0.5, min_detection_confidence=0.4, max_detection_confidence=0.7,
+                 assignment=GREEDY_ASSIGNMENT, initial_capacity=64):
+        """
+
+        Parameters
+        ----------
+        assignment : str
+                     Method used to match the tracks with the new detections. "greedy" (each track, in creation
+                     order, takes the detection with the highest IoU) or "hungarian" (maximizes the total IoU).
+        initial_capacity : int
+                           Number of tracks preallocated in the arrays that store the tracks boxes.
+        """
+        if assignment not in [GREEDY_ASSIGNMENT, HUNGARIAN_ASSIGNMENT]:
+            raise ValueError(f"Not supported tracks assignment: {assignment}")
         self.iou_threshold = iou_threshold
         self.max_detection_confidence = max_detection_confidence
         self.min_detection_confidence = min_detection_confidence
+        self.assignment = assignment
+        # Boxes of the tracks, sorted as self.tracks (by track id). Only the first `tracks_count` rows are used.
+        self.tracks_count = 0
+        self.tracks_ids = np.zeros(initial_capacity, dtype=int)
+        self.tracks_bboxes = np.zeros((initial_capacity, 4))
         super(IOUTracker, self).__init__(max_lost=max_lost)
 
+    def _add_track(self, centroid, bbox, class_id, **kwargs):
+        if self.tracks_count == len(self.tracks_ids):
+            self.tracks_ids = np.concatenate([self.tracks_ids, np.zeros_like(self.tracks_ids)])
+            self.tracks_bboxes = np.concatenate([self.tracks_bboxes, np.zeros_like(self.tracks_bboxes)])
+        self.tracks_ids[self.tracks_count] = self.next_track_id
+        self.tracks_bboxes[self.tracks_count] = bbox
+        self.tracks_count += 1
+        super(IOUTracker, self)._add_track(centroid, bbox, class_id, **kwargs)
+
+    def _remove_track(self, track_id):
+        row = self._track_row(track_id)
+        self.tracks_ids[row:self.tracks_count - 1] = self.tracks_ids[row + 1:self.tracks_count]
+        self.tracks_bboxes[row:self.tracks_count - 1] = self.tracks_bboxes[row + 1:self.tracks_count]
+        self.tracks_count -= 1
+        super(IOUTracker, self)._remove_track(track_id)
+
+    def _update_track(self, track_id, centroid, bbox, **kwargs):
+        self.tracks_bboxes[self._track_row(track_id)] = bbox
+        super(IOUTracker, self)._update_track(track_id, centroid, bbox, **kwargs)
+
+    def _track_row(self, track_id):
+        # The track ids are increasing, so the rows are sorted by id
+        return np.searchsorted(self.tracks_ids[:self.tracks_count], track_id)
+
+    def _assign_detections(self, ious):
+        """
+        Returns, for each track (row of the `ious` matrix), the index of the assigned detection (or -1).
+        """
+        assigned_detections = np.full(ious.shape[0], -1)
+        if ious.size == 0:
+            return assigned_detections
+        if self.assignment == HUNGARIAN_ASSIGNMENT:
+            rows, cols = linear_sum_assignment(-ious)
+            matched = ious[rows, cols] > self.iou_threshold
+            assigned_detections[rows[matched]] = cols[matched]
+            return assigned_detections
+        available_ious = ious.copy()
+        for row in range(ious.shape[0]):
+            # The first detection with the highest IoU among the ones not assigned yet
+            col = np.argmax(available_ious[row])
+            if available_ious[row, col] > self.iou_threshold:
+                assigned_detections[row] = col
+                # IoUs are non-negative, so an assigned detection is never selected again
+                available_ious[:, col] = -1
+        return assigned_detections
+
     def update(self, bboxes: list, class_ids: list, detection_scores: list):
         """
         Update the tracker based on the new bboxes as input.
@@ -56,28 +124,30 @@ class IOUTracker(BaseTracker):
         new_detection_scores = np.array(detection_scores)
         new_centroids = get_centroids(new_bboxes)
 
-        new_detections = list(zip(new_bboxes, new_class_ids, new_centroids, new_detection_scores))
-        track_ids = list(self.tracks.keys())
-
-        updated_tracks = []
-        for track_id in track_ids:
-            if len(new_detections) > 0:
-                idx, best_match = max(enumerate(new_detections), key=lambda x: iou(self.tracks[track_id].bbox, x[1][0]))
-                (bb, cid, ctrd, scr) = best_match
-
-                if iou(self.tracks[track_id].bbox, bb) > self.iou_threshold:
-                    max_score = max(self.tracks[track_id].info['max_score'], scr)
-                    self._update_track(track_id, ctrd, bb, score=scr, max_score=max_score)
-                    updated_tracks.append(track_id)
-                    del new_detections[idx]
-
-            if len(updated_tracks) == 0 or track_id is not updated_tracks[-1]:
+        track_ids = self.tracks_ids[:self.tracks_count].tolist()
+        ious = iou_matrix(self.tracks_bboxes[:self.tracks_count], new_bboxes)
+        assigned_detections = self._assign_detections(ious)
+
+        for track_id, detection_index in zip(track_ids, assigned_detections.tolist()):
+            if detection_index != -1:
+                scr = new_detection_scores[detection_index]
+                max_score = max(self.tracks[track_id].info['max_score'], scr)
+                self._update_track(
+                    track_id, new_centroids[detection_index], new_bboxes[detection_index],
+                    score=scr, max_score=max_score
+                )
+            else:
                 self.tracks[track_id].lost += 1
                 if self.tracks[track_id].lost > self.max_lost:
                     self._remove_track(track_id)
 
-        for bb_, cid_, ctrd_, scr_ in new_detections:
-            self._add_track(ctrd_, bb_, cid_, score=scr_, max_score=scr_)
+        unassigned_detections = np.ones(len(new_bboxes), dtype=bool)
+        unassigned_detections[assigned_detections[assigned_detections != -1]] = False
+        for i in np.flatnonzero(unassigned_detections):
+            self._add_track(
+                new_centroids[i], new_bboxes[i], new_class_ids[i],
+                score=new_detection_scores[i], max_score=new_detection_scores[i]
+            )
 
         outputs = self._get_tracks(self.tracks)
         return outputs
@@ -0,0 +1,182 @@
+"""
+Implementation of this algorithm is heavily based on the following:
+https://github.com/abewley/sort
+"""
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from libs.trackers.utils.misc import get_centroids, iou_matrix
+from libs.trackers.base_tracker import BaseTracker
+
+# Constant velocity model. The state is (cx, cy, s, r, vcx, vcy, vs) where s is the area and r the aspect ratio
+# of the box, and the measurement is (cx, cy, s, r).
+TRANSITION_MATRIX = np.eye(7)
+TRANSITION_MATRIX[[0, 1, 2], [4, 5, 6]] = 1
+MEASUREMENT_MATRIX = np.eye(4, 7)
+MEASUREMENT_NOISE = np.diag([1., 1., 10., 10.])
+PROCESS_NOISE = np.diag([1., 1., 1., 1., 0.01, 0.01, 0.0001])
+INITIAL_COVARIANCE = np.diag([10., 10., 10., 10., 10000., 10000., 10000.])
+
+
+def bboxes_to_measurements(bboxes):
+    """
+    Converts an array of boxes (x_top_left, y_top_left, x_bottom_right, y_bottom_right) into an array of
+    measurements (cx, cy, s, r).
+    """
+    bboxes = np.asarray(bboxes, dtype=float).reshape(-1, 4)
+    w = bboxes[:, 2] - bboxes[:, 0]
+    h = bboxes[:, 3] - bboxes[:, 1]
+    return np.stack([bboxes[:, 0] + w / 2, bboxes[:, 1] + h / 2, w * h, w / np.maximum(h, 1e-6)], axis=1)
+
+
+def states_to_bboxes(states):
+    """
+    Converts an array of states (cx, cy, s, r, ...) into an array of boxes (x_top_left, y_top_left,
+    x_bottom_right, y_bottom_right).
+    """
+    w = np.sqrt(np.maximum(states[:, 2] * states[:, 3], 0))
+    h = states[:, 2] / np.maximum(w, 1e-6)
+    return np.stack([states[:, 0] - w / 2, states[:, 1] - h / 2, states[:, 0] + w / 2, states[:, 1] + h / 2], axis=1)
+
+
+class SORTTracker(BaseTracker):
+    """
+    SORT tracker: the motion of each track is predicted with a constant velocity Kalman filter and the predicted
+    boxes are matched with the new detections maximizing the total IoU (hungarian algorithm). As the position of
+    the lost tracks keeps being predicted, the identities are kept across gaps of several frames (e.g. when frames
+    are skipped to reduce the analysis rate).
+
+    The Kalman filters of all the tracks are predicted and corrected at once, their states are stored in arrays
+    sorted as self.tracks (by track id).
+    """
+
+    def __init__(self, max_lost=5, iou_threshold=0.3):
+        self.iou_threshold = iou_threshold
+        self.states = np.zeros((0, 7))
+        self.covariances = np.zeros((0, 7, 7))
+        self.tracks_ids = np.zeros(0, dtype=int)
+        self.tracks_class_ids = np.zeros(0, dtype=int)
+        super(SORTTracker, self).__init__(max_lost=max_lost)
+
+    def _predict(self):
+        # Avoid negative areas
+        shrinking = (self.states[:, 2] + self.states[:, 6]) <= 0
+        self.states[shrinking, 6] = 0
+        self.states = self.states @ TRANSITION_MATRIX.T
+        self.covariances = TRANSITION_MATRIX @ self.covariances @ TRANSITION_MATRIX.T + PROCESS_NOISE
+
+    def _correct(self, rows, measurements):
+        if len(rows) == 0:
+            return
+        states = self.states[rows]
+        covariances = self.covariances[rows]
+        innovations = measurements - states @ MEASUREMENT_MATRIX.T
+        innovation_covariances = MEASUREMENT_MATRIX @ covariances @ MEASUREMENT_MATRIX.T + MEASUREMENT_NOISE
+        gains = covariances @ MEASUREMENT_MATRIX.T @ np.linalg.inv(innovation_covariances)
+        self.states[rows] = states + (gains @ innovations[:, :, None])[:, :, 0]
+        self.covariances[rows] = (np.eye(7) - gains @ MEASUREMENT_MATRIX) @ covariances
+
+    def _match(self, predicted_bboxes, new_bboxes, new_class_ids):
+        """
+        Returns the (track row, detection index) pairs matched by the hungarian algorithm.
+        """
+        if len(predicted_bboxes) == 0 or len(new_bboxes) == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        ious = iou_matrix(predicted_bboxes, new_bboxes)
+        ious[self.tracks_class_ids[:, None] != new_class_ids[None, :]] = 0
+        rows, cols = linear_sum_assignment(-ious)
+        matched = ious[rows, cols] > self.iou_threshold
+        return rows[matched], cols[matched]
+
+    def update(self, bboxes: list, class_ids: list, detection_scores: list):
+        """
+        Update the tracker based on the new bboxes as input.
+
+        Parameters
+        ----------
+        bboxes : list
+                 List of bounding boxes detected in the current frame/timestep. Each element of the list represent
+                 coordinates of bounding box as tuple (top-left-x, top-left-y, bottom-right-x, bottom-right-y).
+        class_ids : list
+                    List of class_ids (int) corresponding to labels of the detected object. Default is `None`.
+        detection_scores: list
+                         List of detection scores / probability of each detected object or objectness.
+
+        Returns
+        -------
+        outputs : list
+                 List of tracks being currently tracked by the tracker.
+                 Each element of this list contains the tuple in
+                 format (frame#, trackid, class_id, centroid, bbox, info_dict).
+                 class_id is the id for label of the detection.
+                 centroid represents the pixel coordinates of the centroid of bounding box, i.e., (x, y).
+                 bbox is the bounding box coordinates as (x_top_left, y_top_left, x_bottom_right, y_bottom_right).
+                 For the tracks matched in this frame it is the detected box, otherwise it is the predicted one.
+                 info_dict is the dictionary of information which may be useful from the tracker (example:
+                 number of times tracker was lost while tracking.).
+
+        """
+
+        assert len(bboxes) == len(class_ids), "Containers must be of same length. len(bboxes)={}," \
+                                              " len(class_ids)={}".format(len(bboxes), len(class_ids))
+
+        assert len(bboxes) == len(detection_scores), "Containers must be of same length. len(bboxes)={}," \
+                                                     " len(class_ids)={}".format(len(bboxes), len(detection_scores))
+
+        self.frame_count += 1
+
+        new_bboxes = np.array(bboxes, dtype='int').reshape(-1, 4)
+        new_class_ids = np.array(class_ids, dtype='int')
+        new_detection_scores = np.array(detection_scores)
+        new_centroids = get_centroids(new_bboxes)
+
+        self._predict()
+        predicted_bboxes = states_to_bboxes(self.states)
+        rows, cols = self._match(predicted_bboxes, new_bboxes, new_class_ids)
+        self._correct(rows, bboxes_to_measurements(new_bboxes[cols]))
+
+        track_ids = self.tracks_ids.tolist()
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            track_id = track_ids[row]
+            scr = new_detection_scores[col]
+            max_score = max(self.tracks[track_id].info['max_score'], scr)
+            self._update_track(track_id, new_centroids[col], new_bboxes[col], score=scr, max_score=max_score)
+
+        lost_rows = np.ones(len(track_ids), dtype=bool)
+        lost_rows[rows] = False
+        lost_bboxes = predicted_bboxes[lost_rows].astype(int)
+        removed_rows = np.zeros(len(track_ids), dtype=bool)
+        for row, bbox, centroid in zip(np.flatnonzero(lost_rows), lost_bboxes, get_centroids(lost_bboxes)):
+            track = self.tracks[track_ids[row]]
+            track.lost += 1
+            track.bbox = bbox
+            track.centroid = centroid
+            if track.lost > self.max_lost:
+                self._remove_track(track_ids[row])
+                removed_rows[row] = True
+        if removed_rows.any():
+            self.states = self.states[~removed_rows]
+            self.covariances = self.covariances[~removed_rows]
+            self.tracks_ids = self.tracks_ids[~removed_rows]
+            self.tracks_class_ids = self.tracks_class_ids[~removed_rows]
+
+        new_detections = np.ones(len(new_bboxes), dtype=bool)
+        new_detections[cols] = False
+        new_detections = np.flatnonzero(new_detections)
+        if len(new_detections):
+            states = np.zeros((len(new_detections), 7))
+            states[:, :4] = bboxes_to_measurements(new_bboxes[new_detections])
+            self.states = np.concatenate([self.states, states])
+            self.covariances = np.concatenate(
+                [self.covariances, np.repeat(INITIAL_COVARIANCE[None], len(new_detections), axis=0)])
+            self.tracks_ids = np.concatenate(
+                [self.tracks_ids, self.next_track_id + np.arange(len(new_detections))])
+            self.tracks_class_ids = np.concatenate([self.tracks_class_ids, new_class_ids[new_detections]])
+            for i in new_detections:
+                self._add_track(
+                    new_centroids[i], new_bboxes[i], new_class_ids[i],
+                    score=new_detection_scores[i], max_score=new_detection_scores[i]
+                )
+
+        outputs = self._get_tracks(self.tracks)
+        return outputs
@@ -1,4 +1,4 @@
-import functools
+import numpy as np
 
 from .base_tracker import BaseTracker
 from .iou_tracker import IOUTracker
@@ -17,7 +17,14 @@ class Tracker:
                 max_lost=int(self.config.get_section_dict("Tracker")["MaxLost"]),
                 iou_threshold=float(self.config.get_section_dict("Tracker")["TrackerIOUThreshold"]),
                 min_detection_confidence=0.2,
-                max_detection_confidence=1.0
+                max_detection_confidence=1.0,
+                assignment=self.config.get_section_dict("Tracker").get("TrackerAssignment", "greedy")
+            )
+        elif tracker_name == "SORTTracker":
+            from .sort_tracker import SORTTracker
+            self.tracker = SORTTracker(
+                max_lost=int(self.config.get_section_dict("Tracker")["MaxLost"]),
+                iou_threshold=float(self.config.get_section_dict("Tracker")["TrackerIOUThreshold"])
             )
         else:
             raise ValueError(f"Not supported tracker named: {tracker_name}")
@@ -26,20 +33,27 @@ class Tracker:
     def update(self, bboxes: list, class_ids: list, detection_scores: list):
         return self.tracker.update(bboxes, class_ids, detection_scores)
 
-    def object_post_process(self, object: dict, tracks: list):
-        [w, h] = self.resolution
-        box = object["bbox"]
-        x0 = box[1]
-        y0 = box[0]
-        x1 = box[3]
-        y1 = box[2]
-        object["centroid"] = [(x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0]
-        object["bbox"] = [x0, y0, x1, y1]
-        object["centroidReal"] = [(x0 + x1) * w / 2, (y0 + y1) * h / 2, (x1 - x0) * w, (y1 - y0) * h]
-        object["bboxReal"] = [x0 * w, y0 * h, x1 * w, y1 * h]
-        for track in tracks:
-            track_count, trackid, class_id_o, centroid, track_bbox, track_info = track
-            selected_box = [int(x0 * w), int(y0 * h), int(x1 * w), int(y1 * h)]
-            if functools.reduce(lambda x, y: x and y, map(lambda p, q: p == q, selected_box, track_bbox), True):
-                object["tracked_id"] = trackid
-                object["track_info"] = track_info
+    def update_detections(self, detections):
+        """
+        Updates the tracker with a DetectionBatch and assigns the tracks to its objects.
+        """
+        tracks = self.update(detections.bbox_real.astype(int), detections.class_id, detections.score)
+        self.assign_tracks(detections, tracks)
+        return tracks
+
+    @staticmethod
+    def assign_tracks(detections, tracks: list):
+        """
+        Sets the `track_id` and `track_info` of the objects whose box (in pixels) matches the box of a track.
+        """
+        if len(detections) == 0 or len(tracks) == 0:
+            return
+        selected_boxes = detections.bbox_real.astype(int)
+        tracks_boxes = np.array([track[4] for track in tracks], dtype=int).reshape(-1, 4)
+        matches = np.all(selected_boxes[:, None, :] == tracks_boxes[None, :, :], axis=2)
+        # When several tracks have the same box, the latest one is assigned
+        last_match = len(tracks) - 1 - np.argmax(matches[:, ::-1], axis=1)
+        for i in np.flatnonzero(matches.any(axis=1)):
+            track = tracks[last_match[i]]
+            detections.track_id[i] = track[1]
+            detections.track_info[i] = track[5]
@@ -77,3 +77,42 @@ def iou(bbox1, bbox2):
     iou_ = size_intersection / size_union
 
     return iou_
+
+
+def iou_matrix(bboxes1, bboxes2):
+    """
+    Calculates the intersection-over-union between each pair of bounding boxes of two sets (the vectorized
+    version of `iou`).
+
+    Parameters
+    ----------
+    bboxes1 : numpy.ndarray
+              Array of shape (N, 4) with bounding boxes in format (x-top-left, y-top-left, x-bottom-right,
+              y-bottom-right).
+    bboxes2 : numpy.ndarray
+              Array of shape (M, 4) with bounding boxes in the same format.
+
+    Returns
+    -------
+    iou: numpy.ndarray
+         Array of shape (N, M) where the element (i, j) is the intersection-over-union of bboxes1[i], bboxes2[j].
+    """
+    bboxes1 = np.asarray(bboxes1, dtype=float).reshape(-1, 4)[:, None, :]
+    bboxes2 = np.asarray(bboxes2, dtype=float).reshape(-1, 4)[None, :, :]
+
+    # get the overlap rectangles
+    overlap_x0 = np.maximum(bboxes1[..., 0], bboxes2[..., 0])
+    overlap_y0 = np.maximum(bboxes1[..., 1], bboxes2[..., 1])
+    overlap_x1 = np.minimum(bboxes1[..., 2], bboxes2[..., 2])
+    overlap_y1 = np.minimum(bboxes1[..., 3], bboxes2[..., 3])
+    has_overlap = (overlap_x1 - overlap_x0 > 0) & (overlap_y1 - overlap_y0 > 0)
+
+    # calculate the ratio of the overlap to each ROI size and the unified size
+    size_1 = (bboxes1[..., 2] - bboxes1[..., 0]) * (bboxes1[..., 3] - bboxes1[..., 1])
+    size_2 = (bboxes2[..., 2] - bboxes2[..., 0]) * (bboxes2[..., 3] - bboxes2[..., 1])
+    size_intersection = (overlap_x1 - overlap_x0) * (overlap_y1 - overlap_y0)
+    size_union = size_1 + size_2 - size_intersection
+
+    iou_ = np.zeros(has_overlap.shape)
+    np.divide(size_intersection, size_union, out=iou_, where=has_overlap)
+    return iou_
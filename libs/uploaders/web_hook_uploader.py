@@ -0,0 +1,188 @@
+import gzip
+import inspect
+import json
+import logging
+import os
+import requests
+import time
+
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+from threading import Condition, Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+
+class WebHookUploader:
+    """
+    Delivers records (JSON serializable dicts) to a web hook endpoint. The records are buffered and sent by a
+    worker thread in batches (a JSON array per request) every `flush_interval` seconds or when `batch_size`
+    records are buffered. The requests reuse the connections of a `requests.Session` and the failed ones are
+    retried with exponential backoff. When the endpoint is down, the batches are stored in `spool_directory` and
+    they are sent (oldest first) after the next successful request.
+
+    The uploaders are shared by all the loggers (cameras) of the process that use the same endpoint (with the same
+    parameters), use `get_uploader` to create them and `acquire`/`release` to start and stop their worker.
+
+    :param endpoint: Url of the endpoint, the batches are sent with PUT requests.
+    :param batch_size: Maximum number of records sent in a request.
+    :param flush_interval: Maximum time (in seconds) that a record is buffered.
+    :param timeout: Timeout (in seconds) of the requests.
+    :param max_retries: Number of retries of a failed request.
+    :param backoff_factor: Factor of the exponential backoff between retries (in seconds).
+    :param compress: If True, the requests are compressed with gzip.
+    :param spool_directory: Directory where the undelivered batches are stored (None disables the spool).
+    :param max_spool_files: Maximum number of batches stored in the spool (the oldest ones are discarded).
+    """
+
+    _uploaders = {}
+    _uploaders_lock = Lock()
+
+    def __init__(self, endpoint, batch_size=50, flush_interval=5, timeout=5, max_retries=3, backoff_factor=0.5,
+                 compress=True, spool_directory=None, max_spool_files=1000):
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.compress = compress
+        self.spool_directory = spool_directory
+        self.max_spool_files = max_spool_files
+        if spool_directory:
+            os.makedirs(spool_directory, exist_ok=True)
+        self.session = requests.Session()
+        retry = Retry(total=max_retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUS_CODES,
+                      raise_on_status=False)
+        self.session.mount("http://", HTTPAdapter(max_retries=retry))
+        self.session.mount("https://", HTTPAdapter(max_retries=retry))
+        self.records = []
+        self.condition = Condition()
+        self.users = 0
+        self.running = False
+        self.worker = None
+
+    @classmethod
+    def get_uploader(cls, endpoint, **kwargs):
+        """
+        Returns the uploader of the `endpoint`, it is created (with the `kwargs` parameters) the first time. Raises
+        ValueError if the uploader of the `endpoint` was created with different parameters (e.g. two web hook loggers
+        with the same endpoint and different batch sizes or spool directories).
+        """
+        # The parameters not sent have their default value
+        arguments = inspect.signature(cls).bind(endpoint, **kwargs)
+        arguments.apply_defaults()
+        parameters = dict(arguments.arguments)
+        with cls._uploaders_lock:
+            if endpoint not in cls._uploaders:
+                cls._uploaders[endpoint] = (parameters, cls(endpoint, **kwargs))
+            uploader_parameters, uploader = cls._uploaders[endpoint]
+            if parameters != uploader_parameters:
+                raise ValueError(
+                    f"The uploader of {endpoint} was created with the parameters {uploader_parameters}, it can't be "
+                    f"shared with the parameters {parameters}"
+                )
+            return uploader
+
+    def acquire(self):
+        """
+        Registers a user of the uploader, the worker is started with the first one.
+        """
+        with self._uploaders_lock:
+            self.users += 1
+            if self.users == 1:
+                self.running = True
+                self.worker = Thread(target=self._process_records, daemon=True)
+                self.worker.start()
+
+    def release(self):
+        """
+        Unregisters a user of the uploader, the worker sends the buffered records and stops with the last one.
+        """
+        with self._uploaders_lock:
+            self.users -= 1
+            if self.users > 0:
+                return
+            with self.condition:
+                self.running = False
+                self.condition.notify_all()
+            worker, self.worker = self.worker, None
+        if worker is not None:
+            worker.join()
+
+    def add(self, record):
+        with self.condition:
+            self.records.append(record)
+            if len(self.records) >= self.batch_size:
+                self.condition.notify_all()
+
+    def flush(self):
+        """
+        Sends the buffered records.
+        """
+        with self.condition:
+            records, self.records = self.records, []
+        for i in range(0, len(records), self.batch_size):
+            self._deliver(records[i:i + self.batch_size])
+
+    def _process_records(self):
+        self._send_spooled_batches()
+        running = True
+        while running:
+            with self.condition:
+                if self.running and len(self.records) < self.batch_size:
+                    self.condition.wait(self.flush_interval)
+                running = self.running
+            self.flush()
+
+    def _deliver(self, records):
+        body = json.dumps(records).encode("utf-8")
+        if self.compress:
+            body = gzip.compress(body)
+        if self._send(body, self.compress):
+            self._send_spooled_batches()
+        else:
+            self._spool(body)
+
+    def _send(self, body, compressed):
+        headers = {"Content-Type": "application/json"}
+        if compressed:
+            headers["Content-Encoding"] = "gzip"
+        try:
+            response = self.session.put(self.endpoint, data=body, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Connection with endpoint {self.endpoint} can't be established: {e}")
+            return False
+        if not response.ok:
+            logger.error(f"Endpoint {self.endpoint} returned status {response.status_code}")
+            return False
+        return True
+
+    def _spooled_batches(self):
+        if not self.spool_directory:
+            return []
+        return sorted(f for f in os.listdir(self.spool_directory) if f.endswith((".json", ".json.gz")))
+
+    def _spool(self, body):
+        if not self.spool_directory:
+            logger.warning(f"{self.endpoint} is not available, a batch of records was discarded")
+            return
+        file_name = f"{time.time_ns()}.json" + (".gz" if self.compress else "")
+        tmp_path = os.path.join(self.spool_directory, "." + file_name)
+        with open(tmp_path, "wb") as spool_file:
+            spool_file.write(body)
+        # The batch is renamed once it is completely written
+        os.replace(tmp_path, os.path.join(self.spool_directory, file_name))
+        spooled_batches = self._spooled_batches()
+        for file_name in spooled_batches[:max(len(spooled_batches) - self.max_spool_files, 0)]:
+            logger.warning(f"Spool of {self.endpoint} is full, discarding the batch {file_name}")
+            os.remove(os.path.join(self.spool_directory, file_name))
+
+    def _send_spooled_batches(self):
+        for file_name in self._spooled_batches():
+            file_path = os.path.join(self.spool_directory, file_name)
+            with open(file_path, "rb") as spool_file:
+                body = spool_file.read()
+            if not self._send(body, file_name.endswith(".gz")):
+                return
+            os.remove(file_path)
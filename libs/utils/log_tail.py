@@ -0,0 +1,127 @@
+import csv
+import os
+
+
+class CsvTailReader:
+    """
+    Follows a CSV log that is being appended (e.g. the daily objects log of a camera) and returns its latest row.
+    The reader remembers the byte offset of the file, so each read only parses the lines appended since the
+    previous one. The first time a file is read, only its header and its last block are read.
+
+    When the path changes (e.g. the log of a new day) or the file is truncated, the new file is followed.
+
+    :param block_size: Size (in bytes) of the blocks read backwards to find the last line of a file.
+    """
+
+    def __init__(self, block_size=8192):
+        self.block_size = block_size
+        self.file_path = None
+        self.file = None
+        self.headers = None
+        self.header_end = 0
+        self.offset = 0
+        self.last_row = None
+
+    def _open(self, file_path):
+        self.close()
+        if not os.path.isfile(file_path):
+            return False
+        self.file = open(file_path, "rb")
+        header_line = self.file.readline()
+        if not header_line.endswith(b"\n"):
+            # The header is still being written
+            self.close()
+            return False
+        self.file_path = file_path
+        self.headers = next(csv.reader([header_line.decode("utf-8")]))
+        self.header_end = len(header_line)
+        self.offset = self._find_last_line()
+        return True
+
+    def _find_last_line(self):
+        """
+        Returns the offset of the last complete line of the file.
+        """
+        size = os.fstat(self.file.fileno()).st_size
+        block_size = self.block_size
+        start = max(self.header_end, size - block_size)
+        while start > self.header_end:
+            # Include the previous byte to know whether the block starts with a new line
+            self.file.seek(start - 1)
+            data = self.file.read(size - start + 1)
+            last_newline = data.rfind(b"\n")
+            previous_newline = data.rfind(b"\n", 0, max(last_newline, 0))
+            if previous_newline != -1:
+                return start + previous_newline
+            block_size *= 2
+            start = max(self.header_end, size - block_size)
+        return self.header_end
+
+    def _replaced(self):
+        """
+        Returns True if the followed file was truncated or replaced.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return True
+        return stat.st_ino != os.fstat(self.file.fileno()).st_ino or stat.st_size < self.offset
+
+    def read_last_row(self, file_path):
+        """
+        Returns the latest complete row (a dict) of the file, or None if it has no rows.
+        """
+        if file_path != self.file_path or self.file is None or self._replaced():
+            if not self._open(file_path):
+                return None
+        self.file.seek(self.offset)
+        data = self.file.read()
+        # Ignore the last line until it's completely written
+        complete_data = data[:data.rfind(b"\n") + 1]
+        self.offset += len(complete_data)
+        lines = complete_data.splitlines()
+        if lines:
+            row = next(csv.reader([lines[-1].decode("utf-8")]))
+            self.last_row = dict(zip(self.headers, row))
+        return self.last_row
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+        self.file_path = None
+        self.last_row = None
+
+
+def read_last_rows(file_path, count, block_size=8192):
+    """
+    Returns the latest `count` complete rows (dicts) of the CSV `file_path`. The file is read backwards from its end
+    in blocks of `block_size` bytes until the rows are found, so the cost doesn't depend on the size of the file.
+    A last line that is still being written is ignored.
+    """
+    if count <= 0:
+        return []
+    with open(file_path, "rb") as csv_file:
+        header_line = csv_file.readline()
+        if not header_line.endswith(b"\n"):
+            return []
+        headers = next(csv.reader([header_line.decode("utf-8")]))
+        header_end = len(header_line)
+        start = os.fstat(csv_file.fileno()).st_size
+        blocks = []
+        newlines = 0
+        # A line more is needed to know that the first line of the data is complete
+        while start > header_end and newlines <= count:
+            read_size = min(block_size, start - header_end)
+            start -= read_size
+            csv_file.seek(start)
+            block = csv_file.read(read_size)
+            newlines += block.count(b"\n")
+            blocks.append(block)
+    data = b"".join(reversed(blocks))
+    data = data[:data.rfind(b"\n") + 1]
+    if start > header_end:
+        # Skip the first (partial) line
+        data = data[data.find(b"\n") + 1:]
+    lines = [line.decode("utf-8") for line in data.split(b"\n")[:-1][-count:]]
+    return [dict(zip(headers, row)) for row in csv.reader(lines)]
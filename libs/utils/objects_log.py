@@ -0,0 +1,220 @@
+import ast
+import csv
+import numpy as np
+import os
+
+from datetime import datetime
+
+from libs.utils.log_tail import read_last_rows
+
+# Binary (columnar) version of the objects_log CSV files. Each day is stored in two append-only files of fixed-width
+# records that can be read with np.memmap:
+#   - <date>.frames.bin: one record for each row of the CSV (a logged frame), with the position of its detections.
+#   - <date>.detections.bin: one record for each detected object.
+# The detections of a frame are written before the frame record, so a reader never finds a frame with missing
+# detections.
+FRAME_DTYPE = np.dtype([
+    ("timestamp", "<i8"),  # Seconds since epoch (of the naive local time, as the CSV "Timestamp")
+    ("first_detection", "<i8"),
+    ("detections_count", "<i4"),
+    ("violating_objects", "<i4"),
+    ("environment_score", "<f8"),
+])
+DETECTION_DTYPE = np.dtype([
+    ("timestamp", "<i8"),
+    ("track_id", "<i8"),
+    ("bbox", "<f8", (4,)),
+    ("face_label", "<i1"),
+    ("violation", "?"),
+])
+FRAMES_FILE_SUFFIX = ".frames.bin"
+DETECTIONS_FILE_SUFFIX = ".detections.bin"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def get_binary_objects_log_paths(objects_log_directory, log_date):
+    """
+    Returns the paths of the frames and detections files of the binary objects log of the `log_date` day.
+    """
+    return (
+        os.path.join(objects_log_directory, str(log_date) + FRAMES_FILE_SUFFIX),
+        os.path.join(objects_log_directory, str(log_date) + DETECTIONS_FILE_SUFFIX)
+    )
+
+
+def encode_timestamp(time_stamp):
+    """
+    Converts a datetime (or a string with the CSV format) into the timestamp stored in the binary log.
+    """
+    if isinstance(time_stamp, str):
+        time_stamp = datetime.strptime(time_stamp, TIMESTAMP_FORMAT)
+    return np.datetime64(time_stamp, "s").astype(np.int64)
+
+
+def decode_timestamps(timestamps):
+    """
+    Converts an array of timestamps stored in the binary log into an array of datetime64.
+    """
+    return np.asarray(timestamps).astype("datetime64[s]")
+
+
+def encode_tracking_id(tracking_id):
+    """
+    Returns the track id stored in the binary log. The objects that weren't tracked are logged in the CSV with
+    their "<class_id>-<object_index>" id, they are stored as negative ids (-object_index - 1).
+    """
+    if isinstance(tracking_id, str):
+        return -int(tracking_id.split("-")[-1]) - 1
+    return int(tracking_id)
+
+
+def decode_csv_row(csv_row):
+    """
+    Returns the (time, detections, violations_indexes) of a row of an objects log CSV.
+    """
+    return (
+        datetime.strptime(csv_row["Timestamp"], TIMESTAMP_FORMAT),
+        ast.literal_eval(csv_row["Detections"]),
+        ast.literal_eval(csv_row["ViolationsIndexes"])
+    )
+
+
+def build_records(time_stamp, objects, violating_objects_index_list, violating_objects_count,
+                  environment_score, first_detection):
+    """
+    Builds the frame record and the detections records of a row of the objects log. `objects` is the output of
+    `RawDataLogger.format_objects`.
+    """
+    timestamp = encode_timestamp(time_stamp)
+    detections = np.zeros(len(objects), dtype=DETECTION_DTYPE)
+    detections["timestamp"] = timestamp
+    detections["track_id"] = [encode_tracking_id(obj["tracking_id"]) for obj in objects]
+    detections["bbox"] = np.array([obj["bbox"] for obj in objects], dtype=float).reshape(-1, 4)
+    detections["face_label"] = [obj.get("face_label", -1) for obj in objects]
+    if len(violating_objects_index_list):
+        detections["violation"][np.asarray(violating_objects_index_list, dtype=int)] = True
+    frame = np.zeros(1, dtype=FRAME_DTYPE)
+    frame["timestamp"] = timestamp
+    frame["first_detection"] = first_detection
+    frame["detections_count"] = len(objects)
+    frame["violating_objects"] = violating_objects_count
+    frame["environment_score"] = environment_score
+    return frame, detections
+
+
+def memmap_records(file_path, dtype):
+    """
+    Maps the complete records of a binary log file (a partially written record at the end is ignored).
+    """
+    records_count = os.path.getsize(file_path) // dtype.itemsize if os.path.isfile(file_path) else 0
+    if records_count == 0:
+        # np.memmap can't map empty files
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(file_path, dtype=dtype, mode="r", shape=(records_count,))
+
+
+def has_binary_objects_log(objects_log_directory, log_date):
+    frames_path, _ = get_binary_objects_log_paths(objects_log_directory, log_date)
+    return os.path.isfile(frames_path)
+
+
+def read_binary_objects_log(objects_log_directory, log_date):
+    """
+    Returns the (frames, detections) records of the binary objects log of the `log_date` day.
+    """
+    frames_path, detections_path = get_binary_objects_log_paths(objects_log_directory, log_date)
+    frames = memmap_records(frames_path, FRAME_DTYPE)
+    detections = memmap_records(detections_path, DETECTION_DTYPE)
+    if len(frames):
+        detections_end = frames[-1]["first_detection"] + frames[-1]["detections_count"]
+        if detections_end > len(detections):
+            # The detections file was truncated, ignore the frames with missing detections
+            frames_ends = frames["first_detection"] + frames["detections_count"]
+            frames = frames[:np.searchsorted(frames_ends, len(detections), side="right")]
+            detections_end = frames_ends[len(frames) - 1] if len(frames) else 0
+        # Ignore the detections of a frame that is still being written
+        detections = detections[:detections_end]
+    return frames, detections
+
+
+def select_detections(frames, detections, time_from=None, time_until=None):
+    """
+    Returns the frames (and their detections) logged in the [time_from, time_until) interval.
+    """
+    mask = np.ones(len(frames), dtype=bool)
+    if time_from is not None:
+        mask &= frames["timestamp"] >= encode_timestamp(time_from)
+    if time_until is not None:
+        mask &= frames["timestamp"] < encode_timestamp(time_until)
+    if mask.all():
+        return frames, detections
+    selected_frames = frames[mask]
+    # The records of the frames (and detections) are sorted by time, so the selection is contiguous
+    if len(selected_frames) == 0:
+        return selected_frames, detections[:0]
+    first = selected_frames[0]["first_detection"]
+    last = selected_frames[-1]["first_detection"] + selected_frames[-1]["detections_count"]
+    return selected_frames, detections[first:last]
+
+
+def convert_csv_to_binary_objects_log(csv_path, objects_log_directory=None):
+    """
+    Converts an objects log CSV file (<date>.csv) into the binary format. The binary files are created in the
+    `objects_log_directory` (the directory of the CSV file by default), replacing the existing ones.
+
+    Returns:
+        The number of rows converted.
+    """
+    objects_log_directory = objects_log_directory or os.path.dirname(csv_path)
+    log_date = os.path.splitext(os.path.basename(csv_path))[0]
+    frames_path, detections_path = get_binary_objects_log_paths(objects_log_directory, log_date)
+    rows_count = 0
+    first_detection = 0
+    with open(csv_path, newline="") as csvfile, \
+            open(detections_path, "wb") as detections_file, open(frames_path, "wb") as frames_file:
+        for row in csv.DictReader(csvfile):
+            row_time, row_detections, violations_indexes = decode_csv_row(row)
+            frame, detections = build_records(
+                row_time,
+                row_detections,
+                violations_indexes,
+                int(row["ViolatingObjects"]),
+                float(row["EnvironmentScore"]),
+                first_detection
+            )
+            detections_file.write(detections.tobytes())
+            frames_file.write(frame.tobytes())
+            first_detection += len(detections)
+            rows_count += 1
+    return rows_count
+
+
+def read_complete_binary_objects_log(csv_path):
+    """
+    Returns the (frames, detections) records of the binary objects log of the day of the `csv_path` objects log, or
+    None if there is no binary log or it doesn't contain the same rows as the CSV file (e.g. the binary log was
+    enabled or disabled in the middle of the day, its latest rows weren't flushed or its files were truncated).
+    """
+    objects_log_directory, csv_file = os.path.split(csv_path)
+    log_date = os.path.splitext(csv_file)[0]
+    if not has_binary_objects_log(objects_log_directory, log_date):
+        return None
+    frames, detections = read_binary_objects_log(objects_log_directory, log_date)
+    with open(csv_path, newline="") as csvfile:
+        first_row = next(csv.DictReader(csvfile), None)
+    if first_row is None:
+        return frames, detections
+    if len(frames) == 0 or frames[0]["timestamp"] > encode_timestamp(first_row["Timestamp"]):
+        return None
+    # Several rows can be logged in the same second, the latest second must have the same rows in both logs
+    last_timestamp = frames[-1]["timestamp"]
+    last_second_frames = len(frames) - np.searchsorted(frames["timestamp"], last_timestamp, side="left")
+    last_rows = read_last_rows(csv_path, last_second_frames + 1)
+    last_second_rows = 0
+    for row in reversed(last_rows):
+        if encode_timestamp(row["Timestamp"]) != last_timestamp:
+            break
+        last_second_rows += 1
+    if last_second_rows != last_second_frames:
+        return None
+    return frames, detections
@@ -406,59 +406,34 @@ def visualization_preparation(nn_out, distances, dist_threshold):
     prepare the objects boxes and id in order to visualize
 
     Args:
-        nn_out: a list of dicionary contains normalized numbers of bonding boxes
-        {'id' : '0-0', 'bbox' : [x0, y0, x1, y1], 'score' : 0.99(optional} of shape [N, 3] or [N, 2]
+        nn_out: a DetectionBatch with the normalized [x0, y0, x1, y1] bounding boxes (and scores) of the objects
         distances: a symmetric matrix of normalized distances
         dist_threshold: the minimum distance for considering unsafe distance between objects
     Returns:
         an output dictionary contains object classes, boxes, scores
     """
     output_dict = {}
-    detection_classes = []
-    detection_scores = []
-    detection_boxes = []
-    is_violating = []
-    colors = []
-    face_labels = []
-    track_ids = []
-
-    distance = np.amin(distances + np.identity(len(distances)) * dist_threshold * 2, 0) if distances != [] else [dist_threshold]
-    for i, obj in enumerate(nn_out):
-        # Colorizing bounding box based on the distances between them
-        # R = 255 when dist=0 and R = 0 when dist > dist_threshold
-        redness_factor = 1.5
-        r_channel = np.maximum(255 * (dist_threshold - distance[i]) / dist_threshold, 0) * redness_factor
-        g_channel = 255 - r_channel
-        b_channel = 0
-        # Create a tuple object of colors
-        color = (int(b_channel), int(g_channel), int(r_channel))
-        # Get the object id
-        obj_id = obj["id"]
-        # Split and get the first item of obj_id
-        obj_id = obj_id.split("-")[0]
-        box = obj["bbox"]
-        if "score" in obj:
-            score = obj["score"]
-        else:
-            score = 1.0
-        # Append all processed items
-        detection_classes.append(int(obj_id))
-        detection_scores.append(score)
-        detection_boxes.append(box)
-        colors.append(color)
-        if "face_label" in obj:
-            face_labels.append(obj["face_label"])
-        if "tracked_id" in obj:
-            track_ids.append(obj["tracked_id"])
-
-        is_violating.append(True) if distance[i] < dist_threshold else is_violating.append(False)
-    output_dict["detection_boxes"] = np.array(detection_boxes)
-    output_dict["detection_scores"] = detection_scores
-    output_dict["detection_classes"] = detection_classes
-    output_dict["violating_objects"] = is_violating
+
+    if len(distances):
+        distance = np.amin(distances + np.identity(len(distances)) * dist_threshold * 2, 0)
+    else:
+        distance = np.full(len(nn_out), dist_threshold)
+    # Colorizing bounding box based on the distances between them
+    # R = 255 when dist=0 and R = 0 when dist > dist_threshold
+    redness_factor = 1.5
+    r_channel = np.maximum(255 * (dist_threshold - distance) / dist_threshold, 0) * redness_factor
+    g_channel = 255 - r_channel
+    b_channel = np.zeros(len(nn_out))
+    # Create a tuple object of colors
+    colors = list(zip(b_channel.astype(int).tolist(), g_channel.astype(int).tolist(), r_channel.astype(int).tolist()))
+
+    output_dict["detection_boxes"] = np.array(nn_out.bbox)
+    output_dict["detection_scores"] = nn_out.score.tolist()
+    output_dict["detection_classes"] = nn_out.class_id.tolist()
+    output_dict["violating_objects"] = (distance < dist_threshold).tolist()
     output_dict["detection_colors"] = colors
-    output_dict["face_labels"] = face_labels
-    output_dict["track_ids"] = track_ids
+    output_dict["face_labels"] = nn_out.face_label.tolist() if nn_out.face_label is not None else []
+    output_dict["track_ids"] = nn_out.track_id[nn_out.track_id != -1].tolist()
     return output_dict
 
 
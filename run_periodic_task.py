@@ -25,11 +25,13 @@ def main(config):
         task_name = config.get_section_dict(p_task).get("Name")
         if task_name == "metrics":
             logger.info("Metrics enabled!")
-            schedule.every().day.at("00:01").do(compute_daily_metrics, config=config)
-            schedule.every().hour.at(":01").do(compute_hourly_metrics, config=config)
+            # Number of processes used to compute the metrics of the cameras and areas in parallel
+            max_workers = int(config.get_section_dict(p_task).get("MaxWorkers", 1))
+            schedule.every().day.at("00:01").do(compute_daily_metrics, config=config, max_workers=max_workers)
+            schedule.every().hour.at(":01").do(compute_hourly_metrics, config=config, max_workers=max_workers)
             live_interval = int(config.get_section_dict(p_task).get("LiveInterval", 10))
             schedule.every(live_interval).minutes.do(
-                compute_live_metrics, config=config, live_interval=live_interval)
+                compute_live_metrics, config=config, live_interval=live_interval, max_workers=max_workers)
         elif task_name == "s3_backup":
             bucket_name = config.get_section_dict(p_task).get("BackupS3Bucket")
             if not bucket_name:
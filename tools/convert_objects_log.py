@@ -0,0 +1,34 @@
+"""
+Converts the objects log CSV files written by the file_system_logger into the binary (columnar) format that can be
+read with np.memmap (see libs.utils.objects_log).
+
+Usage (from the root of the repository):
+    python3 -m tools.convert_objects_log --path /repo/data/processor/static/data/sources/default/objects_log
+The path can be a CSV file or a directory (all the CSV files of the directory are converted).
+"""
+import argparse
+import logging
+import os
+
+from libs.utils.objects_log import convert_csv_to_binary_objects_log
+
+logger = logging.getLogger(__name__)
+
+
+def convert_objects_logs(path, output_directory=None):
+    if os.path.isdir(path):
+        csv_files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".csv"))
+    else:
+        csv_files = [path]
+    for csv_file in csv_files:
+        rows_count = convert_csv_to_binary_objects_log(csv_file, output_directory)
+        logger.info(f"Converted {rows_count} rows of {csv_file}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", required=True, help="Objects log CSV file or directory")
+    parser.add_argument("--output-directory", help="Directory of the binary files (the CSV directory by default)")
+    args = parser.parse_args()
+    convert_objects_logs(args.path, args.output_directory)
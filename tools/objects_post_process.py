@@ -3,6 +3,8 @@ This module includes set of functions that apply as a post-processing to the det
 """
 import numpy as np
 
+from scipy.spatial import cKDTree
+
 
 def extract_violating_objects(distances, dist_threshold):
     """Extract pair of objects that are closer than the distance threshold.
@@ -18,3 +20,25 @@ def extract_violating_objects(distances, dist_threshold):
     triu_distances = np.triu(distances) + np.tril((dist_threshold + 1) * np.ones(distances.shape))
     violating_objects = np.argwhere(triu_distances < dist_threshold)
     return violating_objects
+
+
+def extract_close_pairs(points, radius):
+    """Extract pair of points that are closer than (or at) the radius using a KD-tree radius query,
+    without materializing the distance between each pair of points.
+
+    Args:
+        points: A Nxk numpy array with the coordinates of each point.
+        radius: the maximum distance between the points of a pair.
+
+    Returns:
+        pairs: A 2-d numpy array where each row is the ids (i, j), with i < j, of two close points.
+
+    """
+    if len(points) < 2:
+        return np.empty((0, 2), dtype=int)
+    return cKDTree(points).query_pairs(radius, output_type="ndarray").astype(int)
+
+
+def sort_pairs(pairs):
+    """Sort the pairs (rows) of objects ids in the same order returned by `extract_violating_objects`"""
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]